@@ -11,10 +11,14 @@ from google.auth.transport import requests
 from django.conf import settings
 from accounts.models import User, Employee, Student, Onetimepassword, Role
 from ..serializers.auth import RegisterSerializer
+from core.telemetry import upstream_call
 from rest_framework import serializers
 from django.utils import timezone
 from datetime import timedelta
 import json, random, string, hashlib
+import logging
+
+logger = logging.getLogger(__name__)
 
 def detect_platform(request):
     """
@@ -182,10 +186,10 @@ def create_user_profile(user, platform, name=None, category=None, phone="", coun
                 student_role = Role.objects.get(name='Student', is_active=True)
                 user.role = student_role
                 user.save(update_fields=['role'])
-                print(f"✅ Auto-assigned Student role to user {user.email}")
+                logger.info("Auto-assigned Student role to user %s", user.email)
             except Role.DoesNotExist:
                 # Student role doesn't exist, user will have no role
-                print(f"⚠️  Student role not found for user {user.email}")
+                logger.warning("Student role not found for user %s", user.email)
                 pass
         else:
             Employee.objects.create(
@@ -203,10 +207,10 @@ def create_user_profile(user, platform, name=None, category=None, phone="", coun
                 employee_role = Role.objects.get(name='User', is_active=True)
                 user.role = employee_role
                 user.save(update_fields=['role'])
-                print(f"✅ Auto-assigned User role to user {user.email}")
+                logger.info("Auto-assigned User role to user %s", user.email)
             except Role.DoesNotExist:
                 # Student role doesn't exist, user will have no role
-                print(f"⚠️  User role not found for user {user.email}")
+                logger.warning("User role not found for user %s", user.email)
                 pass
     else:
         # Use platform-based logic when category is not provided
@@ -226,10 +230,10 @@ def create_user_profile(user, platform, name=None, category=None, phone="", coun
                 employee_role = Role.objects.get(name='User', is_active=True)
                 user.role = employee_role
                 user.save(update_fields=['role'])
-                print(f"✅ Auto-assigned User role to user {user.email}")
+                logger.info("Auto-assigned User role to user %s", user.email)
             except Role.DoesNotExist:
                 # Student role doesn't exist, user will have no role
-                print(f"⚠️  User role not found for user {user.email}")
+                logger.warning("User role not found for user %s", user.email)
                 pass
 
         else:
@@ -245,10 +249,10 @@ def create_user_profile(user, platform, name=None, category=None, phone="", coun
                 student_role = Role.objects.get(name='Student', is_active=True)
                 user.role = student_role
                 user.save(update_fields=['role'])
-                print(f"✅ Auto-assigned Student role to user {user.email}")
+                logger.info("Auto-assigned Student role to user %s", user.email)
             except Role.DoesNotExist:
                 # Student role doesn't exist, user will have no role
-                print(f"⚠️  Student role not found for user {user.email}")
+                logger.warning("Student role not found for user %s", user.email)
                 pass
 
 
@@ -900,10 +904,12 @@ class GoogleLogin(APIView):
             if not client_id or not client_id.endswith('.apps.googleusercontent.com'):
                 print("Warning: Client ID format looks incorrect")
             
-            info = id_token.verify_oauth2_token(
-                token, requests.Request(),
-                client_id
-            )
+            # ValueError is Google rejecting the token, not an upstream failure
+            with upstream_call("google_oauth", "verify_id_token", expected=(ValueError,)):
+                info = id_token.verify_oauth2_token(
+                    token, requests.Request(),
+                    client_id
+                )
             print(f"Token verified successfully. User info: {info}")
             
             user, created = User.objects.get_or_create(
@@ -1,3 +1,5 @@
+import logging
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -5,6 +7,8 @@ from rest_framework import status
 from accounts.models import Menu
 from ..serializers.menu import MenuSerializer, SubMenuSerializer
 
+logger = logging.getLogger(__name__)
+
 class MenuListView(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -61,7 +65,7 @@ class MenuListView(APIView):
             }
             return Response(response_data)
         except Exception as e:
-            print(f"Error in MenuListView: {str(e)}")
+            logger.exception("Error in MenuListView")
             return Response({
                 "success": False,
                 "message": f"Failed to fetch menus: {str(e)}"
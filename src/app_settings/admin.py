@@ -1,11 +1,12 @@
 from django.contrib import admin
-from .models import AppSettings, AppMedia
+from .models import AppSettings, AppMedia, AppVersionPolicy, AppLaunchStat
 
 
 class AppMediaInline(admin.TabularInline):
     model = AppMedia
     extra = 0
-    fields = ['kind', 'title', 'file', 'url', 'thumbnail', 'order', 'is_active']
+    fields = ['kind', 'title', 'file', 'url', 'thumbnail', 'order', 'is_active', 'processing_status']
+    readonly_fields = ['processing_status']
 
 
 @admin.register(AppSettings)
@@ -23,8 +24,37 @@ class AppSettingsAdmin(admin.ModelAdmin):
 
 @admin.register(AppMedia)
 class AppMediaAdmin(admin.ModelAdmin):
-    list_display = ['title', 'kind', 'order', 'is_active']
-    list_filter = ['kind', 'is_active']
+    list_display = ['title', 'kind', 'order', 'is_active', 'processing_status']
+    list_filter = ['kind', 'is_active', 'processing_status']
     search_fields = ['title', 'url']
     ordering = ['order', 'created_at']
-    fields = ['app_settings', 'kind', 'title', 'file', 'url', 'thumbnail', 'order', 'is_active']
\ No newline at end of file
+    fields = [
+        'app_settings', 'kind', 'title', 'file', 'url', 'thumbnail', 'order', 'is_active',
+        'poster', 'rendition', 'processing_status', 'processing_error'
+    ]
+    readonly_fields = ['poster', 'rendition', 'processing_status', 'processing_error']
+    actions = ['reprocess_media']
+
+    @admin.action(description="Regenerate poster and rendition")
+    def reprocess_media(self, request, queryset):
+        updated = queryset.filter(kind='MP4').update(processing_status='pending', processing_error='')
+        AppSettings.bump_solo_version()
+        self.message_user(request, f"{updated} item(s) queued for processing.")
+
+
+@admin.register(AppVersionPolicy)
+class AppVersionPolicyAdmin(admin.ModelAdmin):
+    list_display = ['platform', 'version', 'is_active', 'created_at']
+    list_filter = ['platform', 'is_active']
+    search_fields = ['version']
+
+
+@admin.register(AppLaunchStat)
+class AppLaunchStatAdmin(admin.ModelAdmin):
+    list_display = ['date', 'platform', 'app_version', 'count']
+    list_filter = ['platform', 'date']
+    search_fields = ['app_version']
+    readonly_fields = ['date', 'platform', 'app_version', 'count']
+
+    def has_add_permission(self, request):
+        return False
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class SettingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'app_settings' 
\ No newline at end of file
+    name = 'app_settings'
+
+    def ready(self):
+        from .signals import connect_signals
+        connect_signals()
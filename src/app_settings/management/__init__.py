@@ -0,0 +1 @@
+# Management package for app_settings app
\ No newline at end of file
@@ -0,0 +1 @@
+# Commands package for app_settings app
\ No newline at end of file
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from app_settings.models import AppSettings
+
+
+class Command(BaseCommand):
+    help = 'Compare the per-call cost of loading AppSettings from the database vs the cached get_solo()'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=1000,
+            help='Number of calls to time for each variant',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        # Make sure the row exists and the local cache is warm
+        AppSettings.get_solo()
+
+        results = [
+            ('load_solo (database)', AppSettings.load_solo),
+            ('get_solo (cached)', AppSettings.get_solo),
+        ]
+
+        for label, func in results:
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    func()
+                elapsed = time.perf_counter() - start
+
+            self.stdout.write(
+                f"{label:<24} {elapsed / iterations * 1e6:10.1f} us/call "
+                f"{len(queries) / iterations:6.2f} queries/call"
+            )
@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app_settings.media_pipeline import claim_pending_media, process_media, requeue_stale_media
+from app_settings.models import AppMedia, AppSettings
+
+
+class Command(BaseCommand):
+    help = 'Generate poster thumbnails and low bitrate renditions for pending MP4 AppMedia items'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help='Maximum number of items to claim per batch',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new items instead of exiting after one batch',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=30,
+            help='Seconds to sleep between polls when running with --loop',
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Re-queue items whose previous processing attempt failed',
+        )
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            requeued = AppMedia.objects.filter(
+                kind='MP4', processing_status='failed'
+            ).update(processing_status='pending', processing_error='')
+            AppSettings.bump_solo_version()
+            self.stdout.write(f"Re-queued {requeued} failed item(s)")
+
+        while True:
+            requeued = requeue_stale_media()
+            if requeued:
+                self.stdout.write(f"Re-queued {requeued} stale item(s)")
+
+            processed = self.process_batch(options['limit'])
+
+            if not options['loop']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
+
+    def process_batch(self, limit):
+        batch = list(claim_pending_media(limit))
+
+        for media in batch:
+            if process_media(media):
+                self.stdout.write(self.style.SUCCESS(f"Processed: {media}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"Failed: {media} ({media.processing_error})"))
+
+        return len(batch)
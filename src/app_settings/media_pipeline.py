@@ -0,0 +1,138 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AppMedia, AppSettings
+
+
+class MediaProcessingError(Exception):
+    pass
+
+
+def claim_pending_media(limit=10):
+    """
+    Mark up to `limit` pending MP4 items as processing and return them.
+    The conditional UPDATE makes sure two workers never claim the same row.
+    """
+    candidate_ids = list(
+        AppMedia.objects.filter(kind='MP4', processing_status='pending')
+        .order_by('created_at')
+        .values_list('id', flat=True)[:limit]
+    )
+
+    now = timezone.now()
+    claimed_ids = [
+        media_id
+        for media_id in candidate_ids
+        if AppMedia.objects.filter(pk=media_id, processing_status='pending')
+        .update(processing_status='processing', processing_claimed_at=now)
+    ]
+
+    # Bulk updates skip the save signals, so invalidate cached settings here
+    if claimed_ids:
+        AppSettings.bump_solo_version()
+
+    return AppMedia.objects.filter(pk__in=claimed_ids).order_by('created_at')
+
+
+def requeue_stale_media():
+    """Return claims held longer than APP_MEDIA_CLAIM_TIMEOUT (crashed workers) to the queue."""
+    cutoff = timezone.now() - timedelta(seconds=settings.APP_MEDIA_CLAIM_TIMEOUT)
+    requeued = AppMedia.objects.filter(
+        Q(processing_claimed_at__lt=cutoff) | Q(processing_claimed_at__isnull=True),
+        processing_status='processing',
+    ).update(processing_status='pending')
+
+    if requeued:
+        AppSettings.bump_solo_version()
+    return requeued
+
+
+def _run_ffmpeg(args):
+    binary = getattr(settings, 'FFMPEG_BINARY', 'ffmpeg')
+    if not shutil.which(binary):
+        raise MediaProcessingError(f"ffmpeg binary not found: {binary}")
+
+    result = subprocess.run(
+        [binary, '-y', '-loglevel', 'error', *args],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise MediaProcessingError(result.stderr.strip() or "ffmpeg failed")
+
+
+def generate_poster(source_path, output_path):
+    """Pick a representative frame and scale it down to the rendition height."""
+    height = settings.APP_MEDIA_RENDITION_HEIGHT
+    _run_ffmpeg([
+        '-i', source_path,
+        '-vf', f"thumbnail,scale=-2:'min({height},ih)'",
+        '-frames:v', '1',
+        '-q:v', '4',
+        output_path,
+    ])
+
+
+def generate_rendition(source_path, output_path):
+    """Transcode to a mobile friendly H.264/AAC MP4 capped in height and bitrate."""
+    height = settings.APP_MEDIA_RENDITION_HEIGHT
+    bitrate = settings.APP_MEDIA_RENDITION_BITRATE
+    _run_ffmpeg([
+        '-i', source_path,
+        '-vf', f"scale=-2:'min({height},ih)'",
+        '-c:v', 'libx264',
+        '-preset', 'veryfast',
+        '-crf', '28',
+        '-maxrate', bitrate,
+        '-bufsize', bitrate,
+        '-c:a', 'aac',
+        '-b:a', '96k',
+        '-movflags', '+faststart',
+        output_path,
+    ])
+
+
+def process_media(media):
+    """
+    Build the poster and low bitrate rendition for one claimed AppMedia row.
+    Returns True on success; failures are recorded on the row.
+    """
+    base_name = os.path.splitext(os.path.basename(media.file.name))[0]
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source_path = os.path.join(tmp_dir, 'source.mp4')
+            poster_path = os.path.join(tmp_dir, 'poster.jpg')
+            rendition_path = os.path.join(tmp_dir, 'rendition.mp4')
+
+            # Storage is remote (GCS), so work on a local copy
+            with media.file.open('rb') as src, open(source_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+
+            generate_poster(source_path, poster_path)
+            generate_rendition(source_path, rendition_path)
+
+            with open(poster_path, 'rb') as f:
+                media.poster.save(f"{base_name}.jpg", File(f), save=False)
+            with open(rendition_path, 'rb') as f:
+                media.rendition.save(f"{base_name}_{settings.APP_MEDIA_RENDITION_HEIGHT}p.mp4", File(f), save=False)
+
+    except Exception as e:
+        # Storage and database errors too: a row left in 'processing' is never retried
+        media.processing_status = 'failed'
+        media.processing_error = str(e)[:2000]
+        media.save(update_fields=['processing_status', 'processing_error'])
+        return False
+
+    media.processing_status = 'ready'
+    media.processing_error = ''
+    media.save(update_fields=['poster', 'rendition', 'processing_status', 'processing_error'])
+    return True
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:25
+
+from django.db import migrations, models
+
+
+def queue_existing_mp4(apps, schema_editor):
+    AppMedia = apps.get_model("app_settings", "AppMedia")
+    AppMedia.objects.filter(kind="MP4").exclude(file="").exclude(
+        file__isnull=True
+    ).update(processing_status="pending")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_settings", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="appmedia",
+            name="poster",
+            field=models.ImageField(
+                blank=True, null=True, upload_to="settings/posters/"
+            ),
+        ),
+        migrations.AddField(
+            model_name="appmedia",
+            name="processing_error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="appmedia",
+            name="processing_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("ready", "Ready"),
+                    ("failed", "Failed"),
+                ],
+                db_index=True,
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="appmedia",
+            name="rendition",
+            field=models.FileField(
+                blank=True, null=True, upload_to="settings/renditions/"
+            ),
+        ),
+        migrations.RunPython(queue_existing_mp4, migrations.RunPython.noop),
+    ]
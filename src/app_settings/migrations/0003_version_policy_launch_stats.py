@@ -0,0 +1,80 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:28
+
+from django.db import migrations, models
+
+# Versions that were hard-coded in GetlogoView before policies moved to the database
+INITIAL_POLICIES = {
+    "android": ["1.0.0", "1.2", "2.0"],
+    "ios": ["2.0", "2.3"],
+}
+
+
+def seed_version_policies(apps, schema_editor):
+    AppVersionPolicy = apps.get_model("app_settings", "AppVersionPolicy")
+    for platform, versions in INITIAL_POLICIES.items():
+        for version in versions:
+            AppVersionPolicy.objects.get_or_create(platform=platform, version=version)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_settings", "0002_appmedia_processing"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AppLaunchStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("platform", models.CharField(blank=True, max_length=20)),
+                ("app_version", models.CharField(blank=True, max_length=50)),
+                ("count", models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "App Launch Stat",
+                "verbose_name_plural": "App Launch Stats",
+                "ordering": ["-date", "platform", "app_version"],
+                "unique_together": {("date", "platform", "app_version")},
+            },
+        ),
+        migrations.CreateModel(
+            name="AppVersionPolicy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "platform",
+                    models.CharField(
+                        choices=[("android", "Android"), ("ios", "iOS")], max_length=20
+                    ),
+                ),
+                ("version", models.CharField(max_length=50)),
+                ("is_active", models.BooleanField(default=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "App Version Policy",
+                "verbose_name_plural": "App Version Policies",
+                "ordering": ["platform", "version"],
+                "unique_together": {("platform", "version")},
+            },
+        ),
+        migrations.RunPython(seed_version_policies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_settings", "0003_version_policy_launch_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="appmedia",
+            name="processing_claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,18 @@
-from django.db import models
+import copy
+import time
+import uuid
+
+from django.db import models, transaction
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 
+# Shared-cache key holding a token that changes whenever settings or media change
+SOLO_VERSION_CACHE_KEY = "app_settings:solo_version"
+
+# Process-local copy of the singleton, reused until the token changes or the TTL expires
+_solo_cache = {"obj": None, "version": None, "expires_at": 0.0}
+
 
 class AppSettings(models.Model):
     name = models.CharField(max_length=200)
@@ -21,19 +33,63 @@ class AppSettings(models.Model):
     def save(self, *args, **kwargs):
         self.pk = 1
         super().save(*args, **kwargs)
+        self.bump_solo_version()
 
     @classmethod
-    def get_solo(cls):
-        obj, created = cls.objects.get_or_create(
-            pk=1,
-            defaults={
-                'name': 'ISTI',
-                'description': '',
-                'terms': ''
-            }
-        )
+    def load_solo(cls):
+        """Fetch the singleton with its media from the database, creating it if needed."""
+        obj = cls.objects.prefetch_related('media').filter(pk=1).first()
+        if obj is None:
+            obj, created = cls.objects.get_or_create(
+                pk=1,
+                defaults={
+                    'name': 'ISTI',
+                    'description': '',
+                    'terms': ''
+                }
+            )
         return obj
 
+    @classmethod
+    def get_solo(cls):
+        """
+        Return the singleton from the process-local cache. It is reloaded when
+        another process bumps the shared version token or after
+        APP_SETTINGS_CACHE_TTL seconds. Callers get a shallow copy, so mutating
+        the result does not leak into other requests.
+        """
+        version = cache.get(SOLO_VERSION_CACHE_KEY)
+        cached = _solo_cache["obj"]
+
+        if (
+            cached is None
+            or version != _solo_cache["version"]
+            or time.monotonic() >= _solo_cache["expires_at"]
+        ):
+            cached = cls.load_solo()
+            _solo_cache.update(
+                obj=cached,
+                version=version,
+                expires_at=time.monotonic() + settings.APP_SETTINGS_CACHE_TTL,
+            )
+
+        return copy.copy(cached)
+
+    @staticmethod
+    def bump_solo_version():
+        """
+        Invalidate every process's cached singleton. The shared token changes
+        once the current transaction commits; bumped earlier, another process
+        could reload the old row and cache it under the new token.
+        """
+        _solo_cache["obj"] = None
+
+        def bump():
+            _solo_cache["obj"] = None
+            cache.set(SOLO_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+        transaction.on_commit(bump)
+
 
 class AppMedia(models.Model):
     KIND_CHOICES = [
@@ -41,6 +97,13 @@ class AppMedia(models.Model):
         ('YOUTUBE', 'YouTube'),
     ]
 
+    PROCESSING_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
     app_settings = models.ForeignKey(
         AppSettings,
         on_delete=models.CASCADE,
@@ -51,6 +114,19 @@ class AppMedia(models.Model):
     file = models.FileField(upload_to="settings/videos/", blank=True, null=True)
     url = models.URLField(blank=True, null=True)
     thumbnail = models.ImageField(upload_to="settings/thumbnails/", blank=True, null=True)
+
+    # Generated by the media pipeline (see media_pipeline.py)
+    poster = models.ImageField(upload_to="settings/posters/", blank=True, null=True)
+    rendition = models.FileField(upload_to="settings/renditions/", blank=True, null=True)
+    processing_status = models.CharField(
+        max_length=20,
+        choices=PROCESSING_STATUS_CHOICES,
+        blank=True,
+        db_index=True
+    )
+    processing_error = models.TextField(blank=True)
+    processing_claimed_at = models.DateTimeField(blank=True, null=True)
+
     order = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -60,6 +136,10 @@ class AppMedia(models.Model):
         verbose_name = "App Media"
         verbose_name_plural = "App Media"
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._original_file_name = self.file.name if self.file else None
+
     def __str__(self):
         return f"{self.title} ({self.kind})"
 
@@ -77,4 +157,55 @@ class AppMedia(models.Model):
 
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs) 
\ No newline at end of file
+
+        # A new or replaced MP4 file needs a fresh poster and rendition
+        current_file_name = self.file.name if self.file else None
+        if self.kind == 'MP4' and current_file_name != self._original_file_name:
+            self.poster = None
+            self.rendition = None
+            self.processing_status = 'pending'
+            self.processing_error = ''
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {
+                    'poster', 'rendition', 'processing_status', 'processing_error'
+                }
+
+        super().save(*args, **kwargs)
+        self._original_file_name = current_file_name 
+
+class AppVersionPolicy(models.Model):
+    PLATFORM_CHOICES = [
+        ('android', 'Android'),
+        ('ios', 'iOS'),
+    ]
+
+    platform = models.CharField(max_length=20, choices=PLATFORM_CHOICES)
+    version = models.CharField(max_length=50)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("platform", "version")
+        ordering = ["platform", "version"]
+        verbose_name = "App Version Policy"
+        verbose_name_plural = "App Version Policies"
+
+    def __str__(self):
+        return f"{self.platform} {self.version}"
+
+
+class AppLaunchStat(models.Model):
+    date = models.DateField()
+    platform = models.CharField(max_length=20, blank=True)
+    app_version = models.CharField(max_length=50, blank=True)
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("date", "platform", "app_version")
+        ordering = ["-date", "platform", "app_version"]
+        verbose_name = "App Launch Stat"
+        verbose_name_plural = "App Launch Stats"
+
+    def __str__(self):
+        return f"{self.date} {self.platform} {self.app_version}: {self.count}"
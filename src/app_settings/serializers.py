@@ -5,15 +5,25 @@ from .models import AppSettings, AppMedia
 class AppMediaSerializer(serializers.ModelSerializer):
     class Meta:
         model = AppMedia
-        fields = ['id', 'kind', 'title', 'file', 'url', 'thumbnail', 'order', 'is_active']
+        fields = [
+            'id', 'kind', 'title', 'file', 'url', 'thumbnail',
+            'poster', 'rendition', 'processing_status', 'order', 'is_active'
+        ]
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
         request = self.context.get('request')
         if request and instance.file:
             data['file'] = request.build_absolute_uri(instance.file.url)
+        if request and instance.poster:
+            data['poster'] = request.build_absolute_uri(instance.poster.url)
+        if request and instance.rendition:
+            data['rendition'] = request.build_absolute_uri(instance.rendition.url)
         if request and instance.thumbnail:
             data['thumbnail'] = request.build_absolute_uri(instance.thumbnail.url)
+        elif data.get('poster'):
+            # Fall back to the generated poster when no thumbnail was uploaded
+            data['thumbnail'] = data['poster']
         return data
 
 
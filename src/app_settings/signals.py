@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save
+
+from accounts.models import Student
+from .models import AppMedia, AppSettings, AppVersionPolicy
+from .stats import find_model, invalidate_about_stats
+from .versioning import clear_policy_cache
+
+
+def _invalidate_about_stats(sender, **kwargs):
+    invalidate_about_stats()
+
+
+def _clear_policy_cache(sender, **kwargs):
+    clear_policy_cache()
+
+
+def _bump_solo_version(sender, **kwargs):
+    AppSettings.bump_solo_version()
+
+
+def connect_signals():
+    """Drop cached app_settings data whenever the rows it is built from change."""
+    for model in [Student, find_model("Course"), find_model("Job")]:
+        if model is None:
+            continue
+        post_save.connect(_invalidate_about_stats, sender=model, dispatch_uid=f"about_stats_save_{model.__name__}")
+        post_delete.connect(_invalidate_about_stats, sender=model, dispatch_uid=f"about_stats_delete_{model.__name__}")
+
+    post_save.connect(_clear_policy_cache, sender=AppVersionPolicy, dispatch_uid="version_policy_save")
+    post_delete.connect(_clear_policy_cache, sender=AppVersionPolicy, dispatch_uid="version_policy_delete")
+
+    post_save.connect(_bump_solo_version, sender=AppMedia, dispatch_uid="app_media_save")
+    post_delete.connect(_bump_solo_version, sender=AppMedia, dispatch_uid="app_media_delete")
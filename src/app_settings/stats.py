@@ -0,0 +1,58 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+
+from accounts.models import Student
+
+ABOUT_STATS_CACHE_KEY = "app_settings:about_stats"
+
+
+def find_model(model_name):
+    """
+    Look up an installed model by class name. Course and Job live in optional
+    apps, so the about page must keep working when they are not installed.
+    """
+    for model in apps.get_models():
+        if model.__name__ == model_name:
+            return model
+    return None
+
+
+def compute_about_stats():
+    Course = find_model("Course")
+    Job = find_model("Job")
+
+    total_students = Student.objects.count()
+    total_courses = Course.objects.count() if Course else 0
+    students_with_jobs = (
+        Job.objects.filter(student__isnull=False).values('student').distinct().count()
+        if Job else 0
+    )
+    percentage_with_jobs = (
+        (students_with_jobs / total_students) * 100 if total_students > 0 else 0
+    )
+
+    return {
+        "total_students": total_students,
+        "total_courses": total_courses,
+        "students_with_jobs": students_with_jobs,
+        "percentage_with_jobs": round(percentage_with_jobs, 2),
+    }
+
+
+def get_about_stats():
+    """Return the cached stats snapshot, computing it on a miss."""
+    stats = cache.get(ABOUT_STATS_CACHE_KEY)
+    if stats is None:
+        stats = refresh_about_stats()
+    return stats
+
+
+def refresh_about_stats():
+    stats = compute_about_stats()
+    cache.set(ABOUT_STATS_CACHE_KEY, stats, settings.ABOUT_STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def invalidate_about_stats():
+    cache.delete(ABOUT_STATS_CACHE_KEY)
@@ -1 +1,227 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from app_settings import media_pipeline, models, versioning
+from app_settings.media_pipeline import (
+    claim_pending_media,
+    process_media,
+    requeue_stale_media,
+)
+from accounts.models import Student
+from app_settings.models import (
+    SOLO_VERSION_CACHE_KEY,
+    AppLaunchStat,
+    AppMedia,
+    AppSettings,
+    AppVersionPolicy,
+)
+from app_settings.stats import ABOUT_STATS_CACHE_KEY, get_about_stats
+from app_settings.versioning import LaunchCounter, is_version_supported
+
+FILE_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+def fake_ffmpeg_output(source_path, output_path):
+    with open(output_path, "wb") as f:
+        f.write(b"generated")
+
+
+@override_settings(STORAGES=FILE_STORAGES, MEDIA_ROOT=tempfile.mkdtemp())
+class MediaPipelineTests(TestCase):
+    def setUp(self):
+        self.settings_obj = AppSettings.load_solo()
+
+    def make_media(self, status="pending"):
+        media = AppMedia(app_settings=self.settings_obj, kind="MP4", processing_status=status)
+        media.file.save("clip.mp4", ContentFile(b"mp4 bytes"), save=False)
+        media.save()
+        return media
+
+    def test_claimed_media_gets_poster_and_rendition(self):
+        media = self.make_media()
+
+        [claimed] = claim_pending_media()
+        self.assertEqual(claimed.processing_status, "processing")
+        self.assertIsNotNone(claimed.processing_claimed_at)
+        self.assertEqual(list(claim_pending_media()), [])
+
+        with mock.patch.object(media_pipeline, "generate_poster", fake_ffmpeg_output), \
+                mock.patch.object(media_pipeline, "generate_rendition", fake_ffmpeg_output):
+            self.assertTrue(process_media(claimed))
+
+        media.refresh_from_db()
+        self.assertEqual(media.processing_status, "ready")
+        self.assertTrue(media.poster.name.endswith(".jpg"))
+        self.assertTrue(media.rendition.name.endswith("p.mp4"))
+
+    def test_any_error_marks_the_row_failed(self):
+        self.make_media()
+        [claimed] = claim_pending_media()
+
+        with mock.patch.object(media_pipeline, "generate_poster", side_effect=RuntimeError("boom")):
+            self.assertFalse(process_media(claimed))
+
+        claimed.refresh_from_db()
+        self.assertEqual(claimed.processing_status, "failed")
+        self.assertEqual(claimed.processing_error, "boom")
+
+    @override_settings(APP_MEDIA_CLAIM_TIMEOUT=60)
+    def test_stale_claims_are_requeued(self):
+        stale = self.make_media(status="processing")
+        fresh = self.make_media()
+        claim_pending_media()
+        AppMedia.objects.filter(pk=stale.pk).update(
+            processing_claimed_at=timezone.now() - timedelta(minutes=5)
+        )
+
+        self.assertEqual(requeue_stale_media(), 1)
+
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual(stale.processing_status, "pending")
+        self.assertEqual(fresh.processing_status, "processing")
+
+
+class SoloCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        models._solo_cache.update(obj=None, version=None, expires_at=0.0)
+        self.addCleanup(models._solo_cache.update, obj=None, version=None, expires_at=0.0)
+        AppSettings.load_solo()
+
+    def test_warm_cache_costs_no_queries(self):
+        AppSettings.get_solo()
+        with self.assertNumQueries(0):
+            solo = AppSettings.get_solo()
+        solo.name = "Changed in one request"
+        self.assertEqual(AppSettings.get_solo().name, "ISTI")
+
+    def test_save_invalidates_other_readers_once_committed(self):
+        AppSettings.get_solo()
+        # What another process still holds in memory
+        other_process = dict(models._solo_cache)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            solo = AppSettings.load_solo()
+            solo.name = "Renamed"
+            solo.save()
+            self.assertIsNone(cache.get(SOLO_VERSION_CACHE_KEY))
+        for callback in callbacks:
+            callback()
+
+        models._solo_cache.update(other_process)
+        self.assertEqual(AppSettings.get_solo().name, "Renamed")
+        with self.assertNumQueries(0):
+            AppSettings.get_solo()
+
+
+class AboutPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        models._solo_cache.update(obj=None, version=None, expires_at=0.0)
+        self.addCleanup(models._solo_cache.update, obj=None, version=None, expires_at=0.0)
+        self.url = reverse("settings:app-settings")
+
+    def test_matching_etag_returns_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_changed_setting_gets_a_new_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        solo = AppSettings.load_solo()
+        solo.description = "Now with evening batches"
+        solo.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data["details"]["description"], "Now with evening batches")
+
+    def test_student_changes_invalidate_the_stats(self):
+        self.assertEqual(get_about_stats()["total_students"], 0)
+        with self.assertNumQueries(0):
+            get_about_stats()
+
+        student = Student.objects.create(full_name="Asha")
+        self.assertIsNone(cache.get(ABOUT_STATS_CACHE_KEY))
+        self.assertEqual(get_about_stats()["total_students"], 1)
+
+        student.delete()
+        self.assertIsNone(cache.get(ABOUT_STATS_CACHE_KEY))
+        self.assertEqual(get_about_stats()["total_students"], 0)
+
+
+class VersionGateTests(TestCase):
+    def setUp(self):
+        versioning.clear_policy_cache()
+        self.addCleanup(versioning.clear_policy_cache)
+
+    def test_seeded_policies_match_the_old_hard_coded_versions(self):
+        seed = import_module("app_settings.migrations.0003_version_policy_launch_stats")
+        self.assertEqual(
+            versioning.get_supported_versions(),
+            {platform: set(versions) for platform, versions in seed.INITIAL_POLICIES.items()},
+        )
+        self.assertTrue(is_version_supported("Android", "1.2"))
+        self.assertFalse(is_version_supported("ios", "1.2"))
+        self.assertTrue(is_version_supported("web", "0.1"))
+
+    def test_policies_are_cached_until_they_change(self):
+        is_version_supported("android", "2.0")
+        with self.assertNumQueries(0):
+            is_version_supported("android", "9.9")
+
+        AppVersionPolicy.objects.create(platform="android", version="9.9")
+        self.assertTrue(is_version_supported("android", "9.9"))
+
+    def test_deactivating_every_policy_blocks_the_platform(self):
+        AppVersionPolicy.objects.filter(platform="ios").update(is_active=False)
+        versioning.clear_policy_cache()
+
+        self.assertFalse(is_version_supported("ios", "2.0"))
+        self.assertFalse(is_version_supported("ios", "9.9"))
+        self.assertTrue(is_version_supported("android", "2.0"))
+
+
+class LaunchCounterTests(TestCase):
+    @override_settings(APP_LAUNCH_FLUSH_INTERVAL=3600)
+    def test_launches_are_batched_until_flushed(self):
+        counter = LaunchCounter()
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                counter.record("Android", "2.0")
+            counter.record("ios", "2.3")
+        self.assertFalse(AppLaunchStat.objects.exists())
+
+        counter.flush()
+        counter.record("android", "2.0")
+        counter.flush()
+
+        today = timezone.now().date()
+        self.assertEqual(
+            dict(AppLaunchStat.objects.filter(date=today).values_list("platform", "count")),
+            {"android": 4, "ios": 1},
+        )
+
+    @override_settings(APP_LAUNCH_FLUSH_INTERVAL=0)
+    def test_flush_interval_triggers_a_write(self):
+        counter = LaunchCounter()
+        counter.record("android", "1.2")
+        self.assertEqual(AppLaunchStat.objects.get(app_version="1.2").count, 1)
@@ -0,0 +1,107 @@
+import atexit
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AppLaunchStat, AppVersionPolicy
+
+_policy_lock = threading.Lock()
+_policy_cache = {"expires_at": 0.0, "versions": {}}
+
+
+def get_supported_versions():
+    """
+    Return {platform: {active versions}} for every platform with policy rows,
+    reloaded from the database at most once per APP_VERSION_POLICY_CACHE_TTL
+    seconds. A platform whose policies are all inactive maps to an empty set.
+    """
+    if time.monotonic() >= _policy_cache["expires_at"]:
+        with _policy_lock:
+            if time.monotonic() >= _policy_cache["expires_at"]:
+                versions = {}
+                for platform, version, is_active in AppVersionPolicy.objects.values_list(
+                    "platform", "version", "is_active"
+                ):
+                    allowed = versions.setdefault(platform, set())
+                    if is_active:
+                        allowed.add(version)
+
+                _policy_cache["versions"] = versions
+                _policy_cache["expires_at"] = time.monotonic() + settings.APP_VERSION_POLICY_CACHE_TTL
+
+    return _policy_cache["versions"]
+
+
+def clear_policy_cache():
+    _policy_cache["expires_at"] = 0.0
+
+
+def is_version_supported(platform, app_version):
+    """
+    Platforms without any policy rows are not gated. Deactivating every
+    policy of a platform blocks all of its versions rather than ungating it.
+    """
+    if not platform or not app_version:
+        return True
+
+    allowed = get_supported_versions().get(platform.lower())
+    if allowed is None:
+        return True
+
+    return app_version in allowed
+
+
+class LaunchCounter:
+    """
+    Aggregates app launches per (date, platform, version) in memory and writes
+    them in one batch per flush interval instead of one write per request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._last_flush = time.monotonic()
+
+    def record(self, platform, app_version):
+        key = (
+            timezone.now().date(),
+            (platform or "").lower()[:20],
+            (app_version or "")[:50],
+        )
+
+        with self._lock:
+            self._counts[key] += 1
+            flush_due = time.monotonic() - self._last_flush >= settings.APP_LAUNCH_FLUSH_INTERVAL
+
+        if flush_due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._last_flush = time.monotonic()
+
+        for (day, platform, app_version), count in counts.items():
+            self._add(day, platform, app_version, count)
+
+    def _add(self, day, platform, app_version, count):
+        lookup = {"date": day, "platform": platform, "app_version": app_version}
+
+        if AppLaunchStat.objects.filter(**lookup).update(count=F("count") + count):
+            return
+
+        try:
+            with transaction.atomic():
+                AppLaunchStat.objects.create(count=count, **lookup)
+        except IntegrityError:
+            # Another worker created the row first
+            AppLaunchStat.objects.filter(**lookup).update(count=F("count") + count)
+
+
+launch_counter = LaunchCounter()
+atexit.register(launch_counter.flush)
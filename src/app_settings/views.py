@@ -3,34 +3,45 @@ from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from django.utils.cache import get_conditional_response, quote_etag
 from .models import AppSettings
-from accounts.models import Student
 from .serializers import AppSettingsSerializer
-import string
+from .stats import get_about_stats
+from .versioning import is_version_supported, launch_counter
+import hashlib
 
 class AppSettingsView(RetrieveAPIView):
     permission_classes = [AllowAny]
     serializer_class = AppSettingsSerializer
 
     def get_object(self):
-        # First ensure the settings exist
-        settings = AppSettings.get_solo()
-        # Then get it with prefetch_related to avoid N+1 queries
-        return AppSettings.objects.prefetch_related('media').get(pk=settings.pk)
+        # Settings with media prefetched, served from the process-local cache
+        return AppSettings.get_solo()
+
+    def get_etag(self, obj, stats):
+        """
+        Build the ETag from the underlying data rather than the rendered body,
+        because signed media URLs differ on every request.
+        """
+        media_state = [
+            (m.id, m.title, m.file.name, m.url, m.thumbnail.name, m.poster.name,
+             m.rendition.name, m.processing_status, m.order, m.is_active)
+            for m in obj.media.all()
+        ]
+        raw = repr((obj.updated_at.isoformat(), media_state, sorted(stats.items())))
+        return quote_etag(hashlib.md5(raw.encode()).hexdigest())
 
     def get(self, request, *args, **kwargs):
         obj = self.get_object()
+        stats = get_about_stats()
+        etag = self.get_etag(obj, stats)
+
+        # Skip serialization and URL signing when the client copy is current
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
         serializer = self.get_serializer(obj, context={'request': request})
-        
-        # Additional stats
-        total_students = Student.objects.count()
-        total_courses = Course.objects.count()
-        students_with_jobs = Job.objects.filter(student__isnull=False).values('student').distinct().count()
-        percentage_with_jobs = (
-            (students_with_jobs / total_students) * 100 if total_students > 0 else 0
-        )
 
         # Prepare sanitized response
         response_data = {
@@ -46,22 +57,22 @@ class AppSettingsView(RetrieveAPIView):
                 {
                     "displayname": "Total Student Count",
                     "icon": "switch.png",
-                    "value": str(total_students)
+                    "value": str(stats["total_students"])
                 },
                 {
                     "displayname": "Total Courses Offered",
                     "icon": "approveleave.png",
-                    "value": str(total_courses)
+                    "value": str(stats["total_courses"])
                 },
                 {
                     "displayname": "Total Offered Jobs",
                     "icon": "studentdetails.png",
-                    "value": str(students_with_jobs)
+                    "value": str(stats["students_with_jobs"])
                 },
                 {
                     "displayname": "% Students with Jobs",
                     "icon": "salaryslip.png",
-                    "value": str(round(percentage_with_jobs, 2))
+                    "value": str(stats["percentage_with_jobs"])
                 }
             ]
         }
@@ -69,7 +80,7 @@ class AppSettingsView(RetrieveAPIView):
         response = Response(response_data)
 
         # Add ETag and Last-Modified headers
-        response['ETag'] = f'"{obj.updated_at.isoformat()}"'
+        response['ETag'] = etag
         response['Last-Modified'] = obj.updated_at.strftime('%a, %d %b %Y %H:%M:%S GMT')
         
         return response
@@ -105,28 +116,14 @@ class GetlogoView(APIView):
         app_version = request.data.get("appversion")
         platform = request.data.get("platform")
 
-        # Get first record from AppSettings
-        app_setting = AppSettings.objects.first()
-        if not app_setting:
-            return Response({
-                "success": False,
-                "message": "App settings not found."
-            }, status=status.HTTP_404_NOT_FOUND)
+        app_setting = AppSettings.get_solo()
 
-        # Update fields if provided
-        if app_version:
-            app_setting.appversion = app_version
-        if platform:
-            app_setting.platform = platform
-        app_setting.save(update_fields=["appversion", "platform"])
+        # Count the launch in memory; flushed to AppLaunchStat in batches
+        if app_version or platform:
+            launch_counter.record(platform, app_version)
 
         # Validate version rules
-        invalid_version = False
-        if platform and app_version:
-            if platform.lower() == "android" and app_version not in ["1.0.0", "1.2","2.0"]:
-                invalid_version = True
-            elif platform.lower() == "ios" and app_version not in ["2.0", "2.3"]:
-                invalid_version = True
+        invalid_version = not is_version_supported(platform, app_version)
 
         if invalid_version:
             return Response({
@@ -56,6 +56,8 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = "accounts.User"
 
 MIDDLEWARE = [
+    "web.middleware.MetricsMiddleware",
+    "web.middleware.QueryStatsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -135,6 +137,52 @@ else:  # sqlite (default)
     }
 
 
+# Cache
+# Shared across workers when REDIS_URL is set, otherwise per-process memory
+REDIS_URL = env("REDIS_URL", default="")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Upper bound (seconds) on how long a process reuses its cached AppSettings singleton
+APP_SETTINGS_CACHE_TTL = int(env("APP_SETTINGS_CACHE_TTL", default="300"))
+
+# About page stats snapshot lifetime (seconds)
+ABOUT_STATS_CACHE_TIMEOUT = int(env("ABOUT_STATS_CACHE_TIMEOUT", default="300"))
+
+# App version gate: policy reload interval and launch counter flush interval (seconds)
+APP_VERSION_POLICY_CACHE_TTL = int(env("APP_VERSION_POLICY_CACHE_TTL", default="60"))
+APP_LAUNCH_FLUSH_INTERVAL = int(env("APP_LAUNCH_FLUSH_INTERVAL", default="60"))
+
+# Per-request database query stats (web.middleware.QueryStatsMiddleware):
+# X-DB-Query-* response headers, one log line per request, and failing the
+# request when a view goes over its budget in QUERY_BUDGETS_FILE (tests)
+QUERY_STATS_HEADERS = env("QUERY_STATS_HEADERS", default="0") == "1"
+QUERY_STATS_LOG = env("QUERY_STATS_LOG", default="0") == "1"
+QUERY_BUDGET_ENFORCE = env("QUERY_BUDGET_ENFORCE", default="0") == "1"
+QUERY_BUDGETS_FILE = BASE_DIR / "src" / "web" / "query_budgets.json"
+TEST_RUNNER = "web.test_runner.QueryBudgetTestRunner"
+
+# Prometheus-style metrics on /metrics (core.telemetry). Scrapers send
+# "Authorization: Bearer <METRICS_TOKEN>"; the endpoint is a 404 while it is empty.
+# Workers write their series to METRICS_DIR (host local, emptied on deploy) every
+# METRICS_FLUSH_INTERVAL seconds; without it each process only reports itself
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+METRICS_DIR = env("METRICS_DIR", default="")
+METRICS_FLUSH_INTERVAL = float(env("METRICS_FLUSH_INTERVAL", default="5"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -205,11 +253,83 @@ GOOGLE_OAUTH_CLIENT_ID_IOS = env("GOOGLE_OAUTH_CLIENT_ID_IOS", default="")
 
 # GEMINI
 GEMINI_API_KEY = env("GEMINI_API_KEY")
+# Gemini guards per model, shared across workers through the cache: concurrent
+# calls, calls per rate window, circuit breaker (transient failures per window,
+# open seconds)
+GEMINI_MAX_CONCURRENCY = int(env("GEMINI_MAX_CONCURRENCY", default="4"))
+GEMINI_RATE_LIMIT = int(env("GEMINI_RATE_LIMIT", default="60"))
+GEMINI_RATE_WINDOW = int(env("GEMINI_RATE_WINDOW", default="60"))
+GEMINI_ACQUIRE_TIMEOUT = float(env("GEMINI_ACQUIRE_TIMEOUT", default="10"))
+GEMINI_CALL_LEASE = int(env("GEMINI_CALL_LEASE", default="120"))
+GEMINI_BREAKER_THRESHOLD = int(env("GEMINI_BREAKER_THRESHOLD", default="5"))
+GEMINI_BREAKER_WINDOW = int(env("GEMINI_BREAKER_WINDOW", default="60"))
+GEMINI_BREAKER_COOLDOWN = int(env("GEMINI_BREAKER_COOLDOWN", default="30"))
+# Last good response per prompt, served while Gemini is unavailable
+GEMINI_RESPONSE_CACHE_TIMEOUT = int(env("GEMINI_RESPONSE_CACHE_TIMEOUT", default="86400"))
+# Estimated input tokens of scraped website text sent to Gemini per analysis
+GEMINI_WEBSITE_TOKEN_BUDGET = int(env("GEMINI_WEBSITE_TOKEN_BUDGET", default="1500"))
+# google.generativeai transport ("grpc" or "rest"); empty uses the SDK default
+GEMINI_TRANSPORT = env("GEMINI_TRANSPORT", default="")
+# Short repair prompts sent when a JSON response fails validation
+GEMINI_JSON_REPAIR_ATTEMPTS = int(env("GEMINI_JSON_REPAIR_ATTEMPTS", default="1"))
+
+# Websites fetched and analyzed in parallel per batch analysis request; capped
+# at half of GEMINI_MAX_CONCURRENCY so interactive analyses keep a slot
+BRAND_BATCH_CONCURRENCY = int(env("BRAND_BATCH_CONCURRENCY", default="2"))
+BRAND_BATCH_MAX_WEBSITES = int(env("BRAND_BATCH_MAX_WEBSITES", default="25"))
+
+# App media pipeline (poster + low bitrate rendition for MP4 uploads)
+FFMPEG_BINARY = env("FFMPEG_BINARY", default="ffmpeg")
+APP_MEDIA_RENDITION_HEIGHT = int(env("APP_MEDIA_RENDITION_HEIGHT", default="480"))
+APP_MEDIA_RENDITION_BITRATE = env("APP_MEDIA_RENDITION_BITRATE", default="800k")
+# Claims held longer than this (seconds) belong to a crashed worker and are re-queued
+APP_MEDIA_CLAIM_TIMEOUT = int(env("APP_MEDIA_CLAIM_TIMEOUT", default="3600"))
 
 # Eleven Labs
 ELEVENLABS_API_KEY = env("ELEVENLABS_API_KEY")
 ELEVENLABS_AGENT_ID = env("ELEVENLABS_AGENT_ID")
 ELEVENLABS_AGENT_PHONE_NUMBER_ID = env("ELEVENLABS_AGENT_PHONE_NUMBER_ID")
+# Webhook HMAC secret; every call event is rejected while it is empty
+ELEVENLABS_WEBHOOK_SECRET = env("ELEVENLABS_WEBHOOK_SECRET", default="")
+ELEVENLABS_WEBHOOK_TOLERANCE = int(env("ELEVENLABS_WEBHOOK_TOLERANCE", default="1800"))
+# Queued webhook events claimed longer than this (seconds) are re-queued
+CALL_EVENT_CLAIM_TIMEOUT = int(env("CALL_EVENT_CLAIM_TIMEOUT", default="300"))
+ELEVENLABS_REQUEST_TIMEOUT = int(env("ELEVENLABS_REQUEST_TIMEOUT", default="30"))
+# Outbound campaign limits; keep these at or below the provider plan's limits
+ELEVENLABS_MAX_CONCURRENT_CALLS = int(env("ELEVENLABS_MAX_CONCURRENT_CALLS", default="5"))
+ELEVENLABS_CALLS_PER_SECOND = float(env("ELEVENLABS_CALLS_PER_SECOND", default="1"))
+CALL_CAMPAIGN_MAX_ATTEMPTS = int(env("CALL_CAMPAIGN_MAX_ATTEMPTS", default="3"))
+CALL_CAMPAIGN_RETRY_BACKOFF = int(env("CALL_CAMPAIGN_RETRY_BACKOFF", default="60"))
+CALL_CAMPAIGN_ACTIVE_CALL_WINDOW = int(env("CALL_CAMPAIGN_ACTIVE_CALL_WINDOW", default="900"))
+# Calls left in "dialing" longer than this (seconds) belong to a crashed dispatcher
+CALL_CAMPAIGN_CLAIM_TIMEOUT = int(env("CALL_CAMPAIGN_CLAIM_TIMEOUT", default="600"))
+# Followup reminders: attempts per due item, and how long a claim may stay in processing
+FOLLOWUP_REMINDER_MAX_ATTEMPTS = int(env("FOLLOWUP_REMINDER_MAX_ATTEMPTS", default="3"))
+FOLLOWUP_REMINDER_CLAIM_TIMEOUT = int(env("FOLLOWUP_REMINDER_CLAIM_TIMEOUT", default="600"))
+# Seconds before a failed reminder is retried, doubled on every further attempt
+FOLLOWUP_REMINDER_RETRY_BACKOFF = int(env("FOLLOWUP_REMINDER_RETRY_BACKOFF", default="300"))
+# Country calling code assumed for lead phone numbers entered without one
+DEFAULT_PHONE_COUNTRY_CODE = env("DEFAULT_PHONE_COUNTRY_CODE", default="1")
+
+# Cached brand payloads for the Brand API; keyed by Brand.updated_at
+BRAND_CONTEXT_CACHE_TIMEOUT = int(env("BRAND_CONTEXT_CACHE_TIMEOUT", default="3600"))
+
+# Parallel Gemini generations for the nightly precompute_daily_posts job
+DAILY_POSTS_CONCURRENCY = int(env("DAILY_POSTS_CONCURRENCY", default="4"))
+
+# Zoho CRM lead sync; point the URLs at a local mock server in tests
+ZOHO_API_BASE_URL = env("ZOHO_API_BASE_URL", default="https://www.zohoapis.com")
+ZOHO_ACCOUNTS_URL = env("ZOHO_ACCOUNTS_URL", default="https://accounts.zoho.com")
+ZOHO_CLIENT_ID = env("ZOHO_CLIENT_ID", default="")
+ZOHO_CLIENT_SECRET = env("ZOHO_CLIENT_SECRET", default="")
+ZOHO_REFRESH_TOKEN = env("ZOHO_REFRESH_TOKEN", default="")
+ZOHO_REQUEST_TIMEOUT = int(env("ZOHO_REQUEST_TIMEOUT", default="30"))
+ZOHO_SYNC_PAGE_SIZE = int(env("ZOHO_SYNC_PAGE_SIZE", default="200"))
+# Shared secret Zoho sends in the X-Zoho-Webhook-Token header; webhooks are
+# rejected while it is empty. Synced leads belong to ZOHO_LEADS_USER_ID
+# (Lead's default user when empty), never to a user named in the payload
+ZOHO_WEBHOOK_SECRET = env("ZOHO_WEBHOOK_SECRET", default="")
+ZOHO_LEADS_USER_ID = env("ZOHO_LEADS_USER_ID", default="")
 
 # CORS Configuration
 CORS_ALLOW_ALL_ORIGINS = True  # For development only
@@ -4,3 +4,5 @@ ALLOWED_HOSTS = ["*"]
 INSTALLED_APPS += ["django_extensions"]
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 CORS_ALLOW_ALL_ORIGINS = True
+QUERY_STATS_HEADERS = True
+CORS_EXPOSE_HEADERS = ["X-DB-Query-Count", "X-DB-Query-Time-Ms"]
@@ -3,3 +3,4 @@ DEBUG = False
 ALLOWED_HOSTS = ["api.example.com"]
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 SECURE_HSTS_SECONDS = 31536000
+QUERY_STATS_LOG = True
@@ -3,8 +3,26 @@ from storages.backends.gcloud import GoogleCloudStorage
 from django.conf import settings
 from google.cloud import storage as gcs
 
+from core.telemetry import upstream_call
+
 class PrivateMediaStorage(GoogleCloudStorage):
     """GCS backend that returns short-lived signed URLs (bucket stays private)."""
+    def _save(self, name, content):
+        with upstream_call("gcs", "save"):
+            return super()._save(name, content)
+
+    def _open(self, name, mode="rb"):
+        with upstream_call("gcs", "open"):
+            return super()._open(name, mode)
+
+    def delete(self, name):
+        with upstream_call("gcs", "delete"):
+            return super().delete(name)
+
+    def exists(self, name):
+        with upstream_call("gcs", "exists"):
+            return super().exists(name)
+
     def url(self, name):
         client = gcs.Client(
             project=getattr(settings, "GS_PROJECT_ID", None),
@@ -14,8 +32,9 @@ class PrivateMediaStorage(GoogleCloudStorage):
         # name is relative to self.location (e.g., "docs/file.pdf")
         path = f"{self.location.rstrip('/')}/{name.lstrip('/')}" if self.location else name
         ttl = int(getattr(settings, "MEDIA_SIGNED_URL_TTL_MINUTES", 15))
-        return bucket.blob(path).generate_signed_url(
-            version="v4",
-            expiration=timedelta(minutes=ttl),
-            method="GET",
-        )
+        with upstream_call("gcs", "sign_url"):
+            return bucket.blob(path).generate_signed_url(
+                version="v4",
+                expiration=timedelta(minutes=ttl),
+                method="GET",
+            )
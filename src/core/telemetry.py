@@ -0,0 +1,362 @@
+"""
+Prometheus-style runtime metrics: counters, gauges and histograms kept in
+memory per process and served by the /metrics view in the text exposition
+format.
+
+With METRICS_DIR set, every process writes its series to its own file in
+that directory every METRICS_FLUSH_INTERVAL seconds and /metrics merges the
+files, so one scrape covers all gunicorn workers of the host. Counters of
+exited workers are folded into an archive file so totals never go down;
+gauges only count live processes.
+"""
+import atexit
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+UPSTREAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100)
+
+ARCHIVE_FILE = "archive.json"
+LOCK_FILE = ".lock"
+
+logger = logging.getLogger(__name__)
+
+
+class Registry:
+    """Metric definitions plus this process's values, {name: {label values: value}}."""
+
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+        # The flusher thread and /metrics both write this process's file
+        self._flush_lock = threading.Lock()
+        self._values = {}
+        self._pid = None
+        self._path = None
+        self._flusher = None
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def _check_process(self):
+        # Forked workers (gunicorn --preload) must not report the parent's values
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._values = {}
+            self._path = None
+            self._flusher = None
+            self._flush_lock = threading.Lock()
+
+    def update(self, name, labels, fn):
+        with self._lock:
+            self._check_process()
+            series = self._values.setdefault(name, {})
+            series[labels] = fn(series.get(labels))
+        if self._flusher is None and settings.METRICS_DIR:
+            self._start_flusher()
+
+    def snapshot(self):
+        with self._lock:
+            self._check_process()
+            return {
+                name: {labels: _copy(value) for labels, value in series.items()}
+                for name, series in self._values.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    # Multi-process support
+
+    def _start_flusher(self):
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            if self._pid != os.getpid():
+                return
+            try:
+                self.flush()
+            except OSError:
+                # Keep flushing; the next interval may succeed
+                logger.exception("Could not write metrics to %s", settings.METRICS_DIR)
+
+    def process_file(self):
+        """This process's file in METRICS_DIR, "<pid>-<random>.json"."""
+        self._check_process()
+        if self._path is None:
+            self._path = Path(settings.METRICS_DIR) / f"{self._pid}-{uuid.uuid4().hex[:8]}.json"
+        return self._path
+
+    def flush(self):
+        if not settings.METRICS_DIR:
+            return
+        with self._flush_lock:
+            path = self.process_file()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _write_json(path, _dump(self.snapshot()))
+
+    def collect(self):
+        """{name: {label values: value}} for this process, or all processes with METRICS_DIR."""
+        if not settings.METRICS_DIR:
+            return self.snapshot()
+
+        self.flush()
+        directory = Path(settings.METRICS_DIR)
+        merged = {}
+        with open(directory / LOCK_FILE, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+            archive_path = directory / ARCHIVE_FILE
+            archive = _load(archive_path) if archive_path.exists() else {}
+            archived = False
+
+            for path in directory.glob("*-*.json"):
+                try:
+                    values = _load(path)
+                except (OSError, ValueError):
+                    continue
+                if _process_alive(path):
+                    self._merge(merged, values, gauges=True)
+                else:
+                    # Exited worker: keep its counts, drop its gauges
+                    self._merge(archive, values, gauges=False)
+                    path.unlink(missing_ok=True)
+                    archived = True
+
+            if archived:
+                _write_json(archive_path, _dump(archive))
+            self._merge(merged, archive, gauges=False)
+
+        return merged
+
+    def _merge(self, into, values, gauges):
+        for name, series in values.items():
+            metric = self.metrics.get(name)
+            if metric is None or (metric.kind == "gauge" and not gauges):
+                continue
+            target = into.setdefault(name, {})
+            for labels, value in series.items():
+                target[labels] = metric.combine(target.get(labels), value)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        values = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, value in sorted(values.get(name, {}).items()):
+                lines.extend(metric.samples(dict(zip(metric.labelnames, labels)), value))
+        return "\n".join(lines) + "\n"
+
+
+def _copy(value):
+    return list(value) if isinstance(value, list) else value
+
+
+def _dump(values):
+    return {
+        name: [[list(labels), value] for labels, value in series.items()]
+        for name, series in values.items()
+    }
+
+
+def _load(path):
+    data = json.loads(Path(path).read_text())
+    return {
+        name: {tuple(labels): value for labels, value in series}
+        for name, series in data.items()
+    }
+
+
+def _write_json(path, data):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
+
+
+def _process_alive(path):
+    pid = int(path.name.split("-", 1)[0])
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+registry = Registry()
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        registry.register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def combine(self, current, value):
+        return (current or 0) + value
+
+    def samples(self, labels, value):
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}"]
+
+    def value(self, **labels):
+        """Current value in this process (tests)."""
+        return registry.snapshot().get(self.name, {}).get(self._key(labels))
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        registry.update(self.name, self._key(labels), lambda v: (v or 0) + amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        registry.update(self.name, self._key(labels), lambda v: (v or 0) + amount)
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        registry.update(self.name, self._key(labels), lambda v: value)
+
+
+class Histogram(Metric):
+    """Values are [count per bucket..., count above the last bucket, sum]."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, amount, **labels):
+        index = next((i for i, bound in enumerate(self.buckets) if amount <= bound), len(self.buckets))
+
+        def add(value):
+            value = value or [0] * (len(self.buckets) + 2)
+            value[index] += 1
+            value[-1] += amount
+            return value
+
+        registry.update(self.name, self._key(labels), add)
+
+    def combine(self, current, value):
+        if current is None:
+            return list(value)
+        return [a + b for a, b in zip(current, value)]
+
+    def samples(self, labels, value):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), value[:-1]):
+            cumulative += count
+            bucket_labels = {**labels, "le": _format_value(bound)}
+            lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(value[-1])}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+# HTTP requests, recorded by web.middleware.MetricsMiddleware. `route` is the
+# resolved view name, "unmatched" for paths no view answers.
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status code", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"]
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served")
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries per HTTP request", ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+HTTP_REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds", "Database time per HTTP request", ["route"]
+)
+
+# Calls to external services (gemini, elevenlabs, gcs, google_oauth)
+UPSTREAM_DURATION = Histogram(
+    "upstream_request_duration_seconds", "Latency of calls to external services",
+    ["upstream", "operation"], buckets=UPSTREAM_BUCKETS,
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors_total", "Failed calls to external services", ["upstream", "operation"]
+)
+
+
+class UpstreamCall:
+    def __init__(self):
+        self.failed = False
+
+
+@contextmanager
+def upstream_call(upstream, operation, expected=()):
+    """
+    Time a call to an external service. Exceptions count as errors unless
+    they are one of `expected` (the service answering "no", e.g. an invalid
+    token); set `.failed` on the yielded object for error responses that do
+    not raise.
+    """
+    call = UpstreamCall()
+    started = time.perf_counter()
+    try:
+        yield call
+    except expected:
+        raise
+    except Exception:
+        call.failed = True
+        raise
+    finally:
+        UPSTREAM_DURATION.observe(time.perf_counter() - started, upstream=upstream, operation=operation)
+        if call.failed:
+            UPSTREAM_ERRORS.inc(upstream=upstream, operation=operation)
+
+
+atexit.register(registry.flush)
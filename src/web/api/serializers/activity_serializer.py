@@ -0,0 +1,8 @@
+from rest_framework import serializers
+from web.models.activity import LeadActivity
+
+
+class LeadActivitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LeadActivity
+        fields = ("id", "lead", "kind", "object_id", "label", "summary", "created_at")
@@ -0,0 +1,20 @@
+from rest_framework import serializers
+from web.models.campaign import CallCampaign
+
+
+class CallCampaignSerializer(serializers.ModelSerializer):
+    pending_calls = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CallCampaign
+        fields = "__all__"
+        read_only_fields = ("user", "total_calls", "dialed_calls", "failed_calls")
+
+    def get_pending_calls(self, obj):
+        return max(obj.total_calls - obj.dialed_calls - obj.failed_calls, 0)
+
+    def validate_status(self, value):
+        # Completion is set by the dispatcher, clients only pause and resume
+        if value == "completed":
+            raise serializers.ValidationError("Campaigns complete automatically.")
+        return value
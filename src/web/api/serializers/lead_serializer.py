@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from web.models.lead import Lead, LeadFollowUp
+from web.models.payload_blob import PayloadBlob
 
 
 class LeadSerializer(serializers.ModelSerializer):
@@ -10,6 +11,23 @@ class LeadSerializer(serializers.ModelSerializer):
 
 
 class LeadFollowUpSerializer(serializers.ModelSerializer):
+    # Accepted on write and stored as a PayloadBlob; read it via the conversation endpoint
+    conversation_json = serializers.JSONField(required=False, allow_null=True, write_only=True)
+    has_conversation = serializers.SerializerMethodField()
+
     class Meta:
         model = LeadFollowUp
-        fields = "__all__"
\ No newline at end of file
+        exclude = ("conversation",)
+        read_only_fields = (
+            "call_event", "reminder_status", "reminder_attempts",
+            "reminder_retry_at", "reminder_claimed_at", "reminder_error",
+        )
+
+    def get_has_conversation(self, obj):
+        return obj.conversation_id is not None
+
+    def create(self, validated_data):
+        conversation_json = validated_data.pop("conversation_json", None)
+        if conversation_json is not None:
+            validated_data["conversation"] = PayloadBlob.store(conversation_json)
+        return super().create(validated_data)
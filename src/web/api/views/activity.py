@@ -0,0 +1,41 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.pagination import CursorPagination
+
+from web.models.lead import Lead
+from web.models.activity import LeadActivity
+from web.api.serializers.activity_serializer import LeadActivitySerializer
+
+
+class ActivityCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = "limit"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+
+class ActivityListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def paginate(self, request, queryset):
+        paginator = ActivityCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(LeadActivitySerializer(page, many=True).data)
+
+
+class LeadActivityView(ActivityListView):
+    """Followups and calls of one lead, newest first."""
+
+    def get(self, request, lead_id):
+        if not Lead.objects.filter(id=lead_id, user=request.user).exists():
+            return Response({"error": "Lead not found"}, status=404)
+
+        return self.paginate(request, LeadActivity.objects.filter(lead_id=lead_id))
+
+
+class RecentActivityView(ActivityListView):
+    """Latest activity across all of the user's leads."""
+
+    def get(self, request):
+        return self.paginate(request, LeadActivity.objects.filter(user=request.user))
@@ -0,0 +1,54 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+
+from web.models.campaign import CallCampaign
+from web.api.serializers.campaign_serializer import CallCampaignSerializer
+from web.services.call_campaigns import queue_campaign_calls
+
+
+class CallCampaignListCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        campaigns = CallCampaign.objects.filter(user=request.user).order_by("-created_at")
+        serializer = CallCampaignSerializer(campaigns, many=True)
+        return Response(serializer.data)
+
+    def post(self, request):
+        serializer = CallCampaignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        campaign = serializer.save(user=request.user)
+
+        # Calls are dialed by the dispatch_call_campaigns worker
+        queue_campaign_calls(campaign)
+
+        return Response(CallCampaignSerializer(campaign).data, status=status.HTTP_201_CREATED)
+
+
+class CallCampaignDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self, request, campaign_id):
+        return CallCampaign.objects.filter(id=campaign_id, user=request.user).first()
+
+    def get(self, request, campaign_id):
+        campaign = self.get_object(request, campaign_id)
+        if not campaign:
+            return Response({"error": "Campaign not found"}, status=404)
+
+        return Response(CallCampaignSerializer(campaign).data)
+
+    def patch(self, request, campaign_id):
+        campaign = self.get_object(request, campaign_id)
+        if not campaign:
+            return Response({"error": "Campaign not found"}, status=404)
+
+        # Only the name and pause / resume are editable once calls are queued
+        data = {k: v for k, v in request.data.items() if k in ("name", "status")}
+        serializer = CallCampaignSerializer(campaign, data=data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(serializer.data)
@@ -2,12 +2,16 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.db import transaction
 from django.utils import timezone
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 
 from web.models.lead import Lead, LeadFollowUp, LeadCallLog
+from web.models.payload_blob import PayloadBlob
 from web.api.serializers.lead_serializer import LeadSerializer, LeadFollowUpSerializer
 from web.services.elevenlabs import start_ai_call
+from web.services.call_events import enqueue_call_event, verify_elevenlabs_signature
+from web.services.zoho_sync import upsert_zoho_leads, verify_zoho_webhook, zoho_leads_user_id
 
 class CreateLeadView(APIView):
     permission_classes = [IsAuthenticated]
@@ -73,20 +77,19 @@ class ZohoLeadWebhookView(APIView):
     permission_classes = []
 
     def post(self, request):
+        if not verify_zoho_webhook(request.headers.get("X-Zoho-Webhook-Token")):
+            return Response({"error": "Invalid webhook token"}, status=status.HTTP_401_UNAUTHORIZED)
+
         data = request.data
 
-        # map Zoho fields safely
-        lead = Lead.objects.create(
-            name=data.get("Full_Name") or data.get("Last_Name"),
-            email=data.get("Email"),
-            phone=data.get("Phone"),
-            company=data.get("Company"),
-            source="zoho",
-            zoho_lead_id=data.get("id"),
-            user_id=data.get("user_id")  # you may map properly
-        )
+        if not data.get("id"):
+            return Response({"error": "Zoho lead id is required"}, status=400)
+
+        # Upsert on (user, zoho_lead_id); redelivered webhooks write nothing.
+        # The owner comes from the integration settings, not from the payload.
+        result = upsert_zoho_leads([data], zoho_leads_user_id())
 
-        return Response({"status": "success"})
+        return Response({"status": "success", **result})
 
 class LeadListView(APIView):
     permission_classes = [IsAuthenticated]
@@ -97,19 +100,99 @@ class LeadListView(APIView):
         return Response(serializer.data)
 
 class LeadDetailView(APIView):
+    """
+    Lead with one page of followups and call logs, built in a fixed number of
+    queries whatever the size of the lead's history. Heavy documents are left
+    out unless asked for with `?include=conversation,transcript`.
+    """
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, lead_id):
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+    INCLUDE_OPTIONS = {"conversation", "transcript"}
+
+    FOLLOWUP_FIELDS = (
+        "id", "lead_id", "followup_type", "notes", "next_followup_date",
+        "created_at", "conversation_id", "call_event_id", "reminder_status",
+        "reminder_attempts", "reminder_retry_at", "reminder_claimed_at", "reminder_error",
+    )
+    CALL_LOG_FIELDS = ("id", "lead_id", "call_id", "status", "created_at", "event_id", "response_id")
+
+    @staticmethod
+    def get_int_param(request, name, default, maximum=None):
         try:
-            lead = Lead.objects.get(id=lead_id, user=request.user)
-        except Lead.DoesNotExist:
+            value = int(request.query_params.get(name, default))
+        except (TypeError, ValueError):
+            value = default
+        value = max(value, 1)
+        return min(value, maximum) if maximum else value
+
+    @staticmethod
+    def count_subquery(model):
+        counts = (
+            model.objects.filter(lead=OuterRef("pk"))
+            .order_by()
+            .values("lead")
+            .annotate(total=Count("id"))
+            .values("total")
+        )
+        return Coalesce(Subquery(counts), 0)
+
+    def get(self, request, lead_id):
+        page_size = self.get_int_param(
+            request, "page_size", self.DEFAULT_PAGE_SIZE, self.MAX_PAGE_SIZE
+        )
+        followups_page = self.get_int_param(request, "followups_page", 1)
+        calls_page = self.get_int_param(request, "calls_page", 1)
+        include = {
+            item.strip() for item in request.query_params.get("include", "").split(",")
+        } & self.INCLUDE_OPTIONS
+
+        followups = LeadFollowUp.objects.only(*self.FOLLOWUP_FIELDS).order_by("-created_at", "-id")
+        if "conversation" in include:
+            followups = followups.select_related("conversation").only(
+                *self.FOLLOWUP_FIELDS, "conversation__encoding", "conversation__data"
+            )
+
+        calls = LeadCallLog.objects.only(*self.CALL_LOG_FIELDS).order_by("-created_at", "-id")
+        if "transcript" in include:
+            calls = calls.select_related("event__payload_blob", "response").only(
+                *self.CALL_LOG_FIELDS,
+                "event__payload_blob_id",
+                "event__payload_blob__encoding",
+                "event__payload_blob__data",
+                "response__encoding",
+                "response__data",
+            )
+
+        followups_start = (followups_page - 1) * page_size
+        calls_start = (calls_page - 1) * page_size
+
+        lead = (
+            Lead.objects.filter(id=lead_id, user=request.user)
+            .annotate(
+                followups_count=self.count_subquery(LeadFollowUp),
+                call_logs_count=self.count_subquery(LeadCallLog),
+            )
+            .prefetch_related(
+                Prefetch(
+                    "followups",
+                    queryset=followups[followups_start:followups_start + page_size],
+                    to_attr="followups_page",
+                ),
+                Prefetch(
+                    "call_logs",
+                    queryset=calls[calls_start:calls_start + page_size],
+                    to_attr="call_logs_page",
+                ),
+            )
+            .first()
+        )
+        if not lead:
             return Response({"error": "Lead not found"}, status=404)
 
         lead_data = LeadSerializer(lead).data
-        followups = LeadFollowUp.objects.filter(lead=lead).order_by("-created_at")
-        calls = lead.call_logs.all().order_by("-created_at")
-
-        lead_data["followups"] = LeadFollowUpSerializer(followups, many=True).data
+        lead_data["followups"] = LeadFollowUpSerializer(lead.followups_page, many=True).data
         lead_data["call_logs"] = [
             {
                 "id": c.id,
@@ -117,11 +200,64 @@ class LeadDetailView(APIView):
                 "status": c.status,
                 "created_at": c.created_at,
             }
-            for c in calls
+            for c in lead.call_logs_page
         ]
 
+        if "conversation" in include:
+            for item, followup in zip(lead_data["followups"], lead.followups_page):
+                item["conversation_json"] = followup.conversation_json
+        if "transcript" in include:
+            for item, call in zip(lead_data["call_logs"], lead.call_logs_page):
+                item["transcript"] = call.webhook_payload.get("transcript")
+
+        lead_data["pagination"] = {
+            "page_size": page_size,
+            "followups_page": followups_page,
+            "followups_count": lead.followups_count,
+            "calls_page": calls_page,
+            "call_logs_count": lead.call_logs_count,
+        }
+
         return Response(lead_data)
 
+class LeadFollowUpConversationView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, followup_id):
+        followup = (
+            LeadFollowUp.objects.select_related("conversation")
+            .filter(id=followup_id, lead__user=request.user)
+            .first()
+        )
+        if not followup:
+            return Response({"error": "Followup not found"}, status=404)
+
+        return Response({
+            "followup_id": followup.id,
+            "conversation_json": followup.conversation_json
+        })
+
+class CallLogTranscriptView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, call_log_id):
+        call_log = (
+            LeadCallLog.objects.select_related("event__payload_blob", "response")
+            .filter(id=call_log_id, lead__user=request.user)
+            .first()
+        )
+        if not call_log:
+            return Response({"error": "Call log not found"}, status=404)
+
+        payload = call_log.webhook_payload
+
+        return Response({
+            "call_log_id": call_log.id,
+            "call_id": call_log.call_id,
+            "transcript": payload.get("transcript"),
+            "payload": payload
+        })
+
 class InitiateAICallView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -143,7 +279,7 @@ class InitiateAICallView(APIView):
 
         # 🔥 update log with response
         call_log.call_id = call_id
-        call_log.raw_response = result
+        call_log.response = PayloadBlob.store(result)
         call_log.save()
 
         LeadFollowUp.objects.create(
@@ -158,62 +294,14 @@ class ElevenLabsWebhookView(APIView):
     authentication_classes = []
     permission_classes = []
 
-    @transaction.atomic
     def post(self, request):
-        data = request.data
-
-        metadata = data.get("metadata", {}) or {}
-        lead_id = metadata.get("lead_id")
-        call_id = data.get("call_id") or data.get("conversation_id")
-        status_val = data.get("status", "completed")
-
-        # =========================
-        # ✅ CASE 1 — existing lead
-        # =========================
-        lead = None
+        # Read the raw body before DRF parses it; the signature covers the exact bytes
+        body = request.body
 
-        if lead_id:
-            lead = Lead.objects.filter(id=lead_id).first()
+        if not verify_elevenlabs_signature(body, request.headers.get("ElevenLabs-Signature")):
+            return Response({"error": "Invalid signature"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        # =========================
-        # ✅ CASE 2 — inbound call
-        # =========================
-        if not lead:
-            phone = data.get("from_number") or data.get("caller")
-
-            lead = Lead.objects.create(
-                name=phone or "Inbound Lead",
-                phone=phone or "unknown",
-                source="inbound_call",
-                user_id=metadata.get("user_id")  # optional mapping
-            )
-
-        # =========================
-        # ✅ update call log
-        # =========================
-        if call_id:
-            call_log = LeadCallLog.objects.filter(call_id=call_id).first()
-
-            if call_log:
-                call_log.status = status_val
-                call_log.raw_response = data
-                call_log.save()
-            else:
-                LeadCallLog.objects.create(
-                    lead=lead,
-                    call_id=call_id,
-                    status=status_val,
-                    raw_response=data
-                )
-
-        # =========================
-        # ✅ store followup
-        # =========================
-        LeadFollowUp.objects.create(
-            lead=lead,
-            followup_type="ai_call",
-            notes=f"AI call {status_val}",
-            conversation_json=data
-        )
+        # Store only; process_call_events does the lead / call log work
+        event, created = enqueue_call_event(request.data)
 
-        return Response({"status": "stored"})
\ No newline at end of file
+        return Response({"status": "queued" if created else "duplicate"})
@@ -0,0 +1,47 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core import telemetry
+from web.services.lead_metrics import lead_metrics
+
+
+class LeadMetricsView(APIView):
+    """Lead pipeline figures for the dashboard, served from the daily rollup."""
+    permission_classes = [IsAuthenticated]
+
+    MAX_DAYS = 365
+
+    def get(self, request):
+        try:
+            days = int(request.query_params.get("days", 30))
+        except (TypeError, ValueError):
+            return Response({"error": "days must be a number"}, status=400)
+
+        days = min(max(days, 1), self.MAX_DAYS)
+
+        return Response(lead_metrics(request.user, days))
+
+
+def prometheus_metrics_view(request):
+    """
+    Runtime metrics in the Prometheus text format, for scrapers holding
+    METRICS_TOKEN. Plain Django view: no session, JWT or database lookups.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404
+
+    auth_header = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(auth_header.encode(), f"Bearer {token}".encode()):
+        response = HttpResponse("Unauthorized", status=401, content_type="text/plain")
+        response["WWW-Authenticate"] = "Bearer"
+        return response
+
+    return HttpResponse(
+        telemetry.registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,18 +1,82 @@
 import json
 
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 
-from web.utils.website_extractor import extract_website_text
-from web.utils.ai_image_generator import generate_post_image
-from web.services.gemini_webextractor import analyze_website
-from web.services.gemini_webextractor import analyze_brand_social_strategy, generate_daily_trending_posts
-from web.models import Brand
+from web.services.brand_analysis import analyze_site, analyze_sites, batch_concurrency, save_brand_analysis
+from web.services.brand_strategy import StrategyError, get_or_generate_strategy, payload_hash
+from web.services.gemini_client import GeminiUnavailable
+from web.services.structured_output import StructuredOutputError
+from web.services.daily_posts import DailyPostsError, generate_post_set, store_post_set
+from web.models import Brand, BrandStrategy, DailyPostSet
+from web.services.brand_context import get_brand_context, get_user_brand
+
+
+def ai_unavailable_response():
+    # Gemini is saturated or failing and there is no earlier answer to reuse
+    return Response(
+        {"error": "AI service is busy, please try again shortly"},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(settings.GEMINI_BREAKER_COOLDOWN)}
+    )
+
+
+def invalid_ai_response(error):
+    # Gemini answered, but not with valid JSON even after the repair pass
+    return Response(
+        {
+            "error": "Invalid Gemini JSON",
+            "raw_response": error.raw_response,
+            "errors": error.errors
+        },
+        status=status.HTTP_502_BAD_GATEWAY
+    )
+
+
+def brand_not_found():
+    return Response(
+        {"error": "Brand not found for this user"},
+        status=status.HTTP_404_NOT_FOUND
+    )
+
+
+def requested_brand_id(request):
+    """
+    (brand_id, error response) from the body or query string. A missing id
+    selects the user's first brand, as before multi-brand support.
+    """
+    brand_id = request.data.get("brand_id") or request.query_params.get("brand_id")
+    if brand_id in (None, ""):
+        return None, None
+    if not str(brand_id).isdigit():
+        return None, Response(
+            {"error": "brand_id must be a number"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return int(brand_id), None
+
+
+def batch_error_message(error):
+    if isinstance(error, GeminiUnavailable):
+        return "AI service is busy, please try again shortly"
+    if isinstance(error, StructuredOutputError):
+        return "Invalid Gemini JSON"
+    return "Analysis failed"
 
 
 class WebsiteMarketingAnalyzerView(APIView):
+    """
+    Analyzes `website` into a brand. With `brand_id` that brand is updated,
+    with `new_brand` the user's brand for the website is updated or a new one
+    is created; otherwise the user's first brand is updated, as before
+    multi-brand support.
+    """
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
@@ -25,57 +89,100 @@ class WebsiteMarketingAnalyzerView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        website_text = extract_website_text(website)
+        brand_id, error = requested_brand_id(request)
+        if error:
+            return error
 
-        gemini_response = analyze_website(
-            website_url=website,
-            website_text=website_text
-        )
+        new_brand = str(request.data.get("new_brand", "")).lower() in ("1", "true", "yes")
+        brand = None
+        if brand_id is not None:
+            brand = get_user_brand(user, brand_id)
+            if not brand:
+                return brand_not_found()
+        elif not new_brand:
+            brand = get_user_brand(user)
 
         try:
-            analysis_json = json.loads(gemini_response)
+            analysis_json = analyze_site(website)
+        except GeminiUnavailable:
+            return ai_unavailable_response()
+        except StructuredOutputError as e:
+            return invalid_ai_response(e)
+
+        try:
+            brand, created = save_brand_analysis(user, website, analysis_json, brand)
+        except IntegrityError:
+            return Response(
+                {"error": "Another brand already uses this website"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-            # 🔑 API-level rule: one brand per user (for now)
-            brand = Brand.objects.filter(user=user).order_by("id").first()
+        return Response(
+            {
+                "brand_id": brand.id,
+                "created": created,
+                "analysis": analysis_json
+            },
+            status=status.HTTP_200_OK
+        )
 
-            if brand:
-                # Update existing brand
-                brand.website = website
-                brand.entity_type = analysis_json.get("entity_type")
-                brand.industry = analysis_json.get("industry")
-                brand.analysis_data = analysis_json
-                brand.save()
+class BrandBatchAnalysisView(APIView):
+    """
+    Analyzes a list of `websites` on a bounded worker pool and streams one
+    JSON line per website as soon as it is done (application/x-ndjson),
+    followed by a summary line.
+    """
+    permission_classes = [IsAuthenticated]
 
-                created = False
-            else:
-                # Create first brand
-                brand = Brand.objects.create(
-                    user=user,
-                    website=website,
-                    entity_type=analysis_json.get("entity_type"),
-                    industry=analysis_json.get("industry"),
-                    analysis_data=analysis_json
-                )
-                created = True
+    def post(self, request):
+        websites = request.data.get("websites")
 
+        if not isinstance(websites, list) or not websites:
             return Response(
-                {
-                    "brand_id": brand.id,
-                    "created": created,
-                    "analysis": analysis_json
-                },
-                status=status.HTTP_200_OK
+                {"error": "websites must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
-        except Exception:
+        websites = list(dict.fromkeys(str(w).strip() for w in websites if str(w).strip()))
+        if len(websites) > settings.BRAND_BATCH_MAX_WEBSITES:
             return Response(
-                {
-                    "error": "Invalid Gemini JSON",
-                    "raw_response": gemini_response
-                },
-                status=status.HTTP_200_OK
+                {"error": f"At most {settings.BRAND_BATCH_MAX_WEBSITES} websites per batch"},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
+        return StreamingHttpResponse(
+            self.stream_results(request.user, websites),
+            content_type="application/x-ndjson"
+        )
+
+    def stream_results(self, user, websites):
+        succeeded = failed = 0
+
+        for website, analysis_json, error in analyze_sites(
+            websites, concurrency=batch_concurrency()
+        ):
+            if error is None:
+                try:
+                    brand, created = save_brand_analysis(user, website, analysis_json)
+                except Exception as e:
+                    error = e
+
+            if error is None:
+                succeeded += 1
+                line = {
+                    "website": website,
+                    "brand_id": brand.id,
+                    "created": created,
+                    "analysis": analysis_json
+                }
+            else:
+                failed += 1
+                line = {"website": website, "error": batch_error_message(error)}
+
+            yield json.dumps(line, default=str) + "\n"
+
+        yield json.dumps({"done": True, "succeeded": succeeded, "failed": failed}) + "\n"
+
 class BrandStyleUpdateView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -93,13 +200,13 @@ class BrandStyleUpdateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        brand = Brand.objects.filter(user=user).order_by("id").first()
+        brand_id, error = requested_brand_id(request)
+        if error:
+            return error
 
+        brand = get_user_brand(user, brand_id)
         if not brand:
-            return Response(
-                {"error": "Brand not found for this user"},
-                status=status.HTTP_404_NOT_FOUND
-            )
+            return brand_not_found()
 
         if photography_style is not None:
             brand.photography_style = photography_style
@@ -130,160 +237,175 @@ class BrandStyleUpdateView(APIView):
             status=status.HTTP_200_OK
         )
 
-class BrandDetailView(APIView):
+class BrandListView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def post(self, request):
-        user = request.user
-
-        brand = Brand.objects.filter(user=user).order_by("id").first()
-
-        if not brand:
-            return Response(
-                {"error": "Brand not found for this user"},
-                status=status.HTTP_404_NOT_FOUND
-            )
+    def get(self, request):
+        brands = (
+            Brand.objects.filter(user=request.user)
+            .order_by("id")
+            .values("id", "website", "entity_type", "industry", "created_at", "updated_at")
+        )
 
         return Response(
-            {
-                "brand_id": brand.id,
-                "website": brand.website,
-                "entity_type": brand.entity_type,
-                "industry": brand.industry,
+            {"brands": [{"brand_id": b.pop("id"), **b} for b in brands]},
+            status=status.HTTP_200_OK
+        )
 
-                "analysis_data": brand.analysis_data,
+class BrandDetailView(APIView):
+    permission_classes = [IsAuthenticated]
 
-                "styles": {
-                    "photography_style": brand.photography_style,
-                    "font_style": brand.font_style,
-                    "filter_style": brand.filter_style
-                },
+    def post(self, request):
+        brand_id, error = requested_brand_id(request)
+        if error:
+            return error
 
-                "created_at": brand.created_at,
-                "updated_at": brand.updated_at
-            },
-            status=status.HTTP_200_OK
-        )
+        context = get_brand_context(request.user, brand_id)
+        if not context:
+            return brand_not_found()
+
+        return Response(context["detail"], status=status.HTTP_200_OK)
 
 class BrandSocialStrategyView(APIView):
+    """
+    Returns the stored strategy for the brand's current details. Gemini is
+    only called when the details changed since the last version or with
+    `regenerate=true`; `version=<n>` returns an older version.
+    """
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
         user = request.user
 
-        brand = Brand.objects.filter(user=user).order_by("id").first()
+        brand_id, error = requested_brand_id(request)
+        if error:
+            return error
 
-        if not brand:
-            return Response(
-                {"error": "Brand not found for this user"},
-                status=status.HTTP_404_NOT_FOUND
-            )
+        context = get_brand_context(user, brand_id)
+        if not context:
+            return brand_not_found()
 
-        analysis_data = brand.analysis_data or {}
-
-        brand_payload = {
-            "website": brand.website,
-            "entity_type": brand.entity_type,
-            "industry": brand.industry,
+        version = request.data.get("version")
+        if version:
+            if not str(version).isdigit():
+                return Response(
+                    {"error": "version must be a number"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            strategy = BrandStrategy.objects.filter(
+                brand_id=context["brand_id"], version=version
+            ).first()
+            if not strategy:
+                return Response(
+                    {"error": "Strategy version not found"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            generated = False
+        else:
+            regenerate = str(request.data.get("regenerate", "")).lower() in ("1", "true", "yes")
+            try:
+                strategy, generated = get_or_generate_strategy(
+                    context["brand_id"], context["prompt_payload"], regenerate=regenerate
+                )
+            except StrategyError as e:
+                return invalid_ai_response(e)
+            except GeminiUnavailable:
+                return ai_unavailable_response()
 
-            "brand_summary": analysis_data.get("brand_summary"),
-            "target_audience": analysis_data.get("target_audience"),
-            "audience_pain_points": analysis_data.get("audience_pain_points"),
-            "value_proposition": analysis_data.get("value_proposition"),
-            "brand_tone": analysis_data.get("brand_tone"),
-            "content_pillars": analysis_data.get("content_pillars"),
+        return Response(
+            {
+                "brand_id": context["brand_id"],
+                "version": strategy.version,
+                "generated": generated,
+                "created_at": strategy.created_at,
+                "social_strategy": strategy.strategy
+            },
+            status=status.HTTP_200_OK
+        )
 
-            "photography_style": brand.photography_style,
-            "font_style": brand.font_style,
-            "filter_style": brand.filter_style
-        }
+class BrandStrategyHistoryView(APIView):
+    permission_classes = [IsAuthenticated]
 
-        gemini_response = analyze_brand_social_strategy(brand_payload)
+    def get(self, request):
+        brand_id, error = requested_brand_id(request)
+        if error:
+            return error
 
-        try:
-            strategy_json = json.loads(gemini_response)
+        context = get_brand_context(request.user, brand_id)
+        if not context:
+            return brand_not_found()
 
-            return Response(
-                {
-                    "brand_id": brand.id,
-                    "social_strategy": strategy_json
-                },
-                status=status.HTTP_200_OK
-            )
+        current_hash = payload_hash(context["prompt_payload"])
+        versions = (
+            BrandStrategy.objects.filter(brand_id=context["brand_id"])
+            .order_by("-version")
+            .values("version", "payload_hash", "created_at")
+        )
 
-        except Exception:
-            return Response(
-                {
-                    "error": "Invalid Gemini JSON",
-                    "raw_response": gemini_response
-                },
-                status=status.HTTP_200_OK
-            )
+        return Response(
+            {
+                "brand_id": context["brand_id"],
+                "versions": [
+                    {
+                        "version": v["version"],
+                        "matches_current_brand": v["payload_hash"] == current_hash,
+                        "created_at": v["created_at"],
+                    }
+                    for v in versions
+                ]
+            },
+            status=status.HTTP_200_OK
+        )
 
 class DailyTrendingPostsView(APIView):
+    """
+    Serves the post set precomputed by precompute_daily_posts. Only brands
+    created today, which the nightly job has not seen yet, are generated on
+    demand; others get their latest set until the next run.
+    """
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
         user = request.user
 
-        brand = Brand.objects.filter(user=user).order_by("id").first()
-
-        if not brand:
-            return Response(
-                {"error": "Brand not found for this user"},
-                status=status.HTTP_404_NOT_FOUND
-            )
-
-        analysis_data = brand.analysis_data or {}
-
-        brand_payload = {
-            "website": brand.website,
-            "entity_type": brand.entity_type,
-            "industry": brand.industry,
-
-            "brand_summary": analysis_data.get("brand_summary"),
-            "target_audience": analysis_data.get("target_audience"),
-            "audience_pain_points": analysis_data.get("audience_pain_points"),
-            "value_proposition": analysis_data.get("value_proposition"),
-            "brand_tone": analysis_data.get("brand_tone"),
-            "content_pillars": analysis_data.get("content_pillars"),
+        brand_id, error = requested_brand_id(request)
+        if error:
+            return error
 
-            "photography_style": brand.photography_style,
-            "font_style": brand.font_style,
-            "filter_style": brand.filter_style
-        }
+        context = get_brand_context(user, brand_id)
+        if not context:
+            return brand_not_found()
 
-        gemini_response = generate_daily_trending_posts(brand_payload)
-
-        try:
-            posts_json = json.loads(gemini_response)
-
-            posts = posts_json.get("daily_trending_posts", [])
+        today = timezone.localdate()
+        post_set = (
+            DailyPostSet.objects.filter(brand_id=context["brand_id"], date__lte=today)
+            .order_by("-date")
+            .first()
+        )
 
-            # 🔥 Generate image for each post
-            for post in posts:
-                image_prompt = post.get("image_prompt")
+        created_today = timezone.localdate(context["detail"]["created_at"]) == today
 
-                if image_prompt:
-                    try:
-                        post["generated_image_url"] = generate_post_image(image_prompt)
-                    except Exception as e:
-                        post["generated_image_url"] = None
-                        post["image_error"] = str(e)
+        if (post_set is None or post_set.date != today) and created_today:
+            try:
+                post_set = store_post_set(
+                    context["brand_id"], today, generate_post_set(context["prompt_payload"])
+                )
+            except DailyPostsError as e:
+                return invalid_ai_response(e)
+            except GeminiUnavailable:
+                return ai_unavailable_response()
 
+        if post_set is None:
             return Response(
-                {
-                    "brand_id": brand.id,
-                    "daily_posts": posts_json
-                },
-                status=status.HTTP_200_OK
+                {"error": "Daily posts are not ready yet"},
+                status=status.HTTP_404_NOT_FOUND
             )
 
-        except Exception:
-            return Response(
-                {
-                    "error": "Invalid Gemini JSON",
-                    "raw_response": gemini_response
-                },
-                status=status.HTTP_200_OK
-            )
\ No newline at end of file
+        return Response(
+            {
+                "brand_id": context["brand_id"],
+                "date": post_set.date,
+                "daily_posts": post_set.posts
+            },
+            status=status.HTTP_200_OK
+        )
@@ -7,6 +7,10 @@ class WebConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "web"
 
+    def ready(self):
+        from .signals import connect_signals
+        connect_signals()
+
 
 def google_client_id(request):
     return {"GOOGLE_CLIENT_ID": settings.GOOGLE_OAUTH_CLIENT_ID}
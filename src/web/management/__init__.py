@@ -0,0 +1 @@
+# Management package for web app
\ No newline at end of file
@@ -0,0 +1 @@
+# Commands package for web app
\ No newline at end of file
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from web.models.lead import Lead
+from web.utils.phone import normalize_phone
+
+
+class Command(BaseCommand):
+    help = 'Fill Lead.phone_e164 for existing leads, streaming in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of leads to normalize per transaction',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-normalize every lead, not only those without phone_e164',
+        )
+
+    def handle(self, *args, **options):
+        leads = Lead.objects.exclude(phone__isnull=True).exclude(phone="")
+        if not options['all']:
+            leads = leads.filter(phone_e164__isnull=True)
+
+        last_id = 0
+        scanned = updated = 0
+
+        while True:
+            batch = list(
+                leads.filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", "phone", "phone_e164")[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            scanned += len(batch)
+
+            changed = []
+            for lead in batch:
+                phone_e164 = normalize_phone(lead.phone)
+                if phone_e164 != lead.phone_e164:
+                    lead.phone_e164 = phone_e164
+                    changed.append(lead)
+
+            with transaction.atomic():
+                Lead.objects.bulk_update(changed, ["phone_e164"])
+            updated += len(changed)
+
+            self.stdout.write(f"Scanned {scanned} lead(s), normalized {updated}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Done: normalized {updated} of {scanned} lead(s)")
+        )
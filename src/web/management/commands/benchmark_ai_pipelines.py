@@ -0,0 +1,251 @@
+import json
+import math
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from web.models import Brand
+from web.services import gemini_client
+from web.testing.ai_stub import StubServer, routed_to
+from web.testing.replay import Faults, recording, replaying
+
+PIPELINES = ["analyze", "strategy", "daily"]
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the website analysis, social strategy and daily posts views '
+        'offline against recorded Gemini and HTTP interactions'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fixtures',
+            help='Cassette file to replay, or to write with --record',
+        )
+        parser.add_argument(
+            '--record',
+            action='store_true',
+            help='Run each pipeline once against the live services and save the interactions',
+        )
+        parser.add_argument(
+            '--website',
+            default='https://example.com',
+            help='Website analyzed when recording',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=['replay', 'stub'],
+            default='replay',
+            help='replay in-process, or through the local stub server over HTTP',
+        )
+        parser.add_argument(
+            '--pipelines',
+            default=','.join(PIPELINES),
+            help='Comma separated pipelines to run',
+        )
+        parser.add_argument('--requests', type=int, default=20, help='Requests per pipeline')
+        parser.add_argument('--concurrency', type=int, default=4, help='Requests in flight')
+        parser.add_argument(
+            '--latency', type=float, default=200, help='Simulated upstream latency (ms)'
+        )
+        parser.add_argument('--jitter', type=float, default=50, help='Latency jitter (ms)')
+        parser.add_argument(
+            '--failure-rate', type=float, default=0.0, help='Share of upstream calls that fail'
+        )
+        parser.add_argument('--seed', type=int, default=1, help='Seed for jitter and failures')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument(
+            '--baseline',
+            help='Results JSON of an earlier run; fail if any p95 regressed past --tolerance',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2, help='Allowed p95 regression (0.2 = 20%%)'
+        )
+
+    def handle(self, *args, **options):
+        pipelines = [p.strip() for p in options['pipelines'].split(',') if p.strip()]
+        unknown = set(pipelines) - set(PIPELINES)
+        if unknown:
+            raise CommandError(f"Unknown pipelines: {', '.join(sorted(unknown))}")
+
+        with ExitStack() as stack:
+            self.isolate(stack)
+            if options['record']:
+                self.record(options['fixtures'], options['website'], pipelines)
+            else:
+                results = self.benchmark(options, pipelines)
+                self.report(results, options)
+
+    def isolate(self, stack):
+        """Throwaway database, cache and media dir, so nothing real is touched."""
+        setup_test_environment()
+        stack.callback(teardown_test_environment)
+
+        workdir = stack.enter_context(tempfile.TemporaryDirectory())
+        if connection.vendor == "sqlite":
+            # A file database, so worker threads see the same data, with
+            # writers waiting for the lock instead of failing on it
+            db_settings = connection.settings_dict
+            saved = (dict(db_settings["TEST"]), dict(db_settings["OPTIONS"]))
+            db_settings["TEST"]["NAME"] = str(Path(workdir) / "benchmark.sqlite3")
+            db_settings["OPTIONS"].update(transaction_mode="IMMEDIATE", timeout=30)
+            stack.callback(lambda: (db_settings.update(TEST=saved[0], OPTIONS=saved[1])))
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        stack.callback(connection.creation.destroy_test_db, old_name, verbosity=0)
+
+        stack.enter_context(override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+            MEDIA_ROOT=workdir,
+            # Measure the pipelines, not the configured Gemini quota
+            GEMINI_RATE_LIMIT=10 ** 6,
+            # No last-good-response fallback: injected Gemini failures must
+            # reach the pipelines instead of being answered from the warm-up
+            GEMINI_RESPONSE_CACHE_TIMEOUT=0,
+        ))
+        cache.clear()
+        gemini_client.reset_clients()
+        stack.callback(gemini_client.reset_clients)
+
+    def make_client(self, brand_data=None):
+        user = User.objects.create(email=f"benchmark-{time.monotonic_ns()}@example.com")
+        client = APIClient()
+        client.force_authenticate(user)
+        brand = Brand.objects.create(user=user, **brand_data) if brand_data else None
+        return client, brand
+
+    def prepare(self, pipeline, meta):
+        """Untimed setup for one request; returns the timed call."""
+        if pipeline == "analyze":
+            client, _ = self.make_client()
+            return lambda: client.post(
+                "/api/v1/analyze-website/", {"website": meta["website"]}, format="json"
+            )
+
+        client, brand = self.make_client({
+            "website": meta["website"],
+            "entity_type": meta["analysis"].get("entity_type"),
+            "industry": meta["analysis"].get("industry"),
+            "analysis_data": meta["analysis"],
+        })
+        if pipeline == "strategy":
+            return lambda: client.post(
+                "/api/v1/getsocialposts/", {"brand_id": brand.id, "regenerate": True}, format="json"
+            )
+        # A brand created today has its posts generated on demand
+        return lambda: client.post("/api/v1/dailyposts/", {"brand_id": brand.id}, format="json")
+
+    def record(self, path, website, pipelines):
+        meta = {"website": website}
+        with recording(path, meta):
+            response = self.prepare("analyze", meta)()
+            if response.status_code != 200 or "analysis" not in response.data:
+                raise CommandError(f"Website analysis failed: {response.data}")
+            meta["analysis"] = response.data["analysis"]
+
+            for pipeline in pipelines:
+                if pipeline != "analyze":
+                    response = self.prepare(pipeline, meta)()
+                    self.stdout.write(f"{pipeline}: HTTP {response.status_code}")
+
+        self.stdout.write(self.style.SUCCESS(f"Recorded interactions to {path}"))
+
+    def run_pipeline(self, pipeline, meta, total, concurrency):
+        # Untimed first request: SDK import, client setup and warm caches
+        self.prepare(pipeline, meta)()
+        calls = [self.prepare(pipeline, meta) for _ in range(total)]
+
+        def timed(call):
+            started = time.perf_counter()
+            try:
+                response = call()
+                ok = response.status_code < 400 and "error" not in (response.data or {})
+            except Exception:
+                ok = False
+            finally:
+                elapsed = time.perf_counter() - started
+                connection.close()
+            return elapsed, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(timed, calls))
+        wall = time.perf_counter() - started
+
+        latencies = sorted(elapsed for elapsed, _ in outcomes)
+        return {
+            "requests": total,
+            "errors": sum(1 for _, ok in outcomes if not ok),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1),
+            "throughput_rps": round(total / wall, 2),
+        }
+
+    def benchmark(self, options, pipelines):
+        faults = Faults(
+            latency=options['latency'] / 1000,
+            jitter=options['jitter'] / 1000,
+            failure_rate=options['failure_rate'],
+            seed=options['seed'],
+        )
+
+        with ExitStack() as stack:
+            if options['mode'] == 'stub':
+                stub = stack.enter_context(StubServer(options['fixtures'], faults))
+                stack.enter_context(routed_to(stub))
+                meta = stub.cassette.meta
+            else:
+                meta = stack.enter_context(replaying(options['fixtures'], faults)).meta
+
+            return {
+                pipeline: self.run_pipeline(
+                    pipeline, meta, options['requests'], options['concurrency']
+                )
+                for pipeline in pipelines
+            }
+
+    def report(self, results, options):
+        self.stdout.write(
+            f"{options['mode']}: {options['requests']} requests x {options['concurrency']} "
+            f"concurrent, {options['latency']:.0f}±{options['jitter']:.0f} ms upstream latency, "
+            f"{options['failure_rate']:.0%} failures"
+        )
+        self.stdout.write(
+            f"  {'pipeline':<10} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'req/s':>8} {'errors':>7}"
+        )
+        for pipeline, r in results.items():
+            self.stdout.write(
+                f"  {pipeline:<10} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['max_ms']:>9.1f} "
+                f"{r['throughput_rps']:>8.2f} {r['errors']:>7}"
+            )
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+
+        if options['baseline']:
+            baseline = json.loads(Path(options['baseline']).read_text())
+            regressions = [
+                f"{pipeline}: p95 {r['p95_ms']} ms vs {baseline[pipeline]['p95_ms']} ms"
+                for pipeline, r in results.items()
+                if pipeline in baseline
+                and r['p95_ms'] > baseline[pipeline]['p95_ms'] * (1 + options['tolerance'])
+            ]
+            if regressions:
+                raise CommandError("p95 regressions: " + "; ".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No p95 regressions against the baseline"))
@@ -0,0 +1,83 @@
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+class Command(BaseCommand):
+    help = 'Measure module import time of `manage.py check` with python -X importtime'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=3,
+            help='Number of fresh interpreter runs; the fastest is reported',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=10,
+            help='Number of slowest top-level packages to list',
+        )
+        parser.add_argument(
+            '--command',
+            default='check',
+            help='manage.py command to import-profile',
+        )
+        parser.add_argument(
+            '--module',
+            default='google.generativeai',
+            help='Module whose cumulative import time is reported separately',
+        )
+
+    def profile(self, command, module):
+        manage_py = Path(settings.BASE_DIR) / "manage.py"
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", str(manage_py), command],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            self.stderr.write(result.stderr[-2000:])
+
+        # Cumulative microseconds per top-level package, counting only
+        # outermost imports so nested modules are not counted twice
+        packages = defaultdict(int)
+        module_micros = 0
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if not match:
+                continue
+            if len(match.group(3)) == 1:
+                packages[match.group(4).split(".")[0]] += int(match.group(2))
+            if match.group(4) == module:
+                module_micros = int(match.group(2))
+        return packages, module_micros
+
+    def handle(self, *args, **options):
+        runs = [
+            self.profile(options['command'], options['module'])
+            for _ in range(options['runs'])
+        ]
+        best, module_micros = min(runs, key=lambda run: sum(run[0].values()))
+
+        total = sum(best.values())
+        self.stdout.write(
+            f"manage.py {options['command']}: {total / 1000:.1f} ms importing modules "
+            f"(best of {options['runs']})"
+        )
+        if module_micros:
+            self.stdout.write(f"{options['module']}: {module_micros / 1000:.1f} ms")
+        else:
+            self.stdout.write(f"{options['module']}: not imported")
+
+        for name, micros in sorted(best.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f"  {name:<32} {micros / 1000:8.1f} ms")
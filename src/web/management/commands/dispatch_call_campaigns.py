@@ -0,0 +1,71 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from web.services.call_campaigns import (
+    active_call_count,
+    claim_due_calls,
+    complete_finished_campaigns,
+    dial_calls,
+    requeue_stale_calls,
+)
+from web.services.rate_limit import TokenBucket
+
+
+class Command(BaseCommand):
+    help = 'Dial queued campaign calls within the provider concurrency and calls-per-second limits'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=50,
+            help='Maximum number of calls to claim per batch',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for due calls instead of exiting when the queue is empty',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to sleep between polls when nothing can be dialed',
+        )
+
+    def handle(self, *args, **options):
+        # One bucket for the life of the process; run a single dispatcher per provider account
+        bucket = TokenBucket(settings.ELEVENLABS_CALLS_PER_SECOND)
+
+        while True:
+            dialed = self.dispatch_batch(options['limit'], bucket)
+
+            if not dialed:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+    def dispatch_batch(self, limit, bucket):
+        requeued = requeue_stale_calls()
+        if requeued:
+            self.stdout.write(f"Re-queued {requeued} stale call(s)")
+
+        completed = complete_finished_campaigns()
+        if completed:
+            self.stdout.write(f"Completed {completed} campaign(s)")
+
+        free_slots = settings.ELEVENLABS_MAX_CONCURRENT_CALLS - active_call_count()
+        if free_slots <= 0:
+            return 0
+
+        batch = list(claim_due_calls(min(limit, free_slots)))
+
+        if batch:
+            dialed, failed = dial_calls(batch, bucket)
+            self.stdout.write(
+                self.style.SUCCESS(f"Dialed {dialed} call(s), {failed} failed or rescheduled")
+            )
+
+        return len(batch)
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from web.services.reminders import claim_due_reminders, dispatch_reminder, requeue_stale_reminders
+
+
+class Command(BaseCommand):
+    help = 'Send due followup reminders; safe to run several workers in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=50,
+            help='Maximum number of reminders to claim per batch',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for due reminders instead of exiting when none are due',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=30.0,
+            help='Seconds to sleep between polls when nothing is due',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            requeued = requeue_stale_reminders()
+            if requeued:
+                self.stdout.write(f"Re-queued {requeued} stale reminder(s)")
+
+            processed = self.process_batch(options['limit'])
+
+            if not processed:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+    def process_batch(self, limit):
+        batch = list(claim_due_reminders(limit))
+        failed = 0
+
+        for followup in batch:
+            if not dispatch_reminder(followup):
+                failed += 1
+                self.stdout.write(
+                    self.style.ERROR(f"Failed: followup {followup.id} ({followup.reminder_error})")
+                )
+
+        if batch:
+            self.stdout.write(
+                self.style.SUCCESS(f"Sent {len(batch) - failed} reminder(s), {failed} failed")
+            )
+
+        return len(batch)
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from web.services.daily_posts import precompute_daily_posts
+
+
+class Command(BaseCommand):
+    help = "Generate the day's trending posts for every active brand (run nightly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=parse_date,
+            help='Day to generate for (YYYY-MM-DD, defaults to today)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=100,
+            help='Number of brands loaded per chunk',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.DAILY_POSTS_CONCURRENCY,
+            help='Maximum parallel Gemini generations',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate brands that already have a post set for the day',
+        )
+
+    def handle(self, *args, **options):
+        generated, failed = precompute_daily_posts(
+            day=options['date'],
+            chunk_size=options['chunk_size'],
+            concurrency=options['concurrency'],
+            force=options['force'],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated {generated} post set(s), {failed} failed")
+        )
@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from web.models.webhook_event import CallWebhookEvent
+from web.services.call_events import claim_pending_events, process_call_event, requeue_stale_events
+
+
+class Command(BaseCommand):
+    help = 'Process queued call provider webhook events into leads, call logs and followups'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=50,
+            help='Maximum number of events to claim per batch',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new events instead of exiting when the queue is empty',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep between polls when the queue is empty',
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Re-queue events whose previous processing attempt failed',
+        )
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            requeued = CallWebhookEvent.objects.filter(status='failed').update(status='pending')
+            self.stdout.write(f"Re-queued {requeued} failed event(s)")
+
+        while True:
+            requeued = requeue_stale_events()
+            if requeued:
+                self.stdout.write(f"Re-queued {requeued} stale event(s)")
+
+            processed = self.process_batch(options['limit'])
+
+            if not processed:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+    def process_batch(self, limit):
+        batch = list(claim_pending_events(limit))
+        failed = 0
+
+        for event in batch:
+            if not process_call_event(event):
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"Failed: {event} ({event.error})"))
+
+        if batch:
+            self.stdout.write(
+                self.style.SUCCESS(f"Processed {len(batch) - failed} event(s), {failed} failed")
+            )
+
+        return len(batch)
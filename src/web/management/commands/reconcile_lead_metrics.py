@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from web.services.lead_metrics import reconcile_daily_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the lead metrics daily rollup from leads and call logs to correct drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Number of most recent days to recompute',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute the whole history instead of the last --days days',
+        )
+        parser.add_argument(
+            '--user',
+            type=int,
+            help='Only recompute rows of this user id',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if not options['all']:
+            since = timezone.localdate() - timedelta(days=options['days'] - 1)
+
+        written = reconcile_daily_stats(since=since, user_id=options['user'])
+
+        scope = "all days" if since is None else f"since {since}"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} rollup row(s) for {scope}"))
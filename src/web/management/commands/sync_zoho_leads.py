@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from web.services.zoho import ZohoError
+from web.services.zoho_sync import pull_zoho_leads, zoho_leads_user_id
+
+
+class Command(BaseCommand):
+    help = 'Pull leads modified in Zoho CRM since the last sync and upsert them in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            help='User id that owns the synced leads (defaults to ZOHO_LEADS_USER_ID)',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Ignore the stored cursor and walk every Zoho lead',
+        )
+
+    def handle(self, *args, **options):
+        user_id = options['user'] or zoho_leads_user_id()
+
+        try:
+            totals = pull_zoho_leads(user_id, full=options['full'])
+        except ZohoError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {totals['created']}, updated {totals['updated']}, "
+                f"unchanged {totals['unchanged']} lead(s)"
+            )
+        )
@@ -6,6 +6,74 @@ from accounts.models import User
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 import json
+import time
+
+from core import telemetry
+from web.services.query_stats import check_budget, record_query_stats, track_queries
+
+
+class MetricsMiddleware:
+    """
+    Request count, latency, in-flight requests and DB queries per route for
+    /metrics. Sits in front of QueryStatsMiddleware and reads the query
+    stats it leaves on the request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        telemetry.HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            telemetry.HTTP_REQUESTS_IN_FLIGHT.dec()
+
+        match = request.resolver_match
+        route = match.view_name if match else "unmatched"
+        telemetry.HTTP_REQUESTS.inc(method=request.method, route=route, status=response.status_code)
+        telemetry.HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - started, method=request.method, route=route
+        )
+
+        stats = getattr(request, "query_stats", None)
+        if stats is not None:
+            telemetry.HTTP_REQUEST_DB_QUERIES.observe(stats.count, route=route)
+            telemetry.HTTP_REQUEST_DB_DURATION.observe(stats.duration, route=route)
+
+        return response
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the database queries and DB time of each request. Reported as
+    X-DB-Query-Count / X-DB-Query-Time-Ms headers (QUERY_STATS_HEADERS, dev)
+    and as a log line (QUERY_STATS_LOG, prod); with QUERY_BUDGET_ENFORCE
+    (the test runner) a view over its budget raises QueryBudgetExceeded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with track_queries() as stats:
+            response = self.get_response(request)
+        request.query_stats = stats
+
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+
+        if settings.QUERY_STATS_HEADERS:
+            response["X-DB-Query-Count"] = str(stats.count)
+            response["X-DB-Query-Time-Ms"] = f"{stats.duration_ms:.2f}"
+        if view_name and settings.QUERY_STATS_LOG:
+            record_query_stats(view_name, request.method, response.status_code, stats)
+        if view_name and settings.QUERY_BUDGET_ENFORCE:
+            check_budget(view_name, stats)
+
+        return response
+
 
 class AuthenticationMiddleware:
     def __init__(self, get_response):
@@ -26,6 +94,7 @@ class AuthenticationMiddleware:
             '/admin/',
             '/static/',
             '/media/',
+            '/metrics',
         ]
         
         # Check if the current path is public
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:30
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def dedupe_call_logs(apps, schema_editor):
+    """Keep the most recently updated log per call_id before adding the unique index."""
+    LeadCallLog = apps.get_model("web", "LeadCallLog")
+    LeadCallLog.objects.filter(call_id="").update(call_id=None)
+
+    duplicated = (
+        LeadCallLog.objects.exclude(call_id__isnull=True)
+        .values("call_id")
+        .annotate(total=Count("id"))
+        .filter(total__gt=1)
+        .values_list("call_id", flat=True)
+    )
+    for call_id in duplicated.iterator():
+        logs = LeadCallLog.objects.filter(call_id=call_id).order_by("-updated_at", "-id")
+        keep = logs.first()
+        logs.exclude(id=keep.id).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0006_leadcalllog"),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_call_logs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0007_dedupe_call_logs"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="leadcalllog",
+            name="call_id",
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+        migrations.CreateModel(
+            name="CallWebhookEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("provider", models.CharField(default="elevenlabs", max_length=50)),
+                ("idempotency_key", models.CharField(max_length=255, unique=True)),
+                ("call_id", models.CharField(blank=True, max_length=255, null=True)),
+                ("call_status", models.CharField(blank=True, max_length=50)),
+                ("payload", models.JSONField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processing", "Processing"),
+                            ("processed", "Processed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="web_callweb_status_fb290d_idx",
+                    )
+                ],
+            },
+        ),
+    ]
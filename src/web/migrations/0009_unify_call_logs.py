@@ -0,0 +1,83 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0008_call_webhook_event"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="leadcalllog",
+            name="agent_id",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name="leadcalllog",
+            name="duration",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="leadcalllog",
+            name="ended_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="leadcalllog",
+            name="event",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="web.callwebhookevent",
+            ),
+        ),
+        migrations.AddField(
+            model_name="leadcalllog",
+            name="intent",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name="leadcalllog",
+            name="recording_url",
+            field=models.URLField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="leadcalllog",
+            name="sentiment",
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name="leadcalllog",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="leadfollowup",
+            name="call_event",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="followups",
+                to="web.callwebhookevent",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="leadcalllog",
+            index=models.Index(
+                fields=["lead", "-created_at"], name="web_leadcal_lead_id_faf59c_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="leadcalllog",
+            index=models.Index(
+                fields=["created_at"], name="web_leadcal_created_13f8cd_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:32
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 500
+
+
+def backfill_call_logs(apps, schema_editor):
+    """
+    Move CallLog rows into LeadCallLog, streaming in batches. Each raw payload
+    becomes one processed CallWebhookEvent that the call log references.
+    """
+    CallLog = apps.get_model("web", "CallLog")
+    LeadCallLog = apps.get_model("web", "LeadCallLog")
+    CallWebhookEvent = apps.get_model("web", "CallWebhookEvent")
+
+    last_id = 0
+    while True:
+        batch = list(CallLog.objects.filter(id__gt=last_id).order_by("id")[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        with transaction.atomic():
+            keys = {row.id: f"{row.call_id}:{row.call_status}"[:255] for row in batch}
+            CallWebhookEvent.objects.bulk_create(
+                [
+                    CallWebhookEvent(
+                        provider="elevenlabs",
+                        idempotency_key=keys[row.id],
+                        call_id=row.call_id,
+                        call_status=row.call_status or "",
+                        payload=row.raw_payload or {},
+                        status="processed",
+                        processed_at=row.created_at,
+                    )
+                    for row in batch
+                ],
+                ignore_conflicts=True,
+            )
+            events = CallWebhookEvent.objects.in_bulk(keys.values(), field_name="idempotency_key")
+            existing = LeadCallLog.objects.in_bulk(
+                [row.call_id for row in batch], field_name="call_id"
+            )
+
+            for row in batch:
+                fields = {
+                    "agent_id": row.agent_id or None,
+                    "started_at": row.call_start_time,
+                    "ended_at": row.call_end_time,
+                    "duration": row.call_duration,
+                    "intent": row.intent,
+                    "sentiment": row.sentiment,
+                    "recording_url": row.recording_url,
+                }
+                event = events.get(keys[row.id])
+                call_log = existing.get(row.call_id)
+
+                if call_log:
+                    # Only fill gaps; the webhook path is the newer source
+                    for name, value in fields.items():
+                        if getattr(call_log, name) is None and value is not None:
+                            setattr(call_log, name, value)
+                    if call_log.event_id is None:
+                        call_log.event = event
+                    call_log.save()
+                else:
+                    call_log = LeadCallLog.objects.create(
+                        lead_id=row.lead_id,
+                        call_id=row.call_id,
+                        status=(row.call_status or "completed")[:30],
+                        event=event,
+                        **fields,
+                    )
+                    LeadCallLog.objects.filter(id=call_log.id).update(created_at=row.created_at)
+
+
+class Migration(migrations.Migration):
+
+    # Each batch commits on its own so large tables do not hold one long transaction
+    atomic = False
+
+    dependencies = [
+        ("web", "0009_unify_call_logs"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_call_logs, migrations.RunPython.noop),
+    ]
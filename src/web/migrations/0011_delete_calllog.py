@@ -0,0 +1,16 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:32
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0010_backfill_call_logs"),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name="CallLog",
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0011_delete_calllog"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PayloadBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sha256", models.CharField(max_length=64, unique=True)),
+                ("encoding", models.CharField(default="gzip", max_length=10)),
+                ("data", models.BinaryField()),
+                (
+                    "size",
+                    models.PositiveIntegerField(help_text="Uncompressed size in bytes"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="callwebhookevent",
+            name="payload_blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="web.payloadblob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="leadcalllog",
+            name="response",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="web.payloadblob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="leadfollowup",
+            name="conversation",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="web.payloadblob",
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:33
+
+import gzip
+import hashlib
+import json
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 500
+
+# (model, inline JSON field, blob FK field)
+INLINE_PAYLOADS = [
+    ("CallWebhookEvent", "payload", "payload_blob"),
+    ("LeadFollowUp", "conversation_json", "conversation"),
+    ("LeadCallLog", "raw_response", "response"),
+]
+
+
+def store_blob(PayloadBlob, document):
+    # Mirrors PayloadBlob.store(); historical models do not carry custom methods
+    raw = json.dumps(document, separators=(",", ":"), sort_keys=True, default=str).encode()
+    blob, _ = PayloadBlob.objects.get_or_create(
+        sha256=hashlib.sha256(raw).hexdigest(),
+        defaults={"data": gzip.compress(raw), "size": len(raw)},
+    )
+    return blob
+
+
+def move_payloads_to_blobs(apps, schema_editor):
+    PayloadBlob = apps.get_model("web", "PayloadBlob")
+
+    for model_name, source_field, blob_field in INLINE_PAYLOADS:
+        Model = apps.get_model("web", model_name)
+        rows = Model.objects.filter(**{f"{source_field}__isnull": False}).order_by("id")
+
+        last_id = 0
+        while True:
+            batch = list(
+                rows.filter(id__gt=last_id).only("id", source_field)[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            with transaction.atomic():
+                for row in batch:
+                    blob = store_blob(PayloadBlob, getattr(row, source_field))
+                    Model.objects.filter(id=row.id).update(**{blob_field: blob})
+
+
+class Migration(migrations.Migration):
+
+    # Each batch commits on its own so large tables do not hold one long transaction
+    atomic = False
+
+    dependencies = [
+        ("web", "0012_payload_blob"),
+    ]
+
+    operations = [
+        migrations.RunPython(move_payloads_to_blobs, migrations.RunPython.noop),
+    ]
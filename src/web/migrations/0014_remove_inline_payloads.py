@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:33
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0013_move_payloads_to_blobs"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="callwebhookevent",
+            name="payload",
+        ),
+        migrations.RemoveField(
+            model_name="leadcalllog",
+            name="raw_response",
+        ),
+        migrations.RemoveField(
+            model_name="leadfollowup",
+            name="conversation_json",
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0015_call_campaigns"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lead",
+            name="phone_e164",
+            field=models.CharField(blank=True, max_length=16, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(
+                fields=["user", "phone_e164"], name="web_lead_user_id_8146e4_idx"
+            ),
+        ),
+    ]
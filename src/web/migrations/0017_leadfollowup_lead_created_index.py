@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0016_lead_phone_e164"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="leadfollowup",
+            index=models.Index(
+                fields=["lead", "-created_at"], name="web_leadfol_lead_id_cb7a83_idx"
+            ),
+        ),
+    ]
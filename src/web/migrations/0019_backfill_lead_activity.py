@@ -0,0 +1,63 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:40
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 500
+
+
+def backfill_lead_activity(apps, schema_editor):
+    """
+    Copy existing followups and call logs into LeadActivity, in id-ordered
+    batches. Mirrors web.services.activity; historical models lack its helpers.
+    """
+    LeadActivity = apps.get_model("web", "LeadActivity")
+    sources = [
+        ("followup", apps.get_model("web", "LeadFollowUp"),
+         lambda row: (row.followup_type, row.notes or "")),
+        ("call", apps.get_model("web", "LeadCallLog"),
+         lambda row: (row.status, row.call_id or "")),
+    ]
+
+    for kind, Model, describe in sources:
+        last_id = 0
+        while True:
+            batch = list(
+                Model.objects.filter(id__gt=last_id)
+                .select_related("lead")
+                .order_by("id")[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            activities = []
+            for row in batch:
+                label, summary = describe(row)
+                activities.append(
+                    LeadActivity(
+                        user_id=row.lead.user_id,
+                        lead_id=row.lead_id,
+                        kind=kind,
+                        object_id=row.id,
+                        label=label,
+                        summary=summary[:255],
+                        created_at=row.created_at,
+                    )
+                )
+
+            with transaction.atomic():
+                LeadActivity.objects.bulk_create(activities, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    # Each batch commits on its own so large tables do not hold one long transaction
+    atomic = False
+
+    dependencies = [
+        ("web", "0018_lead_activity"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_lead_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:42
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_lead_daily_stat(apps, schema_editor):
+    """
+    Initial rollup from existing rows. Mirrors compute_daily_stats; the
+    result is one row per (user, day, key), so it is small even for large tables.
+    """
+    Lead = apps.get_model("web", "Lead")
+    LeadCallLog = apps.get_model("web", "LeadCallLog")
+    LeadDailyStat = apps.get_model("web", "LeadDailyStat")
+
+    sources = [
+        ("lead_status", Lead.objects.all(), "user_id", "status"),
+        ("lead_source", Lead.objects.all(), "user_id", "source"),
+        ("call_status", LeadCallLog.objects.all(), "lead__user_id", "status"),
+    ]
+
+    for metric, queryset, user_field, key_field in sources:
+        grouped = (
+            queryset.annotate(day=TruncDate("created_at"))
+            .values(user_field, key_field, "day")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        LeadDailyStat.objects.bulk_create(
+            [
+                LeadDailyStat(
+                    user_id=row[user_field],
+                    date=row["day"],
+                    metric=metric,
+                    key=str(row[key_field])[:100],
+                    count=row["total"],
+                )
+                for row in grouped
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0020_lead_daily_stat"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_lead_daily_stat, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:45
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def schedule_future_reminders(apps, schema_editor):
+    # Past due dates predate the scheduler; only upcoming ones are queued
+    LeadFollowUp = apps.get_model("web", "LeadFollowUp")
+    LeadFollowUp.objects.filter(next_followup_date__gte=timezone.now()).update(
+        reminder_status="scheduled"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0022_zoho_sync"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="leadfollowup",
+            name="reminder_attempts",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="leadfollowup",
+            name="reminder_claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="leadfollowup",
+            name="reminder_error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="leadfollowup",
+            name="reminder_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("scheduled", "Scheduled"),
+                    ("processing", "Processing"),
+                    ("sent", "Sent"),
+                    ("failed", "Failed"),
+                ],
+                max_length=20,
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="leadfollowup",
+            index=models.Index(
+                fields=["reminder_status", "next_followup_date"],
+                name="web_leadfol_reminde_3f0241_idx",
+            ),
+        ),
+        migrations.RunPython(schedule_future_reminders, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0023_followup_reminders"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="brand",
+            index=models.Index(
+                fields=["user", "id"], name="web_brand_user_id_f42e49_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0024_brand_user_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyPostSet",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("posts", models.JSONField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "brand",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_post_sets",
+                        to="web.brand",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["brand", "-date"], name="web_dailypo_brand_i_efb567_idx"
+                    )
+                ],
+                "unique_together": {("brand", "date")},
+            },
+        ),
+    ]
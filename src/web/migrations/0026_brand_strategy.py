@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0025_daily_post_set"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BrandStrategy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.PositiveIntegerField()),
+                ("payload_hash", models.CharField(max_length=64)),
+                ("strategy", models.JSONField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "brand",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="strategies",
+                        to="web.brand",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["brand", "payload_hash", "-version"],
+                        name="web_brandst_brand_i_3ff52b_idx",
+                    )
+                ],
+                "unique_together": {("brand", "version")},
+            },
+        ),
+    ]
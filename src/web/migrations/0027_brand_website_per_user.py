@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0026_brand_strategy"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="brand",
+            name="website",
+            field=models.URLField(db_index=True, max_length=500),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0028_callwebhookevent_claimed_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="campaigncall",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
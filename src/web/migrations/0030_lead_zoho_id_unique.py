@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:10
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_zoho_leads(apps, schema_editor):
+    """
+    Fold leads sharing (user, zoho_lead_id) into the oldest one before the
+    unique constraint is added: their follow-ups, call logs, activities and
+    campaign calls move over, then the duplicates are deleted.
+    """
+    Lead = apps.get_model("web", "Lead")
+    LeadFollowUp = apps.get_model("web", "LeadFollowUp")
+    LeadCallLog = apps.get_model("web", "LeadCallLog")
+    LeadActivity = apps.get_model("web", "LeadActivity")
+    CampaignCall = apps.get_model("web", "CampaignCall")
+    Lead.objects.filter(zoho_lead_id="").update(zoho_lead_id=None)
+
+    duplicated = (
+        Lead.objects.exclude(zoho_lead_id__isnull=True)
+        .values("user_id", "zoho_lead_id")
+        .annotate(total=Count("id"))
+        .filter(total__gt=1)
+    )
+    for group in duplicated.iterator():
+        ids = list(
+            Lead.objects.filter(user_id=group["user_id"], zoho_lead_id=group["zoho_lead_id"])
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        keep, duplicates = ids[0], ids[1:]
+
+        for model in (LeadFollowUp, LeadCallLog, LeadActivity):
+            model.objects.filter(lead_id__in=duplicates).update(lead_id=keep)
+        # A campaign dials a lead once; the kept lead's call wins
+        campaigns = list(CampaignCall.objects.filter(lead_id=keep).values_list("campaign_id", flat=True))
+        CampaignCall.objects.filter(lead_id__in=duplicates, campaign_id__in=campaigns).delete()
+        CampaignCall.objects.filter(lead_id__in=duplicates).update(lead_id=keep)
+
+        Lead.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0029_campaigncall_claimed_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_zoho_leads, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="lead",
+            name="web_lead_user_id_31fdf7_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="lead",
+            constraint=models.UniqueConstraint(
+                fields=("user", "zoho_lead_id"), name="unique_lead_zoho_id"
+            ),
+        ),
+    ]
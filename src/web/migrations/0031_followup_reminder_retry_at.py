@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0030_lead_zoho_id_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="leadfollowup",
+            name="reminder_retry_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="leadfollowup",
+            index=models.Index(
+                fields=["reminder_status", "reminder_retry_at"],
+                name="web_leadfol_reminde_3dd9ca_idx",
+            ),
+        ),
+    ]
@@ -1,5 +1,12 @@
 from .business import Business
 from .product import Product
 from .lead import Lead
-from .call_log import CallLog
 from .brand import Brand
+from .webhook_event import CallWebhookEvent
+from .payload_blob import PayloadBlob
+from .campaign import CallCampaign, CampaignCall
+from .activity import LeadActivity
+from .lead_stat import LeadDailyStat
+from .zoho import ZohoSyncCursor
+from .daily_post import DailyPostSet
+from .brand_strategy import BrandStrategy
@@ -0,0 +1,46 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+from .lead import Lead
+
+
+class LeadActivity(models.Model):
+    """
+    One row per followup or call log, copied from the source row when it is
+    inserted. Serves the per-lead timeline and the per-user recent feed
+    without merging the two source tables at read time.
+    """
+    KIND_CHOICES = [
+        ("followup", "Followup"),
+        ("call", "Call"),
+    ]
+
+    # Denormalized from lead.user so the feed never joins Lead
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="lead_activities"
+    )
+    lead = models.ForeignKey(
+        Lead,
+        on_delete=models.CASCADE,
+        related_name="activities"
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # LeadFollowUp / LeadCallLog id, depending on `kind`
+    object_id = models.PositiveBigIntegerField(blank=True, null=True)
+
+    label = models.CharField(max_length=50)
+    summary = models.CharField(max_length=255, blank=True)
+
+    # Time of the source event, not of this row
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ("kind", "object_id")
+        indexes = [
+            models.Index(fields=["lead", "-created_at", "-id"]),
+            models.Index(fields=["user", "-created_at", "-id"]),
+        ]
@@ -7,7 +7,7 @@ class Brand(models.Model):
         on_delete=models.CASCADE,
         related_name="brands"
     )
-    website = models.URLField(max_length=500, unique=True, db_index=True)
+    website = models.URLField(max_length=500, db_index=True)
     entity_type = models.CharField(max_length=50, blank=True, null=True, db_index=True)
     industry = models.CharField(max_length=255, blank=True, null=True, db_index=True)
     analysis_data = models.JSONField()
@@ -21,7 +21,12 @@ class Brand(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
+        # Several users (agencies and their clients) may manage the same website
         unique_together = ("user", "website")
+        indexes = [
+            # Brand lookups by (user, id), and a user's first brand: filter(user=...).order_by("id")
+            models.Index(fields=["user", "id"]),
+        ]
 
     def __str__(self):
         return f"{self.user_id} - {self.website}"
\ No newline at end of file
@@ -0,0 +1,30 @@
+from django.db import models
+
+from .brand import Brand
+
+
+class BrandStrategy(models.Model):
+    """
+    Generated social strategy for one version of a brand's prompt payload.
+    `payload_hash` identifies the inputs; a new version is added when they
+    change or when the user asks to regenerate. Older versions are history.
+    """
+    brand = models.ForeignKey(
+        Brand,
+        on_delete=models.CASCADE,
+        related_name="strategies"
+    )
+    version = models.PositiveIntegerField()
+    payload_hash = models.CharField(max_length=64)
+    strategy = models.JSONField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("brand", "version")
+        indexes = [
+            models.Index(fields=["brand", "payload_hash", "-version"]),
+        ]
+
+    def __str__(self):
+        return f"{self.brand_id} v{self.version}"
@@ -0,0 +1,72 @@
+from django.db import models
+from django.conf import settings
+
+from .lead import Lead
+
+
+class CallCampaign(models.Model):
+    STATUS_CHOICES = [
+        ("running", "Running"),
+        ("paused", "Paused"),
+        ("completed", "Completed"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="call_campaigns"
+    )
+    name = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="running")
+
+    # Lead filter the campaign was built from
+    lead_status = models.CharField(max_length=20, blank=True, null=True)
+    lead_source = models.CharField(max_length=100, blank=True, null=True)
+    created_from = models.DateField(blank=True, null=True)
+    created_to = models.DateField(blank=True, null=True)
+
+    # Progress counters, maintained by the dispatcher
+    total_calls = models.PositiveIntegerField(default=0)
+    dialed_calls = models.PositiveIntegerField(default=0)
+    failed_calls = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+
+class CampaignCall(models.Model):
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("dialing", "Dialing"),
+        ("dialed", "Dialed"),
+        ("failed", "Failed"),
+    ]
+
+    campaign = models.ForeignKey(
+        CallCampaign,
+        on_delete=models.CASCADE,
+        related_name="calls"
+    )
+    lead = models.ForeignKey(
+        Lead,
+        on_delete=models.CASCADE,
+        related_name="campaign_calls"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(blank=True, null=True)
+    call_id = models.CharField(max_length=255, blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("campaign", "lead")
+        indexes = [
+            models.Index(fields=["campaign", "status", "next_attempt_at"]),
+        ]
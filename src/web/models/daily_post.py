@@ -0,0 +1,26 @@
+from django.db import models
+
+from .brand import Brand
+
+
+class DailyPostSet(models.Model):
+    """One day's generated trending posts (with image URLs) for a brand."""
+    brand = models.ForeignKey(
+        Brand,
+        on_delete=models.CASCADE,
+        related_name="daily_post_sets"
+    )
+    date = models.DateField()
+    posts = models.JSONField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("brand", "date")
+        indexes = [
+            models.Index(fields=["brand", "-date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.brand_id} - {self.date}"
@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
 
+from web.utils.phone import normalize_phone
+
 
 class Lead(models.Model):
     STATUS_CHOICES = [
@@ -21,19 +23,49 @@ class Lead(models.Model):
     name = models.CharField(max_length=255, null=True)
     email = models.EmailField(blank=True, null=True)
     phone = models.CharField(max_length=50, null=True)
+    # E.164 form of `phone`, kept in sync on save; used to match inbound calls
+    phone_e164 = models.CharField(max_length=16, blank=True, null=True)
     company = models.CharField(max_length=255, blank=True, null=True)
 
     source = models.CharField(max_length=100, default="manual")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="new")
 
     zoho_lead_id = models.CharField(max_length=255, blank=True, null=True)
+    # Modified_Time of the Zoho record last applied; older deliveries are skipped
+    zoho_modified_at = models.DateTimeField(blank=True, null=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "phone_e164"]),
+        ]
+        constraints = [
+            # One lead per Zoho record. Leads without a Zoho id are NULL here,
+            # which never collides; a partial constraint would be skipped on
+            # MySQL and cannot back ON CONFLICT on PostgreSQL
+            models.UniqueConstraint(fields=["user", "zoho_lead_id"], name="unique_lead_zoho_id"),
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Loaded values for the lead metrics rollup; None when the field was deferred
+        self._original_status = self.__dict__.get("status")
+        self._original_source = self.__dict__.get("source")
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.phone_e164 = normalize_phone(self.phone)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "phone" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"phone_e164"}
+
+        super().save(*args, **kwargs)
+
 
 class LeadFollowUp(models.Model):
     FOLLOWUP_TYPE = [
@@ -51,12 +83,75 @@ class LeadFollowUp(models.Model):
 
     followup_type = models.CharField(max_length=20, choices=FOLLOWUP_TYPE)
     notes = models.TextField(blank=True, null=True)
-    conversation_json = models.JSONField(blank=True, null=True)
+
+    # Conversation / transcript document, loaded only on request
+    conversation = models.ForeignKey(
+        "web.PayloadBlob",
+        on_delete=models.PROTECT,
+        related_name="+",
+        blank=True,
+        null=True
+    )
+
+    # Webhook followups also link the event they were created from
+    call_event = models.ForeignKey(
+        "web.CallWebhookEvent",
+        on_delete=models.SET_NULL,
+        related_name="followups",
+        blank=True,
+        null=True
+    )
 
     next_followup_date = models.DateTimeField(blank=True, null=True)
 
+    # Reminder queue state for next_followup_date, driven by dispatch_followup_reminders
+    REMINDER_STATUS = [
+        ("scheduled", "Scheduled"),
+        ("processing", "Processing"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+    reminder_status = models.CharField(max_length=20, choices=REMINDER_STATUS, blank=True, null=True)
+    reminder_attempts = models.PositiveIntegerField(default=0)
+    # Next try after a failed send; next_followup_date stays what the user set
+    reminder_retry_at = models.DateTimeField(blank=True, null=True)
+    # Set by every claim; identifies it when the result is written back
+    reminder_claimed_at = models.DateTimeField(blank=True, null=True)
+    reminder_error = models.TextField(blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["lead", "-created_at"]),
+            models.Index(fields=["reminder_status", "next_followup_date"]),
+            models.Index(fields=["reminder_status", "reminder_retry_at"]),
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._original_next_followup_date = self.__dict__.get("next_followup_date")
+
+    def save(self, *args, **kwargs):
+        # A new or moved due date (re)schedules the reminder
+        if self._state.adding or self.next_followup_date != self._original_next_followup_date:
+            self.reminder_status = "scheduled" if self.next_followup_date else None
+            self.reminder_attempts = 0
+            self.reminder_retry_at = None
+            self.reminder_error = ""
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | {
+                    "reminder_status", "reminder_attempts", "reminder_retry_at", "reminder_error"
+                }
+
+        super().save(*args, **kwargs)
+        self._original_next_followup_date = self.next_followup_date
+
+    @property
+    def conversation_json(self):
+        return self.conversation.load() if self.conversation_id else None
+
 class LeadCallLog(models.Model):
     CALL_STATUS = [
         ("initiated", "Initiated"),
@@ -72,9 +167,55 @@ class LeadCallLog(models.Model):
         related_name="call_logs"
     )
 
-    call_id = models.CharField(max_length=255, blank=True, null=True)
+    call_id = models.CharField(max_length=255, blank=True, null=True, unique=True)
     status = models.CharField(max_length=30, choices=CALL_STATUS, default="initiated")
-    raw_response = models.JSONField(blank=True, null=True)
+
+    # Outbound call API response (webhook payloads live on `event`, except on
+    # older logs that never got an event)
+    response = models.ForeignKey(
+        "web.PayloadBlob",
+        on_delete=models.PROTECT,
+        related_name="+",
+        blank=True,
+        null=True
+    )
+
+    agent_id = models.CharField(max_length=255, blank=True, null=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    ended_at = models.DateTimeField(blank=True, null=True)
+    duration = models.IntegerField(blank=True, null=True)
+    intent = models.CharField(max_length=255, blank=True, null=True)
+    sentiment = models.CharField(max_length=50, blank=True, null=True)
+    recording_url = models.URLField(blank=True, null=True)
+
+    # Latest webhook event for this call
+    event = models.ForeignKey(
+        "web.CallWebhookEvent",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        blank=True,
+        null=True
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
\ No newline at end of file
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["lead", "-created_at"]),
+            models.Index(fields=["created_at"]),
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Loaded status for the lead metrics rollup; None when the field was deferred
+        self._original_status = self.__dict__.get("status")
+    @property
+    def webhook_payload(self):
+        """
+        The latest webhook payload. Rows that never got a webhook event (older
+        logs) keep their payload in `response`, so that is the fallback.
+        """
+        if self.event_id:
+            return self.event.payload
+        return self.response.load() if self.response_id else {}
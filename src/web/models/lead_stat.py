@@ -0,0 +1,32 @@
+from django.db import models
+from django.conf import settings
+
+
+class LeadDailyStat(models.Model):
+    """
+    Daily rollup for lead analytics. Rows are cohorts keyed by the day the
+    lead or call was created: `count` is how many of that day's leads (or
+    calls) currently have `key` as their status / source. Kept up to date on
+    writes and corrected by the reconcile_lead_metrics command.
+    """
+    METRIC_CHOICES = [
+        ("lead_status", "Lead status"),
+        ("lead_source", "Lead source"),
+        ("call_status", "Call status"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="lead_daily_stats"
+    )
+    date = models.DateField()
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    key = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "date", "metric", "key")
+
+    def __str__(self):
+        return f"{self.date} {self.metric}={self.key}: {self.count}"
@@ -0,0 +1,41 @@
+import gzip
+import hashlib
+import json
+
+from django.db import models
+
+
+class PayloadBlob(models.Model):
+    """
+    Gzip-compressed JSON document (webhook payloads, transcripts, provider
+    responses). Lead tables only hold a reference, so the document is read
+    only when a caller actually asks for it. Identical documents are stored once.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    encoding = models.CharField(max_length=10, default="gzip")
+    data = models.BinaryField()
+    size = models.PositiveIntegerField(help_text="Uncompressed size in bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.size} bytes)"
+
+    @staticmethod
+    def encode(document):
+        raw = json.dumps(document, separators=(",", ":"), sort_keys=True, default=str).encode()
+        return hashlib.sha256(raw).hexdigest(), gzip.compress(raw), len(raw)
+
+    @classmethod
+    def store(cls, document):
+        digest, data, size = cls.encode(document)
+        blob, _ = cls.objects.get_or_create(
+            sha256=digest,
+            defaults={"data": data, "size": size}
+        )
+        return blob
+
+    def load(self):
+        raw = bytes(self.data)
+        if self.encoding == "gzip":
+            raw = gzip.decompress(raw)
+        return json.loads(raw)
@@ -0,0 +1,48 @@
+from django.db import models
+
+
+class CallWebhookEvent(models.Model):
+    """
+    Raw call provider webhook, stored as soon as it arrives and processed
+    asynchronously by the process_call_events command.
+    """
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("processed", "Processed"),
+        ("failed", "Failed"),
+    ]
+
+    provider = models.CharField(max_length=50, default="elevenlabs")
+
+    # "<call_id>:<status>", or a payload hash when the event has no call id
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    call_id = models.CharField(max_length=255, blank=True, null=True)
+    call_status = models.CharField(max_length=50, blank=True)
+    payload_blob = models.ForeignKey(
+        "web.PayloadBlob",
+        on_delete=models.PROTECT,
+        related_name="+",
+        blank=True,
+        null=True
+    )
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.provider} {self.idempotency_key} ({self.status})"
+
+    @property
+    def payload(self):
+        return self.payload_blob.load() if self.payload_blob_id else {}
@@ -0,0 +1,20 @@
+from django.db import models
+from django.conf import settings
+
+
+class ZohoSyncCursor(models.Model):
+    """Where the incremental Zoho pull for one user and module left off."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="zoho_sync_cursors"
+    )
+    module = models.CharField(max_length=50, default="Leads")
+    modified_since = models.DateTimeField(blank=True, null=True)
+    last_synced_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        unique_together = ("user", "module")
+
+    def __str__(self):
+        return f"{self.module} since {self.modified_since}"
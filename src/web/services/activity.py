@@ -0,0 +1,71 @@
+from web.models.lead import Lead
+from web.models.activity import LeadActivity
+
+
+def followup_activity(followup, user_id):
+    return LeadActivity(
+        user_id=user_id,
+        lead_id=followup.lead_id,
+        kind="followup",
+        object_id=followup.pk,
+        label=followup.followup_type,
+        summary=(followup.notes or "")[:255],
+        created_at=followup.created_at,
+    )
+
+
+def call_activity(call_log, user_id):
+    return LeadActivity(
+        user_id=user_id,
+        lead_id=call_log.lead_id,
+        kind="call",
+        object_id=call_log.pk,
+        label=call_log.status,
+        summary=call_log.call_id or "",
+        created_at=call_log.created_at,
+    )
+
+
+def record_activities(followups=(), call_logs=()):
+    """
+    Timeline rows for rows written with bulk_create, which skips the
+    post_save handlers. Lead owners are looked up in one query. Rows
+    without a pk (bulk_create on backends that do not return ids) are
+    skipped; read them back first.
+    """
+    followups = [f for f in followups if f.pk is not None]
+    call_logs = [c for c in call_logs if c.pk is not None]
+    lead_ids = {row.lead_id for row in [*followups, *call_logs]}
+    if not lead_ids:
+        return
+
+    owners = dict(Lead.objects.filter(id__in=lead_ids).values_list("id", "user_id"))
+
+    LeadActivity.objects.bulk_create(
+        [followup_activity(f, owners[f.lead_id]) for f in followups]
+        + [call_activity(c, owners[c.lead_id]) for c in call_logs],
+        ignore_conflicts=True,
+    )
+
+
+def on_followup_saved(sender, instance, created, **kwargs):
+    if created:
+        followup_activity(instance, instance.lead.user_id).save()
+
+
+def on_call_log_saved(sender, instance, created, **kwargs):
+    if created:
+        call_activity(instance, instance.lead.user_id).save()
+    else:
+        LeadActivity.objects.filter(kind="call", object_id=instance.pk).update(
+            label=instance.status,
+            summary=instance.call_id or "",
+        )
+
+
+def on_followup_deleted(sender, instance, **kwargs):
+    LeadActivity.objects.filter(kind="followup", object_id=instance.pk).delete()
+
+
+def on_call_log_deleted(sender, instance, **kwargs):
+    LeadActivity.objects.filter(kind="call", object_id=instance.pk).delete()
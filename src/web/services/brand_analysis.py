@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+
+from web.models.brand import Brand
+from web.services.gemini_webextractor import analyze_website
+from web.utils.website_extractor import extract_website_sections
+
+
+def analyze_site(website):
+    """Fetch and analyze one website. Touches the network only, never the database."""
+    return analyze_website(website_url=website, sections=extract_website_sections(website))
+
+
+def save_brand_analysis(user, website, analysis_json, brand=None):
+    """
+    Store an analysis on `brand`, or on the user's brand for `website`,
+    creating it if needed. Returns (brand, created).
+    """
+    fields = {
+        "website": website,
+        "entity_type": analysis_json.get("entity_type"),
+        "industry": analysis_json.get("industry"),
+        "analysis_data": analysis_json,
+    }
+
+    if brand is None:
+        return Brand.objects.update_or_create(user=user, website=website, defaults=fields)
+
+    for name, value in fields.items():
+        setattr(brand, name, value)
+    brand.save()
+    return brand, False
+
+
+def batch_concurrency():
+    # At most half the Gemini slots, so batches never starve single requests
+    return max(1, min(settings.BRAND_BATCH_CONCURRENCY, settings.GEMINI_MAX_CONCURRENCY // 2))
+
+
+def analyze_sites(websites, concurrency=4):
+    """
+    Analyze `websites` on a pool of `concurrency` threads, yielding
+    (website, analysis, error) in completion order. Pending sites are
+    cancelled when the caller stops iterating (e.g. the client went away).
+    """
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        futures = {executor.submit(analyze_site, website): website for website in websites}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from web.models.brand import Brand
+
+# analysis_data keys passed to the Gemini prompts
+PROMPT_ANALYSIS_FIELDS = [
+    "brand_summary",
+    "target_audience",
+    "audience_pain_points",
+    "value_proposition",
+    "brand_tone",
+    "content_pillars",
+]
+
+
+def cache_key(brand_id, updated_at):
+    # Any write that bumps updated_at moves the brand to a new entry
+    return f"brand_context:brand:{brand_id}:{updated_at.isoformat()}"
+
+
+def user_brands(user, brand_id=None):
+    # brand_id None is the user's default (first) brand
+    brands = Brand.objects.filter(user=user)
+    if brand_id is not None:
+        return brands.filter(id=brand_id)
+    return brands.order_by("id")[:1]
+
+
+def get_user_brand(user, brand_id=None):
+    """
+    The user's brand `brand_id`, or their first brand when no id is given
+    (clients from before multi-brand support), for views that write to it.
+    """
+    return user_brands(user, brand_id).first()
+
+
+def build_brand_context(brand: Brand):
+    analysis_data = brand.analysis_data or {}
+    styles = {
+        "photography_style": brand.photography_style,
+        "font_style": brand.font_style,
+        "filter_style": brand.filter_style,
+    }
+
+    return {
+        "brand_id": brand.id,
+        # Version of the cached payload; also usable in downstream cache keys
+        "updated_at": brand.updated_at,
+        "detail": {
+            "brand_id": brand.id,
+            "website": brand.website,
+            "entity_type": brand.entity_type,
+            "industry": brand.industry,
+            "analysis_data": analysis_data,
+            "styles": styles,
+            "created_at": brand.created_at,
+            "updated_at": brand.updated_at,
+        },
+        "prompt_payload": {
+            "website": brand.website,
+            "entity_type": brand.entity_type,
+            "industry": brand.industry,
+            **{field: analysis_data.get(field) for field in PROMPT_ANALYSIS_FIELDS},
+            **styles,
+        },
+    }
+
+
+def get_brand_context(user, brand_id=None):
+    """
+    Cached brand payloads for brand `brand_id` of `user` (their first brand
+    when None), or None when there is no such brand. Every read checks the
+    brand's updated_at, so no process serves a payload older than the row.
+    """
+    version = user_brands(user, brand_id).values_list("id", "updated_at").first()
+    if version is None:
+        return None
+
+    key = cache_key(*version)
+    context = cache.get(key)
+    if context is not None:
+        return context
+
+    brand = Brand.objects.get(id=version[0])
+
+    context = build_brand_context(brand)
+    cache.set(key, context, settings.BRAND_CONTEXT_CACHE_TIMEOUT)
+    return context
@@ -0,0 +1,73 @@
+import hashlib
+import json
+
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from web.models.brand_strategy import BrandStrategy
+from web.services.gemini_webextractor import analyze_brand_social_strategy
+from web.services.structured_output import StructuredOutputError
+
+# Tries at claiming the next version number before giving up on the race
+SAVE_VERSION_ATTEMPTS = 5
+
+
+class StrategyError(StructuredOutputError):
+    """Gemini did not return a valid strategy; `raw_response` holds what it sent."""
+
+
+def payload_hash(brand_payload: dict) -> str:
+    raw = json.dumps(brand_payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def current_strategy(brand_id, digest):
+    """Latest stored strategy generated from this exact payload, or None."""
+    return (
+        BrandStrategy.objects.filter(brand_id=brand_id, payload_hash=digest)
+        .order_by("-version")
+        .first()
+    )
+
+
+def latest_version(brand_id):
+    return BrandStrategy.objects.filter(brand_id=brand_id).aggregate(v=Max("version"))["v"] or 0
+
+
+def save_new_version(brand_id, digest, strategy_json):
+    # Two requests racing for the same version number: the loser takes the next one
+    for attempt in range(SAVE_VERSION_ATTEMPTS):
+        version = latest_version(brand_id) + 1
+        try:
+            with transaction.atomic():
+                return BrandStrategy.objects.create(
+                    brand_id=brand_id,
+                    version=version,
+                    payload_hash=digest,
+                    strategy=strategy_json,
+                )
+        except IntegrityError:
+            # Anything but the (brand, version) clash is a real error
+            clashed = BrandStrategy.objects.filter(brand_id=brand_id, version=version).exists()
+            if not clashed or attempt == SAVE_VERSION_ATTEMPTS - 1:
+                raise
+
+
+def get_or_generate_strategy(brand_id, brand_payload, regenerate=False):
+    """
+    Return (strategy, generated). The stored version for the current payload
+    is reused unless `regenerate` is set or the payload changed.
+    """
+    digest = payload_hash(brand_payload)
+
+    if not regenerate:
+        strategy = current_strategy(brand_id, digest)
+        if strategy:
+            return strategy, False
+
+    try:
+        strategy_json = analyze_brand_social_strategy(brand_payload)
+    except StructuredOutputError as e:
+        raise StrategyError(e.raw_response, e.errors)
+
+    return save_new_version(brand_id, digest, strategy_json), True
@@ -0,0 +1,187 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from web.models.lead import Lead, LeadFollowUp, LeadCallLog
+from web.models.campaign import CallCampaign, CampaignCall
+from web.services.elevenlabs import start_ai_call
+from web.services.rate_limit import TokenBucket
+
+BATCH_SIZE = 1000
+
+# LeadCallLog statuses that still hold one of the provider's concurrent call slots
+ACTIVE_CALL_STATUSES = ["initiated", "ringing", "in-progress", "in_progress"]
+
+
+def campaign_leads(campaign: CallCampaign):
+    # Only leads with a dialable (E.164) number
+    leads = Lead.objects.filter(user_id=campaign.user_id, phone_e164__isnull=False)
+    if campaign.lead_status:
+        leads = leads.filter(status=campaign.lead_status)
+    if campaign.lead_source:
+        leads = leads.filter(source=campaign.lead_source)
+    if campaign.created_from:
+        leads = leads.filter(created_at__date__gte=campaign.created_from)
+    if campaign.created_to:
+        leads = leads.filter(created_at__date__lte=campaign.created_to)
+    return leads
+
+
+def queue_campaign_calls(campaign: CallCampaign) -> int:
+    """Queue one CampaignCall per matching lead, in batches. Returns the queued count."""
+    lead_ids = campaign_leads(campaign).order_by("id").values_list("id", flat=True)
+
+    batch = []
+    for lead_id in lead_ids.iterator(chunk_size=BATCH_SIZE):
+        batch.append(CampaignCall(campaign=campaign, lead_id=lead_id))
+        if len(batch) >= BATCH_SIZE:
+            CampaignCall.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        CampaignCall.objects.bulk_create(batch, ignore_conflicts=True)
+
+    total = campaign.calls.count()
+    CallCampaign.objects.filter(id=campaign.id).update(total_calls=total)
+    campaign.total_calls = total
+    return total
+
+
+def active_call_count() -> int:
+    """
+    Calls the provider is still holding open. Logs that never got a final
+    webhook stop counting after CALL_CAMPAIGN_ACTIVE_CALL_WINDOW seconds.
+    """
+    since = timezone.now() - timedelta(seconds=settings.CALL_CAMPAIGN_ACTIVE_CALL_WINDOW)
+    return LeadCallLog.objects.filter(
+        status__in=ACTIVE_CALL_STATUSES, created_at__gte=since
+    ).count()
+
+
+def claim_due_calls(limit=50):
+    """
+    Mark up to `limit` due calls of running campaigns as dialing. The
+    conditional UPDATE makes sure two dispatchers never claim the same row.
+    """
+    now = timezone.now()
+    candidate_ids = list(
+        CampaignCall.objects.filter(status="pending", campaign__status="running")
+        .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+        .order_by("campaign_id", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+
+    claimed_ids = [
+        call_id
+        for call_id in candidate_ids
+        if CampaignCall.objects.filter(id=call_id, status="pending")
+        .update(status="dialing", claimed_at=now)
+    ]
+
+    return (
+        CampaignCall.objects.filter(id__in=claimed_ids)
+        .select_related("lead")
+        .order_by("campaign_id", "id")
+    )
+
+
+def requeue_stale_calls() -> int:
+    """
+    Return calls claimed longer than CALL_CAMPAIGN_CLAIM_TIMEOUT ago (crashed
+    dispatcher) to the queue, so their campaign can still finish.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.CALL_CAMPAIGN_CLAIM_TIMEOUT)
+    return CampaignCall.objects.filter(
+        Q(claimed_at__lt=cutoff) | Q(claimed_at__isnull=True),
+        status="dialing",
+    ).update(status="pending", last_error="Claim expired before the call was recorded")
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=settings.CALL_CAMPAIGN_RETRY_BACKOFF * 2 ** (attempts - 1))
+
+
+def dial_calls(calls, bucket: TokenBucket):
+    """
+    Start one provider call per claimed CampaignCall, spacing requests with
+    `bucket`. Each outcome is written as soon as its call returns, so a
+    dispatcher dying mid-batch leaves at most the call in flight claimed
+    (and re-dialed by the stale-claim requeue), never the ones already made.
+    """
+    dialed = failed = 0
+
+    for call in calls:
+        bucket.acquire()
+
+        try:
+            result = start_ai_call(call.lead.phone_e164, call.lead_id)
+            error = None
+        except Exception as e:
+            result, error = {}, str(e)
+
+        if record_dial(call, result, error):
+            dialed += 1
+        else:
+            failed += 1
+
+    return dialed, failed
+
+
+def record_dial(call, result, error=None) -> bool:
+    """Store the outcome of dialing `call`; True when the provider started the call."""
+    now = timezone.now()
+    call.attempts += 1
+    call.updated_at = now
+    provider_call_id = result.get("call_id") or result.get("conversation_id")
+    counters = {"dialed_calls": 0, "failed_calls": 0}
+
+    if provider_call_id:
+        call.status = "dialed"
+        call.call_id = provider_call_id
+        call.last_error = ""
+        counters["dialed_calls"] = 1
+    else:
+        call.last_error = (error or str(result))[:2000]
+        if call.attempts >= settings.CALL_CAMPAIGN_MAX_ATTEMPTS:
+            call.status = "failed"
+            counters["failed_calls"] = 1
+        else:
+            call.status = "pending"
+            call.next_attempt_at = now + retry_delay(call.attempts)
+
+    with transaction.atomic():
+        if provider_call_id:
+            # The webhook may already have created the log for a fast call;
+            # post_save writes the timeline and rollup rows of new ones
+            LeadCallLog.objects.get_or_create(
+                call_id=provider_call_id,
+                defaults={"lead": call.lead, "status": "initiated"},
+            )
+            LeadFollowUp.objects.create(
+                lead=call.lead,
+                followup_type="ai_call",
+                notes="AI call initiated (campaign)",
+            )
+        call.save(update_fields=[
+            "status", "attempts", "call_id", "last_error", "next_attempt_at", "updated_at"
+        ])
+        if any(counters.values()):
+            CallCampaign.objects.filter(id=call.campaign_id).update(
+                dialed_calls=F("dialed_calls") + counters["dialed_calls"],
+                failed_calls=F("failed_calls") + counters["failed_calls"],
+                updated_at=now,
+            )
+
+    return bool(provider_call_id)
+
+
+def complete_finished_campaigns() -> int:
+    """Close running campaigns that have nothing left to dial."""
+    open_calls = CampaignCall.objects.filter(status__in=["pending", "dialing"])
+    return (
+        CallCampaign.objects.filter(status="running")
+        .exclude(id__in=open_calls.values("campaign_id"))
+        .update(status="completed", updated_at=timezone.now())
+    )
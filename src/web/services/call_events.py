@@ -0,0 +1,271 @@
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from web.models.lead import Lead, LeadFollowUp, LeadCallLog
+from web.models.webhook_event import CallWebhookEvent
+from web.models.payload_blob import PayloadBlob
+from web.utils.phone import normalize_phone
+
+
+def verify_elevenlabs_signature(body: bytes, signature_header: str) -> bool:
+    """
+    Check the `ElevenLabs-Signature: t=<ts>,v0=<hmac>` header, where the HMAC is
+    SHA-256 over "<ts>.<body>". Fails closed when no secret is configured.
+    """
+    secret = settings.ELEVENLABS_WEBHOOK_SECRET
+    if not secret or not signature_header:
+        return False
+
+    parts = dict(
+        item.split("=", 1) for item in signature_header.split(",") if "=" in item
+    )
+    timestamp = parts.get("t")
+    signature = parts.get("v0")
+    if not timestamp or not signature:
+        return False
+
+    try:
+        if abs(time.time() - int(timestamp)) > settings.ELEVENLABS_WEBHOOK_TOLERANCE:
+            return False
+    except ValueError:
+        return False
+
+    expected = hmac.new(
+        secret.encode(),
+        f"{timestamp}.".encode() + body,
+        hashlib.sha256
+    ).hexdigest()
+
+    return hmac.compare_digest(expected, signature)
+
+
+def get_call_id(data: dict):
+    return data.get("call_id") or data.get("conversation_id")
+
+
+def enqueue_call_event(data: dict, provider="elevenlabs"):
+    """
+    Store a raw webhook payload. Returns (event, created); redelivered events
+    with the same (call_id, status) are not stored twice.
+    """
+    call_id = get_call_id(data)
+    call_status = data.get("status", "completed")
+
+    if call_id:
+        idempotency_key = f"{call_id}:{call_status}"
+    else:
+        idempotency_key = hashlib.sha256(
+            json.dumps(data, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    existing = CallWebhookEvent.objects.filter(idempotency_key=idempotency_key[:255]).first()
+    if existing:
+        return existing, False
+
+    try:
+        with transaction.atomic():
+            event = CallWebhookEvent.objects.create(
+                provider=provider,
+                idempotency_key=idempotency_key[:255],
+                call_id=call_id,
+                call_status=call_status,
+                payload_blob=PayloadBlob.store(data)
+            )
+        return event, True
+    except IntegrityError:
+        return CallWebhookEvent.objects.get(idempotency_key=idempotency_key[:255]), False
+
+
+def claim_pending_events(limit=50):
+    """
+    Mark up to `limit` pending events as processing and return them in arrival
+    order. The conditional UPDATE makes sure two workers never claim the same row.
+    """
+    candidate_ids = list(
+        CallWebhookEvent.objects.filter(status="pending")
+        .order_by("created_at")
+        .values_list("id", flat=True)[:limit]
+    )
+
+    now = timezone.now()
+    claimed_ids = [
+        event_id
+        for event_id in candidate_ids
+        if CallWebhookEvent.objects.filter(id=event_id, status="pending")
+        .update(status="processing", claimed_at=now)
+    ]
+
+    return (
+        CallWebhookEvent.objects.filter(id__in=claimed_ids)
+        .select_related("payload_blob")
+        .order_by("created_at")
+    )
+
+
+def requeue_stale_events():
+    """Return claims held longer than CALL_EVENT_CLAIM_TIMEOUT (crashed workers) to the queue."""
+    cutoff = timezone.now() - timedelta(seconds=settings.CALL_EVENT_CLAIM_TIMEOUT)
+    return CallWebhookEvent.objects.filter(
+        Q(claimed_at__lt=cutoff) | Q(claimed_at__isnull=True),
+        status="processing",
+    ).update(status="pending")
+
+
+def parse_call_time(value):
+    """Provider timestamps arrive either as unix seconds or ISO 8601 strings."""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=dt_timezone.utc)
+    if isinstance(value, str):
+        try:
+            return parse_datetime(value)
+        except ValueError:
+            return None
+    return None
+
+
+def get_caller(data: dict):
+    """Return (phone, name, email) from either webhook payload shape."""
+    caller = data.get("caller")
+    if isinstance(caller, dict):
+        return caller.get("phone_number"), caller.get("name"), caller.get("email")
+    return data.get("from_number") or caller, None, None
+
+
+def match_lead_by_phone(phone, user_id=None):
+    """
+    Most recent lead of `user_id` with the same normalized phone number.
+    Inbound leads without a user mapping belong to Lead's default user, so
+    every lookup stays on the (user, phone_e164) index.
+    """
+    phone_e164 = normalize_phone(phone)
+    if not phone_e164:
+        return None
+
+    if user_id is None:
+        user_id = Lead._meta.get_field("user").get_default()
+
+    return (
+        Lead.objects.filter(user_id=user_id, phone_e164=phone_e164)
+        .order_by("-created_at")
+        .first()
+    )
+
+
+def normalize_call_fields(data: dict):
+    """Columns kept on LeadCallLog so reads never have to open the payload."""
+    duration = data.get("duration")
+    intent = data.get("intent")
+    sentiment = data.get("sentiment")
+    return {
+        "agent_id": data.get("agent_id"),
+        "started_at": parse_call_time(data.get("started_at")),
+        "ended_at": parse_call_time(data.get("ended_at")),
+        "duration": int(duration) if isinstance(duration, (int, float)) else None,
+        "intent": str(intent)[:255] if intent else None,
+        "sentiment": str(sentiment)[:50] if sentiment else None,
+        "recording_url": data.get("recording_url"),
+    }
+
+
+def apply_call_event(event: CallWebhookEvent):
+    """
+    Attach a stored call event to its lead, call log and followup history.
+    The payload blob is shared by reference; no row gets its own copy.
+    """
+    data = event.payload
+    metadata = data.get("metadata", {}) or {}
+    lead_id = metadata.get("lead_id")
+    call_id = get_call_id(data)
+    status_val = data.get("status", "completed")
+
+    # =========================
+    # ✅ CASE 1 — existing lead
+    # =========================
+    lead = None
+
+    if lead_id:
+        lead = Lead.objects.filter(id=lead_id).first()
+
+    # A later event for a call we already know belongs to the same lead
+    if not lead and call_id:
+        call_log = LeadCallLog.objects.select_related("lead").filter(call_id=call_id).first()
+        lead = call_log.lead if call_log else None
+
+    # =========================
+    # ✅ CASE 2 — inbound call
+    # =========================
+    phone, name, email = get_caller(data)
+
+    # Repeat callers attach to the lead created by their first call
+    if not lead:
+        lead = match_lead_by_phone(phone, metadata.get("user_id"))
+
+    if not lead:
+
+        lead_fields = {
+            "name": name or phone or "Inbound Lead",
+            "email": email,
+            "phone": phone or "unknown",
+            "source": "inbound_call",
+        }
+        if metadata.get("user_id"):
+            lead_fields["user_id"] = metadata.get("user_id")  # optional mapping
+
+        lead = Lead.objects.create(**lead_fields)
+
+    # =========================
+    # ✅ update call log
+    # =========================
+    if call_id:
+        call_fields = {
+            "status": str(status_val)[:30],
+            "event": event,
+            **{k: v for k, v in normalize_call_fields(data).items() if v is not None},
+        }
+        LeadCallLog.objects.update_or_create(
+            call_id=call_id,
+            defaults=call_fields,
+            create_defaults={"lead": lead, **call_fields}
+        )
+
+    # =========================
+    # ✅ store followup
+    # =========================
+    LeadFollowUp.objects.create(
+        lead=lead,
+        followup_type="ai_call",
+        notes=f"AI call {status_val}",
+        conversation_id=event.payload_blob_id,
+        call_event=event
+    )
+
+    return lead
+
+
+def process_call_event(event: CallWebhookEvent) -> bool:
+    """Process one claimed event; failures are recorded on the event row."""
+    event.attempts += 1
+
+    try:
+        with transaction.atomic():
+            apply_call_event(event)
+    except Exception as e:
+        event.status = "failed"
+        event.error = str(e)[:2000]
+        event.save(update_fields=["status", "error", "attempts"])
+        return False
+
+    event.status = "processed"
+    event.error = ""
+    event.processed_at = timezone.now()
+    event.save(update_fields=["status", "error", "attempts", "processed_at"])
+    return True
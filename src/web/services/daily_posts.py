@@ -0,0 +1,90 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.utils import timezone
+
+from web.models.brand import Brand
+from web.models.daily_post import DailyPostSet
+from web.services.brand_context import build_brand_context
+from web.services.gemini_webextractor import generate_daily_trending_posts
+from web.services.structured_output import StructuredOutputError
+from web.utils.ai_image_generator import generate_post_image
+
+logger = logging.getLogger(__name__)
+
+
+class DailyPostsError(StructuredOutputError):
+    """Gemini did not return valid posts; `raw_response` holds what it sent."""
+
+
+def generate_post_set(brand_payload: dict):
+    """
+    Generate the trending posts for one brand payload, with an image for
+    every post that has an image prompt. Touches Gemini only, never the
+    database, so it is safe to run in worker threads.
+    """
+    try:
+        posts_json = generate_daily_trending_posts(brand_payload)
+    except StructuredOutputError as e:
+        raise DailyPostsError(e.raw_response, e.errors)
+
+    for post in posts_json.get("daily_trending_posts", []):
+        image_prompt = post.get("image_prompt")
+
+        if image_prompt:
+            try:
+                post["generated_image_url"] = generate_post_image(image_prompt)
+            except Exception as e:
+                post["generated_image_url"] = None
+                post["image_error"] = str(e)
+
+    return posts_json
+
+
+def store_post_set(brand_id, day, posts_json):
+    post_set, _ = DailyPostSet.objects.update_or_create(
+        brand_id=brand_id,
+        date=day,
+        defaults={"posts": posts_json}
+    )
+    return post_set
+
+
+def active_brands():
+    return Brand.objects.filter(user__status="active")
+
+
+def precompute_daily_posts(day=None, chunk_size=100, concurrency=4, force=False):
+    """
+    Generate `day`'s post set for every active brand. Brands are read in
+    id-ordered chunks; each chunk is generated by at most `concurrency`
+    parallel Gemini calls and saved from this thread.
+    Returns (generated, failed) counts.
+    """
+    day = day or timezone.localdate()
+    brands = active_brands().order_by("id")
+    if not force:
+        brands = brands.exclude(daily_post_sets__date=day)
+
+    generated = failed = 0
+    last_id = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            chunk = list(brands.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+
+            payloads = [build_brand_context(brand)["prompt_payload"] for brand in chunk]
+            futures = [pool.submit(generate_post_set, payload) for payload in payloads]
+
+            for brand, future in zip(chunk, futures):
+                try:
+                    store_post_set(brand.id, day, future.result())
+                    generated += 1
+                except Exception:
+                    logger.exception("daily posts for brand %s on %s failed", brand.id, day)
+                    failed += 1
+
+    return generated, failed
@@ -1,6 +1,8 @@
 import requests
 from django.conf import settings
 
+from core.telemetry import upstream_call
+
 
 def start_ai_call(phone_number: str, lead_id: int):
     url = "https://api.elevenlabs.io/v1/convai/twilio/outbound-call"
@@ -19,7 +21,9 @@ def start_ai_call(phone_number: str, lead_id: int):
         "Content-Type": "application/json"
     }
 
-    response = requests.post(url, json=payload, headers=headers)
+    with upstream_call("elevenlabs", "outbound_call") as call:
+        response = requests.post(url, json=payload, headers=headers, timeout=settings.ELEVENLABS_REQUEST_TIMEOUT)
+        call.failed = response.status_code >= 400
 
     try:
         return response.json()
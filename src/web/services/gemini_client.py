@@ -0,0 +1,188 @@
+import hashlib
+import threading
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from core.telemetry import upstream_call
+from web.services.rate_limit import (
+    CircuitBreaker,
+    LimitExceeded,
+    SharedRateLimiter,
+    SharedSemaphore,
+)
+
+TEXT_MODEL = "gemini-2.5-flash"
+IMAGE_MODEL = "gemini-2.0-flash-preview-image-generation"
+
+_lock = threading.RLock()
+_genai = None
+_models = {}
+
+
+def get_genai():
+    """
+    The configured google.generativeai module. The SDK is imported and
+    configured on first use, not at import time, so Django startup and
+    management commands that never call Gemini do not pay for it.
+    """
+    global _genai
+    if _genai is None:
+        with _lock:
+            if _genai is None:
+                import google.generativeai as genai
+
+                genai.configure(
+                    api_key=settings.GEMINI_API_KEY,
+                    transport=settings.GEMINI_TRANSPORT or None,
+                )
+                _genai = genai
+    return _genai
+
+
+def get_model(name=TEXT_MODEL):
+    """Shared GenerativeModel per model name, created once per process."""
+    model = _models.get(name)
+    if model is None:
+        with _lock:
+            model = _models.get(name)
+            if model is None:
+                model = get_genai().GenerativeModel(name)
+                _models[name] = model
+    return model
+
+
+class GeminiUnavailable(Exception):
+    """Gemini is overloaded, rate limited or failing; nothing cached to fall back on."""
+
+
+_guards = {}
+
+
+def get_guards(model_name=TEXT_MODEL):
+    """
+    (semaphore, rate limiter, circuit breaker) for one model. Each model has
+    its own quota and health, so an image model outage does not block text.
+    """
+    guards = _guards.get(model_name)
+    if guards is None:
+        with _lock:
+            guards = _guards.get(model_name)
+            if guards is None:
+                guards = (
+                    SharedSemaphore(
+                        f"gemini:{model_name}:concurrency",
+                        settings.GEMINI_MAX_CONCURRENCY,
+                        lease=settings.GEMINI_CALL_LEASE,
+                    ),
+                    SharedRateLimiter(
+                        f"gemini:{model_name}:rate",
+                        settings.GEMINI_RATE_LIMIT,
+                        window=settings.GEMINI_RATE_WINDOW,
+                    ),
+                    CircuitBreaker(
+                        f"gemini:{model_name}:circuit",
+                        threshold=settings.GEMINI_BREAKER_THRESHOLD,
+                        window=settings.GEMINI_BREAKER_WINDOW,
+                        cooldown=settings.GEMINI_BREAKER_COOLDOWN,
+                        probe_timeout=settings.GEMINI_CALL_LEASE,
+                    ),
+                )
+                _guards[model_name] = guards
+    return guards
+
+
+def reset_clients():
+    """Forget the configured SDK, models and guards, e.g. after changing their settings."""
+    global _genai
+    with _lock:
+        _genai = None
+        _models.clear()
+        _guards.clear()
+
+
+def is_transient(error):
+    """
+    Whether `error` says Gemini is unhealthy (5xx, 429, timeouts, connection
+    failures) rather than that the request was refused (other 4xx, blocked
+    prompts, invalid arguments).
+    """
+    from google.api_core import exceptions
+
+    return isinstance(error, (
+        exceptions.ServerError,
+        exceptions.TooManyRequests,
+        exceptions.RetryError,
+        TimeoutError,
+        ConnectionError,
+        requests.Timeout,
+        requests.ConnectionError,
+    ))
+
+
+def generate_content(prompt, generation_config=None, model_name=TEXT_MODEL):
+    """
+    model.generate_content() behind the model's shared concurrency limit,
+    rate limit and circuit breaker. Raises CircuitOpen / LimitExceeded without
+    calling Gemini when it is unhealthy or saturated. Only transient errors
+    count towards opening the circuit.
+    """
+    semaphore, rate_limiter, breaker = get_guards(model_name)
+    breaker.check()
+
+    timeout = settings.GEMINI_ACQUIRE_TIMEOUT
+    try:
+        rate_limiter.acquire(timeout=timeout)
+        handle = semaphore.acquire(timeout=timeout)
+    except LimitExceeded:
+        # Let another caller probe a half-open circuit
+        breaker.release_probe()
+        raise
+    try:
+        with upstream_call("gemini", model_name):
+            response = get_model(model_name).generate_content(
+                prompt, generation_config=generation_config
+            )
+    except Exception as e:
+        if is_transient(e):
+            breaker.record_failure()
+        else:
+            # Gemini answered; the request itself was at fault
+            breaker.record_success()
+        raise
+    finally:
+        semaphore.release(handle)
+
+    breaker.record_success()
+    return response
+
+
+def response_cache_key(prompt, generation_config=None, model_name=TEXT_MODEL):
+    return "gemini:response:" + hashlib.sha256(
+        f"{model_name}:{generation_config}:{prompt}".encode()
+    ).hexdigest()
+
+
+def remember_response(prompt, text, generation_config=None, model_name=TEXT_MODEL):
+    """Keep `text` as the last good answer to `prompt`, once the caller has validated it."""
+    cache.set(
+        response_cache_key(prompt, generation_config, model_name),
+        text,
+        settings.GEMINI_RESPONSE_CACHE_TIMEOUT,
+    )
+
+
+def generate_text(prompt, generation_config=None, model_name=TEXT_MODEL):
+    """
+    Response text for `prompt`. When Gemini cannot be called or fails, the
+    last good answer kept with remember_response() is returned instead, so
+    an upstream outage degrades to slightly stale answers.
+    """
+    try:
+        return generate_content(prompt, generation_config, model_name).text
+    except Exception as e:
+        cached = cache.get(response_cache_key(prompt, generation_config, model_name))
+        if cached is not None:
+            return cached
+        raise GeminiUnavailable(str(e)) from e
@@ -0,0 +1,89 @@
+from web.services.structured_output import OutputSchema
+
+STRING = {"type": "string"}
+STRING_LIST = {"type": "array", "items": STRING}
+
+WEBSITE_ANALYSIS_PROPERTIES = {
+    "entity_type": {"type": "string", "enum": ["Product", "Person", "Place", "Brand"]},
+    "industry": STRING,
+    "brand_summary": STRING,
+    "target_audience": STRING,
+    "audience_pain_points": STRING_LIST,
+    "value_proposition": STRING,
+    "brand_tone": STRING,
+    "content_pillars": STRING_LIST,
+}
+
+WEBSITE_ANALYSIS = OutputSchema("website_analysis", {
+    "type": "object",
+    "properties": WEBSITE_ANALYSIS_PROPERTIES,
+    "required": list(WEBSITE_ANALYSIS_PROPERTIES),
+})
+
+SOCIAL_POST = {
+    "type": "object",
+    "properties": {
+        "post_title": STRING,
+        "post_description": STRING,
+        "caption": STRING,
+        "image_idea": STRING,
+        "image_prompt": STRING,
+        "format": STRING,
+    },
+    "required": ["post_title", "caption", "image_prompt"],
+}
+
+# posting_frequency and hashtag_strategy come back either as text or per
+# platform; both are fine, so they are left untyped
+STRATEGY_PROPERTIES = {
+    "recommended_social_platforms": {"type": "object", "additionalProperties": STRING},
+    "posting_frequency": {},
+    "hashtag_strategy": {},
+    "bio_description": STRING,
+    "call_to_action_ideas": STRING_LIST,
+    "sample_post_ideas": {
+        "type": "object",
+        "additionalProperties": {"type": "array", "items": SOCIAL_POST},
+    },
+}
+
+SOCIAL_STRATEGY = OutputSchema("social_strategy", {
+    "type": "object",
+    "properties": STRATEGY_PROPERTIES,
+    "required": list(STRATEGY_PROPERTIES),
+})
+
+WEBSITE_MARKETING = OutputSchema("website_marketing", {
+    "type": "object",
+    "properties": {
+        **WEBSITE_ANALYSIS_PROPERTIES,
+        **STRATEGY_PROPERTIES,
+        "sample_post_ideas": {"type": "array", "items": {}},
+    },
+    "required": list(WEBSITE_ANALYSIS_PROPERTIES) + list(STRATEGY_PROPERTIES),
+})
+
+DAILY_POSTS = OutputSchema("daily_posts", {
+    "type": "object",
+    "properties": {
+        "daily_trending_posts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "post_title": STRING,
+                    "target_platform": STRING,
+                    "content_type": STRING,
+                    "caption": STRING,
+                    "hook": STRING,
+                    "hashtags": STRING_LIST,
+                    "image_idea": STRING,
+                    "image_prompt": STRING,
+                    "recommended_posting_time": STRING,
+                },
+                "required": ["post_title", "target_platform", "caption", "image_prompt"],
+            },
+        },
+    },
+    "required": ["daily_trending_posts"],
+})
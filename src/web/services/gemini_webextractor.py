@@ -1,84 +1,34 @@
-import json
-import google.generativeai as genai
-from django.conf import settings
-
-genai.configure(api_key=settings.GEMINI_API_KEY)
-
-model = genai.GenerativeModel("gemini-2.5-flash")
-
-def analyze_website(website_url: str, website_text: str) -> str:
-    prompt = f"""
-You are a senior social media marketing strategist.
-
-Analyze the website below for social media marketing.
-
-Website URL:
-{website_url}
-
-Website Content:
-{website_text}
-
-Return STRICT JSON with the following fields:
-- entity_type (Product / Person / Place / Brand)
-- industry
-- brand_summary
-- target_audience
-- audience_pain_points
-- value_proposition
-- brand_tone
-- content_pillars (array)
-"""
-
-    response = model.generate_content(
-        prompt,
-        generation_config={
-            "temperature": 0.6,
-            "response_mime_type": "application/json"
-        }
+from web.services.gemini_schemas import (
+    DAILY_POSTS,
+    SOCIAL_STRATEGY,
+    WEBSITE_ANALYSIS,
+    WEBSITE_MARKETING,
+)
+from web.services.prompt_builder import build_website_prompt, compact_json
+from web.services.structured_output import generate_json
+
+def analyze_website(website_url: str, sections: list) -> dict:
+    prompt = build_website_prompt(website_url, sections)
+
+    return generate_json(prompt, WEBSITE_ANALYSIS, temperature=0.6)
+
+def analyze_website_marketing(website_url: str, sections: list) -> dict:
+    prompt = build_website_prompt(
+        website_url,
+        sections,
+        extra_fields=[
+            "recommended_social_platforms (object with reasons)",
+            "posting_frequency",
+            "hashtag_strategy",
+            "bio_description",
+            "call_to_action_ideas",
+            "sample_post_ideas (minimum 5)",
+        ],
     )
 
-    return response.text
+    return generate_json(prompt, WEBSITE_MARKETING, temperature=0.6)
 
-def analyze_website_marketing(website_url: str, website_text: str) -> str:
-    prompt = f"""
-You are a senior social media marketing strategist.
-
-Analyze the website below for social media marketing.
-
-Website URL:
-{website_url}
-
-Website Content:
-{website_text}
-
-Return STRICT JSON with the following fields:
-- entity_type (Product / Person / Place / Brand)
-- industry
-- brand_summary
-- target_audience
-- audience_pain_points
-- value_proposition
-- brand_tone
-- content_pillars (array)
-- recommended_social_platforms (object with reasons)
-- posting_frequency
-- hashtag_strategy
-- bio_description
-- call_to_action_ideas
-- sample_post_ideas (minimum 5)
-"""
-
-    response = model.generate_content(
-        prompt,
-        generation_config={
-            "temperature": 0.6,
-            "response_mime_type": "application/json"
-        }
-    )
-
-    return response.text
-
-def analyze_brand_social_strategy(brand_payload: dict) -> str:
+def analyze_brand_social_strategy(brand_payload: dict) -> dict:
     """
     brand_payload contains brand + style + positioning info from DB
     """
@@ -90,7 +40,7 @@ Using the brand details below, create a complete social media strategy
 AND platform-specific post ideas with visual guidance.
 
 Brand Details (JSON):
-{json.dumps(brand_payload, indent=2)}
+{compact_json(brand_payload)}
 
 Return STRICT JSON with the following structure:
 
@@ -121,17 +71,9 @@ Ensure:
 - Image prompts are descriptive and production-ready
 """
 
-    response = model.generate_content(
-        prompt,
-        generation_config={
-            "temperature": 0.6,
-            "response_mime_type": "application/json"
-        }
-    )
-
-    return response.text
+    return generate_json(prompt, SOCIAL_STRATEGY, temperature=0.6)
 
-def generate_daily_trending_posts(brand_payload: dict) -> str:
+def generate_daily_trending_posts(brand_payload: dict) -> dict:
     """
     Generates 5 trending daily posts with AI image prompts
     tailored to the brand.
@@ -143,7 +85,7 @@ You are a senior social media strategist and viral content expert.
 Using the brand details below, generate DAILY TRENDING social media posts.
 
 Brand Details (JSON):
-{json.dumps(brand_payload, indent=2)}
+{compact_json(brand_payload)}
 
 Requirements:
 
@@ -172,12 +114,4 @@ Each post object must contain:
 Make posts feel fresh, viral, and trend-aware.
 """
 
-    response = model.generate_content(
-        prompt,
-        generation_config={
-            "temperature": 0.8,  # slightly higher for creativity
-            "response_mime_type": "application/json"
-        }
-    )
-
-    return response.text
+    return generate_json(prompt, DAILY_POSTS, temperature=0.8)  # slightly higher for creativity
@@ -0,0 +1,212 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from web.models.lead import Lead, LeadCallLog
+from web.models.lead_stat import LeadDailyStat
+
+# Funnel order used for stage-to-stage conversion; "lost" can happen at any stage
+FUNNEL_STAGES = ["new", "contacted", "qualified", "closed"]
+
+
+def bump(user_id, day, metric, key, delta):
+    if not delta or user_id is None:
+        return
+
+    lookup = {"user_id": user_id, "date": day, "metric": metric, "key": str(key)[:100]}
+    if LeadDailyStat.objects.filter(**lookup).update(count=F("count") + delta):
+        return
+
+    try:
+        with transaction.atomic():
+            LeadDailyStat.objects.create(count=delta, **lookup)
+    except IntegrityError:
+        # Created concurrently by another writer
+        LeadDailyStat.objects.filter(**lookup).update(count=F("count") + delta)
+
+
+def cohort_day(created_at):
+    return timezone.localtime(created_at).date() if created_at else timezone.localdate()
+
+
+def on_lead_saved(sender, instance, created, **kwargs):
+    day = cohort_day(instance.created_at)
+
+    for metric, field, original in [
+        ("lead_status", "status", instance._original_status),
+        ("lead_source", "source", instance._original_source),
+    ]:
+        current = getattr(instance, field)
+        if created:
+            bump(instance.user_id, day, metric, current, 1)
+        elif original is not None and original != current:
+            bump(instance.user_id, day, metric, original, -1)
+            bump(instance.user_id, day, metric, current, 1)
+
+    instance._original_status = instance.status
+    instance._original_source = instance.source
+
+
+def on_lead_deleted(sender, instance, **kwargs):
+    day = cohort_day(instance.created_at)
+    bump(instance.user_id, day, "lead_status", instance.status, -1)
+    bump(instance.user_id, day, "lead_source", instance.source, -1)
+
+
+def call_owner(call_log):
+    if "lead" in call_log._state.fields_cache:
+        return call_log.lead.user_id
+    return Lead.objects.filter(id=call_log.lead_id).values_list("user_id", flat=True).first()
+
+
+def on_call_log_saved(sender, instance, created, **kwargs):
+    original = instance._original_status
+    instance._original_status = instance.status
+
+    if not created and (original is None or original == instance.status):
+        return
+
+    user_id = call_owner(instance)
+    day = cohort_day(instance.created_at)
+    if not created:
+        bump(user_id, day, "call_status", original, -1)
+    bump(user_id, day, "call_status", instance.status, 1)
+
+
+def on_call_log_deleted(sender, instance, **kwargs):
+    bump(call_owner(instance), cohort_day(instance.created_at), "call_status", instance.status, -1)
+
+
+def record_new_leads(leads):
+    """Rollup counts for leads written with bulk_create, which skips post_save."""
+    counts = defaultdict(int)
+    for lead in leads:
+        day = cohort_day(lead.created_at)
+        counts[(lead.user_id, day, "lead_status", lead.status)] += 1
+        counts[(lead.user_id, day, "lead_source", lead.source)] += 1
+
+    for (user_id, day, metric, key), delta in counts.items():
+        bump(user_id, day, metric, key, delta)
+
+
+def record_new_calls(call_logs):
+    """Rollup counts for call logs written with bulk_create, which skips post_save."""
+    owners = dict(
+        Lead.objects.filter(id__in={c.lead_id for c in call_logs}).values_list("id", "user_id")
+    )
+    counts = defaultdict(int)
+    for call_log in call_logs:
+        counts[(owners.get(call_log.lead_id), cohort_day(call_log.created_at), call_log.status)] += 1
+
+    for (user_id, day, status), delta in counts.items():
+        bump(user_id, day, "call_status", status, delta)
+
+
+def compute_daily_stats(since=None, user_id=None):
+    """Rebuild rollup rows from the source tables with GROUP BY queries."""
+    leads = Lead.objects.all()
+    calls = LeadCallLog.objects.all()
+    if since:
+        leads = leads.filter(created_at__date__gte=since)
+        calls = calls.filter(created_at__date__gte=since)
+    if user_id:
+        leads = leads.filter(user_id=user_id)
+        calls = calls.filter(lead__user_id=user_id)
+
+    sources = [
+        ("lead_status", leads, "user_id", "status"),
+        ("lead_source", leads, "user_id", "source"),
+        ("call_status", calls, "lead__user_id", "status"),
+    ]
+
+    rows = []
+    for metric, queryset, user_field, key_field in sources:
+        grouped = (
+            queryset.annotate(day=TruncDate("created_at"))
+            .values(user_field, key_field, "day")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        for row in grouped:
+            rows.append(
+                LeadDailyStat(
+                    user_id=row[user_field],
+                    date=row["day"],
+                    metric=metric,
+                    key=str(row[key_field])[:100],
+                    count=row["total"],
+                )
+            )
+    return rows
+
+
+def reconcile_daily_stats(since=None, user_id=None):
+    """
+    Replace rollup rows from `since` (all time when None) with freshly
+    computed ones. Returns the number of rows written.
+    """
+    rows = compute_daily_stats(since, user_id)
+
+    existing = LeadDailyStat.objects.all()
+    if since:
+        existing = existing.filter(date__gte=since)
+    if user_id:
+        existing = existing.filter(user_id=user_id)
+
+    with transaction.atomic():
+        existing.delete()
+        LeadDailyStat.objects.bulk_create(rows, batch_size=1000)
+
+    return len(rows)
+
+
+def lead_metrics(user, days=30):
+    """
+    Funnel, source, call outcome and per-day figures for leads created in the
+    last `days` days, read from the rollup table only.
+    """
+    until = timezone.localdate()
+    since = until - timedelta(days=days - 1)
+
+    totals = {"lead_status": defaultdict(int), "lead_source": defaultdict(int), "call_status": defaultdict(int)}
+    per_day = defaultdict(lambda: {"leads": 0, "calls": 0})
+
+    for day, metric, key, count in LeadDailyStat.objects.filter(
+        user=user, date__gte=since, date__lte=until
+    ).values_list("date", "metric", "key", "count"):
+        totals[metric][key] += count
+        if metric == "lead_status":
+            per_day[day]["leads"] += count
+        elif metric == "call_status":
+            per_day[day]["calls"] += count
+
+    by_status = totals["lead_status"]
+
+    # Leads that reached a stage are those at it or any later stage
+    reached = {
+        stage: sum(by_status.get(s, 0) for s in FUNNEL_STAGES[i:])
+        for i, stage in enumerate(FUNNEL_STAGES)
+    }
+    conversion = {
+        f"{prev}_to_{stage}": round(reached[stage] / reached[prev], 4) if reached[prev] else None
+        for prev, stage in zip(FUNNEL_STAGES, FUNNEL_STAGES[1:])
+    }
+
+    return {
+        "from": since,
+        "to": until,
+        "total_leads": sum(by_status.values()),
+        "total_calls": sum(totals["call_status"].values()),
+        "by_status": dict(by_status),
+        "by_source": dict(totals["lead_source"]),
+        "call_outcomes": dict(totals["call_status"]),
+        "conversion": conversion,
+        "by_day": [
+            {"date": day, **per_day[day]}
+            for day in sorted(per_day)
+        ],
+    }
@@ -0,0 +1,106 @@
+import json
+import logging
+import re
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Website sections in the order they are kept when the budget runs out
+SECTION_PRIORITY = {"title": 0, "meta": 0, "h1": 1, "h2": 2, "h3": 3, "p": 4, "li": 5, "text": 6}
+
+# Body text shorter than this is usually a button, label or link
+MIN_BODY_WORDS = 4
+
+WHITESPACE = re.compile(r"\s+")
+
+WEBSITE_ANALYSIS_FIELDS = [
+    "entity_type (Product / Person / Place / Brand)",
+    "industry",
+    "brand_summary",
+    "target_audience",
+    "audience_pain_points",
+    "value_proposition",
+    "brand_tone",
+    "content_pillars (array)",
+]
+
+WEBSITE_PROMPT = """You are a senior social media marketing strategist.
+
+Analyze the website below for social media marketing.
+
+Website URL: {website_url}
+
+Website Content:
+{website_text}
+
+Return STRICT JSON with the following fields:
+{fields}
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Local estimate (~4 characters per token for English); no API call."""
+    return (len(text) + 3) // 4
+
+
+def drop_empty(value):
+    """Recursively remove None, empty strings and empty containers."""
+    if isinstance(value, dict):
+        cleaned = {k: drop_empty(v) for k, v in value.items()}
+        return {k: v for k, v in cleaned.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        cleaned = [drop_empty(v) for v in value]
+        return [v for v in cleaned if v not in (None, "", [], {})]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def compact_json(payload) -> str:
+    """Prompt-ready JSON: no empty fields, no indentation, non-ASCII kept as is."""
+    return json.dumps(drop_empty(payload), separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def compact_website_sections(sections, budget_tokens=None) -> str:
+    """
+    Fit scraped sections into `budget_tokens`. Repeated blocks and short
+    fragments are dropped, headings are kept before body text, and the kept
+    sections are returned in page order.
+    """
+    budget_tokens = budget_tokens or settings.GEMINI_WEBSITE_TOKEN_BUDGET
+
+    seen = set()
+    candidates = []
+    for position, section in enumerate(sections):
+        text = WHITESPACE.sub(" ", section["text"]).strip()
+        key = text.lower()
+        if not text or key in seen:
+            continue
+        seen.add(key)
+
+        kind = section["kind"]
+        if kind in ("p", "li", "text") and len(text.split()) < MIN_BODY_WORDS:
+            continue
+        candidates.append((SECTION_PRIORITY.get(kind, 7), position, text))
+
+    kept, used = [], 0
+    for _, position, text in sorted(candidates):
+        cost = estimate_tokens(text) + 1
+        if used + cost > budget_tokens:
+            continue
+        kept.append((position, text))
+        used += cost
+
+    return "\n".join(text for _, text in sorted(kept))
+
+
+def build_website_prompt(website_url, sections, extra_fields=()):
+    fields = "\n".join(f"- {field}" for field in [*WEBSITE_ANALYSIS_FIELDS, *extra_fields])
+    prompt = WEBSITE_PROMPT.format(
+        website_url=website_url,
+        website_text=compact_website_sections(sections),
+        fields=fields,
+    )
+    logger.debug("website prompt for %s: ~%d tokens", website_url, estimate_tokens(prompt))
+    return prompt
@@ -0,0 +1,96 @@
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    """
+    Counts queries and their total time through a connection execute
+    wrapper, so it works with DEBUG off and does not keep the SQL around.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+    @property
+    def duration_ms(self):
+        return round(self.duration * 1000, 2)
+
+
+@contextmanager
+def track_queries():
+    """Count the queries run on every database connection of this thread."""
+    stats = QueryStats()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+        yield stats
+
+
+@lru_cache(maxsize=None)
+def load_budgets(path):
+    """{view name: max queries} from a budgets file, plus its "default" entry."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    budgets = dict(data.get("budgets", {}))
+    if data.get("default") is not None:
+        budgets.setdefault("default", data["default"])
+    return budgets
+
+
+def budget_for(view_name):
+    """Query budget of a resolved view name ("web:leaddetails"), or None."""
+    budgets = load_budgets(str(settings.QUERY_BUDGETS_FILE))
+    return budgets.get(view_name, budgets.get("default"))
+
+
+@contextmanager
+def query_budget(max_queries):
+    """Test helper: fail when the block runs more than `max_queries` queries."""
+    with track_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(f"{stats.count} queries, budget is {max_queries}")
+
+
+def check_budget(view_name, stats):
+    budget = budget_for(view_name)
+    if budget is not None and stats.count > budget:
+        raise QueryBudgetExceeded(
+            f"{view_name} ran {stats.count} queries, budget is {budget} "
+            f"(see {settings.QUERY_BUDGETS_FILE})"
+        )
+
+
+def record_query_stats(view_name, method, status_code, stats):
+    """One log line per request, for the log based metrics pipeline."""
+    budget = budget_for(view_name)
+    over_budget = budget is not None and stats.count > budget
+    logger.log(
+        logging.WARNING if over_budget else logging.INFO,
+        "db_queries view=%s method=%s status=%s queries=%d db_ms=%.2f budget=%s",
+        view_name, method, status_code, stats.count, stats.duration * 1000, budget,
+    )
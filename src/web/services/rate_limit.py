@@ -0,0 +1,237 @@
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+
+
+class TokenBucket:
+    """
+    In-process token bucket: `rate` tokens are added per second up to
+    `capacity`. acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1):
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class LimitExceeded(Exception):
+    pass
+
+
+class SharedSemaphore:
+    """
+    Cross-process semaphore of `limit` slots kept in the Django cache (shared
+    when it is Redis). Each slot is a key claimed with an atomic add() and a
+    lease, so slots of a crashed worker free themselves. Falls back to an
+    in-process semaphore when the cache is unreachable.
+    """
+
+    def __init__(self, name, limit, lease=120, poll_interval=0.1):
+        self.name = name
+        self.limit = limit
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._local = threading.BoundedSemaphore(limit)
+
+    def _try_slots(self, token):
+        for slot in range(self.limit):
+            key = f"{self.name}:slot:{slot}"
+            if cache.add(key, token, self.lease):
+                return key
+        return None
+
+    def acquire(self, timeout=10):
+        """Return a handle for release(); raises LimitExceeded after `timeout` seconds."""
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + timeout
+
+        while True:
+            try:
+                key = self._try_slots(token)
+            except Exception:
+                if self._local.acquire(timeout=max(deadline - time.monotonic(), 0)):
+                    return ("local", None)
+                raise LimitExceeded(f"{self.name}: no free slot")
+
+            if key:
+                return (key, token)
+            if time.monotonic() >= deadline:
+                raise LimitExceeded(f"{self.name}: no free slot")
+            time.sleep(self.poll_interval)
+
+    def release(self, handle):
+        key, token = handle
+        if key == "local":
+            self._local.release()
+            return
+
+        try:
+            # Only free the slot if our lease has not expired and been taken over
+            if cache.get(key) == token:
+                cache.delete(key)
+        except Exception:
+            pass
+
+
+class SharedRateLimiter:
+    """
+    Bucket of `rate` tokens per `window` seconds shared through the Django
+    cache: every process draws from the same per-window counter. Falls back
+    to an in-process TokenBucket when the cache is unreachable.
+    """
+
+    def __init__(self, name, rate, window=60):
+        self.name = name
+        self.rate = rate
+        self.window = window
+        self._local = TokenBucket(rate / window, capacity=rate)
+
+    def try_acquire(self):
+        window_start = int(time.time() // self.window)
+        key = f"{self.name}:window:{window_start}"
+        try:
+            cache.add(key, 0, self.window * 2)
+            return cache.incr(key) <= self.rate
+        except Exception:
+            return self._local.try_acquire()
+
+    def acquire(self, timeout=10):
+        deadline = time.monotonic() + timeout
+        while not self.try_acquire():
+            if time.monotonic() >= deadline:
+                raise LimitExceeded(f"{self.name}: rate limit reached")
+            time.sleep(min(1.0, self.window / max(self.rate, 1)))
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens for `cooldown` seconds after `threshold` failures within `window`
+    seconds, so callers fail fast instead of waiting on an unhealthy upstream.
+    After the cooldown the circuit is half open: a single caller at a time is
+    let through as a probe (another one after `probe_timeout` if it never
+    reports back). A success closes the circuit, a failure reopens it. State
+    lives in the Django cache, with an in-process fallback.
+    """
+
+    def __init__(self, name, threshold=5, window=60, cooldown=30, probe_timeout=60):
+        self.name = name
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.probe_timeout = probe_timeout
+        self._local = {"failures": [], "open_until": 0.0, "half_open": False, "probe_until": 0.0}
+
+    @property
+    def failures_key(self):
+        return f"{self.name}:failures"
+
+    @property
+    def open_key(self):
+        return f"{self.name}:open"
+
+    @property
+    def half_open_key(self):
+        return f"{self.name}:half_open"
+
+    @property
+    def probe_key(self):
+        return f"{self.name}:probe"
+
+    def allow_request(self):
+        """Whether a call may go through now; claims the probe when half open."""
+        try:
+            if cache.get(self.open_key):
+                return False
+            if not cache.get(self.half_open_key):
+                return True
+            return cache.add(self.probe_key, True, self.probe_timeout)
+        except Exception:
+            now = time.monotonic()
+            if now < self._local["open_until"]:
+                return False
+            if not self._local["half_open"]:
+                return True
+            if now < self._local["probe_until"]:
+                return False
+            self._local["probe_until"] = now + self.probe_timeout
+            return True
+
+    def check(self):
+        if not self.allow_request():
+            raise CircuitOpen(f"{self.name}: upstream unhealthy, retry later")
+
+    def release_probe(self):
+        """Give back a probe claimed by check() for a call that was never made."""
+        try:
+            cache.delete(self.probe_key)
+        except Exception:
+            self._local["probe_until"] = 0.0
+
+    def _open(self):
+        cache.set(self.open_key, True, self.cooldown)
+        # Stays set until a probe succeeds
+        cache.set(self.half_open_key, True, None)
+        cache.delete_many([self.failures_key, self.probe_key])
+
+    def _open_local(self, now):
+        self._local.update(
+            failures=[], open_until=now + self.cooldown, half_open=True, probe_until=0.0
+        )
+
+    def record_success(self):
+        try:
+            cache.delete_many([self.failures_key, self.half_open_key, self.probe_key])
+        except Exception:
+            self._local.update(failures=[], half_open=False, probe_until=0.0)
+
+    def record_failure(self):
+        try:
+            if cache.get(self.half_open_key):
+                # The probe failed
+                self._open()
+                return
+            cache.add(self.failures_key, 0, self.window)
+            failures = cache.incr(self.failures_key)
+            if failures >= self.threshold:
+                self._open()
+        except Exception:
+            now = time.monotonic()
+            if self._local["half_open"]:
+                self._open_local(now)
+                return
+            recent = [t for t in self._local["failures"] if now - t < self.window] + [now]
+            self._local["failures"] = recent
+            if len(recent) >= self.threshold:
+                self._open_local(now)
@@ -0,0 +1,148 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from web.models.lead import LeadFollowUp, LeadCallLog
+from web.models.payload_blob import PayloadBlob
+from web.services.elevenlabs import start_ai_call
+from web.services.rate_limit import TokenBucket
+
+_call_bucket = None
+
+
+class ReminderError(Exception):
+    pass
+
+
+def claim_due_reminders(limit=50):
+    """
+    Lock up to `limit` due reminders with SELECT ... FOR UPDATE SKIP LOCKED
+    and mark them processing in the same transaction. Concurrent workers
+    skip each other's rows instead of waiting on them, so each reminder
+    goes to exactly one worker. Backends without row locks (SQLite) run the
+    plain SELECT; use a single worker there. A reminder is due at its
+    retry time after a failed send, else at next_followup_date. Each claim
+    counts as an attempt and stamps reminder_claimed_at, which identifies it
+    when the result is written back.
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        claimed = list(
+            LeadFollowUp.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(reminder_retry_at__isnull=True, next_followup_date__lte=now)
+                | Q(reminder_retry_at__lte=now),
+                reminder_status="scheduled",
+            )
+            .order_by("next_followup_date")
+            .values_list("id", flat=True)[:limit]
+        )
+        LeadFollowUp.objects.filter(id__in=claimed).update(
+            reminder_status="processing",
+            reminder_claimed_at=now,
+            reminder_attempts=F("reminder_attempts") + 1,
+        )
+
+    return (
+        LeadFollowUp.objects.filter(id__in=claimed)
+        .select_related("lead__user")
+        .order_by("next_followup_date")
+    )
+
+
+def requeue_stale_reminders():
+    """Return claims held longer than FOLLOWUP_REMINDER_CLAIM_TIMEOUT (crashed workers) to the queue."""
+    cutoff = timezone.now() - timedelta(seconds=settings.FOLLOWUP_REMINDER_CLAIM_TIMEOUT)
+    return LeadFollowUp.objects.filter(
+        reminder_status="processing", reminder_claimed_at__lt=cutoff
+    ).update(reminder_status="scheduled")
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=settings.FOLLOWUP_REMINDER_RETRY_BACKOFF * 2 ** (attempts - 1))
+
+
+def notify_owner(followup):
+    lead = followup.lead
+    send_mail(
+        subject=f"Follow-up due: {lead.name or lead.phone}",
+        message=(
+            f"Your {followup.get_followup_type_display().lower()} follow-up with "
+            f"{lead.name or 'a lead'} is due.\n\n{followup.notes or ''}"
+        ),
+        from_email=None,
+        recipient_list=[lead.user.email],
+    )
+
+
+def ai_call_reminder(followup):
+    global _call_bucket
+    if _call_bucket is None:
+        _call_bucket = TokenBucket(settings.ELEVENLABS_CALLS_PER_SECOND)
+    _call_bucket.acquire()
+
+    lead = followup.lead
+    result = start_ai_call(lead.phone, lead.id)
+    call_id = result.get("call_id") or result.get("conversation_id")
+    if not call_id:
+        raise ReminderError(f"Call not started: {result}")
+
+    LeadCallLog.objects.create(
+        lead=lead,
+        call_id=call_id,
+        response=PayloadBlob.store(result)
+    )
+    LeadFollowUp.objects.create(
+        lead=lead,
+        followup_type="ai_call",
+        notes="AI call from scheduled followup"
+    )
+
+
+# followup_type -> handler; anything else notifies the lead owner
+REMINDER_HANDLERS = {
+    "ai_call": ai_call_reminder,
+}
+
+
+def dispatch_reminder(followup) -> bool:
+    """
+    Run the handler for one claimed reminder. Failures are retried with a
+    growing delay up to the attempt limit. The result is only written while
+    this claim still holds the row: a reschedule or a stale-claim requeue
+    picked up by another worker in the meantime wins. Retries are timed by
+    reminder_retry_at; the follow-up date the user set is never moved.
+    """
+    handler = REMINDER_HANDLERS.get(followup.followup_type, notify_owner)
+    fields = {}
+
+    try:
+        handler(followup)
+    except Exception as e:
+        followup.reminder_error = str(e)[:2000]
+        if followup.reminder_attempts >= settings.FOLLOWUP_REMINDER_MAX_ATTEMPTS:
+            followup.reminder_status = "failed"
+        else:
+            followup.reminder_status = "scheduled"
+            fields["reminder_retry_at"] = timezone.now() + retry_delay(followup.reminder_attempts)
+        ok = False
+    else:
+        followup.reminder_error = ""
+        followup.reminder_status = "sent"
+        ok = True
+
+    LeadFollowUp.objects.filter(
+        id=followup.id,
+        reminder_status="processing",
+        reminder_claimed_at=followup.reminder_claimed_at,
+    ).update(
+        reminder_status=followup.reminder_status,
+        reminder_error=followup.reminder_error,
+        **fields,
+    )
+    return ok
@@ -0,0 +1,259 @@
+import json
+import re
+
+from django.conf import settings
+
+from web.services.gemini_client import generate_text, remember_response
+
+FENCE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+
+PYTHON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+}
+
+# Keys of our schemas that Gemini's response_schema understands
+GEMINI_SCHEMA_KEYS = {"type", "properties", "required", "items", "enum", "nullable", "description"}
+
+REPAIR_PROMPT = """The JSON below does not match the required schema.
+
+Errors:
+{errors}
+
+Schema:
+{schema}
+
+JSON:
+{output}
+
+Return only the corrected JSON. Keep every valid value unchanged.
+"""
+
+
+class StructuredOutputError(Exception):
+    """Gemini output that is still invalid after local and model repair."""
+
+    def __init__(self, raw_response, errors):
+        super().__init__("Invalid Gemini JSON")
+        self.raw_response = raw_response
+        self.errors = errors
+
+
+def compile_schema(schema):
+    """
+    Turn a schema dict (the JSON Schema subset Gemini accepts, plus
+    `additionalProperties` for objects keyed by name) into a function
+    validate(value, path) -> list of error strings. Nested schemas are
+    compiled once here, not on every validation.
+    """
+    kind = schema.get("type")
+    expected = PYTHON_TYPES.get(kind)
+    nullable = schema.get("nullable", False)
+    checks = []
+
+    if "enum" in schema:
+        allowed = set(schema["enum"])
+        checks.append(
+            lambda value, path: [] if value in allowed
+            else [f"{path}: must be one of {sorted(allowed)}"]
+        )
+
+    if kind == "object":
+        required = schema.get("required", [])
+        properties = {
+            name: compile_schema(child) for name, child in schema.get("properties", {}).items()
+        }
+        extra = schema.get("additionalProperties")
+        extra = compile_schema(extra) if isinstance(extra, dict) else None
+
+        def check_object(value, path):
+            errors = [f"{path}.{name}: is required" for name in required if name not in value]
+            for name, item in value.items():
+                validate_item = properties.get(name, extra)
+                if validate_item:
+                    errors.extend(validate_item(item, f"{path}.{name}"))
+            return errors
+
+        checks.append(check_object)
+
+    if kind == "array" and "items" in schema:
+        validate_item = compile_schema(schema["items"])
+        checks.append(
+            lambda value, path: [
+                error
+                for i, item in enumerate(value)
+                for error in validate_item(item, f"{path}[{i}]")
+            ]
+        )
+
+    def validate(value, path="$"):
+        if value is None:
+            return [] if nullable else [f"{path}: must not be null"]
+        if expected and (
+            not isinstance(value, expected)
+            or (isinstance(value, bool) and kind in ("integer", "number"))
+        ):
+            return [f"{path}: expected {kind}, got {type(value).__name__}"]
+
+        errors = []
+        for check in checks:
+            errors.extend(check(value, path))
+        return errors
+
+    return validate
+
+
+def to_gemini_schema(schema):
+    """
+    The response_schema to send to Gemini, or None when the schema uses
+    untyped values or objects keyed by name, which Gemini cannot express.
+    """
+    if not schema.get("type") or (schema["type"] == "object" and not schema.get("properties")):
+        return None
+
+    converted = {k: v for k, v in schema.items() if k in GEMINI_SCHEMA_KEYS}
+    if "properties" in schema:
+        properties = {name: to_gemini_schema(child) for name, child in schema["properties"].items()}
+        if None in properties.values():
+            return None
+        converted["properties"] = properties
+    if "items" in schema:
+        converted["items"] = to_gemini_schema(schema["items"])
+        if converted["items"] is None:
+            return None
+    return converted
+
+
+class OutputSchema:
+    """A named schema with its validator and Gemini response_schema, built once."""
+
+    def __init__(self, name, schema):
+        self.name = name
+        self.schema = schema
+        self.validate = compile_schema(schema)
+        self.response_schema = to_gemini_schema(schema)
+
+    def generation_config(self, **config):
+        config["response_mime_type"] = "application/json"
+        if self.response_schema:
+            config["response_schema"] = self.response_schema
+        return config
+
+
+def repair_json(text):
+    """
+    Local fixes for the usual LLM JSON problems: code fences, prose around
+    the document, trailing commas and output cut off mid-document. A
+    truncated document is cut back to its last complete element and its
+    open brackets are closed.
+    """
+    fenced = FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return text
+    text = text[min(starts):]
+
+    out = []
+    stack = []
+    in_string = escaped = False
+    # (length of out, open brackets) where the document can be cut and closed
+    safe = (0, [])
+
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            out.append(char)
+            safe = (len(out), list(stack))
+            continue
+        elif char in "}]":
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if not stack:
+                break
+            stack.pop()
+            out.append(char)
+            safe = (len(out), list(stack))
+            if not stack:
+                break
+            continue
+        elif char == ",":
+            safe = (len(out), list(stack))
+
+        out.append(char)
+
+    if stack or in_string:
+        length, open_brackets = safe
+        out = out[:length]
+        while out and (out[-1].isspace() or out[-1] == ","):
+            out.pop()
+        out.extend(reversed(open_brackets))
+
+    return "".join(out)
+
+
+def parse_output(text, schema):
+    """Return (data, errors) for a raw response, repairing it locally if needed."""
+    if not isinstance(text, str):
+        return None, ["$: empty response"]
+
+    try:
+        data = json.loads(text)
+    except ValueError:
+        try:
+            data = json.loads(repair_json(text))
+        except ValueError as e:
+            return None, [f"$: not valid JSON ({e})"]
+
+    return data, schema.validate(data)
+
+
+def generate_json(prompt, schema, temperature=0.6):
+    """
+    Generate a document matching `schema`. Output that fails to parse or
+    validate after local repair is sent back with a short repair prompt
+    (the errors, schema and broken output only) rather than regenerating
+    from the full prompt. Raises StructuredOutputError when it stays invalid.
+    The valid document is what generate_text() falls back to for `prompt`
+    during an outage.
+    """
+    config = schema.generation_config(temperature=temperature)
+    text = generate_text(prompt, generation_config=config)
+    data, errors = parse_output(text, schema)
+
+    for _ in range(settings.GEMINI_JSON_REPAIR_ATTEMPTS):
+        if not errors:
+            break
+        repair_prompt = REPAIR_PROMPT.format(
+            errors="\n".join(f"- {error}" for error in errors[:20]),
+            schema=json.dumps(schema.schema, separators=(",", ":")),
+            output=text,
+        )
+        text = generate_text(repair_prompt, generation_config=schema.generation_config(temperature=0))
+        data, errors = parse_output(text, schema)
+
+    if errors:
+        raise StructuredOutputError(text, errors)
+    # Only a validated document becomes the fallback for this prompt
+    remember_response(prompt, text, generation_config=config)
+    return data
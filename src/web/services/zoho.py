@@ -0,0 +1,82 @@
+import time
+
+import requests
+from django.conf import settings
+
+
+class ZohoError(Exception):
+    pass
+
+
+class ZohoClient:
+    """
+    Minimal Zoho CRM v2 client: refresh-token auth and paged record reads.
+    Every URL comes from settings, so tests can run it against a local server.
+    """
+
+    def __init__(self, api_base_url=None, accounts_url=None, timeout=None):
+        self.api_base_url = (api_base_url or settings.ZOHO_API_BASE_URL).rstrip("/")
+        self.accounts_url = (accounts_url or settings.ZOHO_ACCOUNTS_URL).rstrip("/")
+        self.timeout = timeout or settings.ZOHO_REQUEST_TIMEOUT
+        self.session = requests.Session()
+        self._access_token = None
+        self._expires_at = 0.0
+
+    def get_access_token(self):
+        if self._access_token and time.monotonic() < self._expires_at:
+            return self._access_token
+
+        response = self.session.post(
+            f"{self.accounts_url}/oauth/v2/token",
+            params={
+                "refresh_token": settings.ZOHO_REFRESH_TOKEN,
+                "client_id": settings.ZOHO_CLIENT_ID,
+                "client_secret": settings.ZOHO_CLIENT_SECRET,
+                "grant_type": "refresh_token",
+            },
+            timeout=self.timeout,
+        )
+        try:
+            data = response.json()
+        except ValueError:
+            raise ZohoError(f"Token refresh failed: HTTP {response.status_code} {response.text[:200]}")
+        if "access_token" not in data:
+            raise ZohoError(f"Token refresh failed: {data}")
+
+        self._access_token = data["access_token"]
+        # Refresh a minute early rather than racing the expiry
+        self._expires_at = time.monotonic() + int(data.get("expires_in", 3600)) - 60
+        return self._access_token
+
+    def iter_record_pages(self, module="Leads", modified_since=None, per_page=None):
+        """Yield lists of records, oldest modification first."""
+        headers = {"Authorization": f"Zoho-oauthtoken {self.get_access_token()}"}
+        if modified_since:
+            headers["If-Modified-Since"] = modified_since.isoformat(timespec="seconds")
+
+        page = 1
+        while True:
+            response = self.session.get(
+                f"{self.api_base_url}/crm/v2/{module}",
+                params={
+                    "page": page,
+                    "per_page": per_page or settings.ZOHO_SYNC_PAGE_SIZE,
+                    "sort_by": "Modified_Time",
+                    "sort_order": "asc",
+                },
+                headers=headers,
+                timeout=self.timeout,
+            )
+            # 304 / 204: nothing modified since the cursor
+            if response.status_code in (204, 304):
+                return
+            if response.status_code != 200:
+                raise ZohoError(f"{module} page {page}: HTTP {response.status_code} {response.text[:500]}")
+
+            body = response.json()
+            records = body.get("data") or []
+            if records:
+                yield records
+            if not body.get("info", {}).get("more_records"):
+                return
+            page += 1
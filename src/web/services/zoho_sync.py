@@ -0,0 +1,134 @@
+import hmac
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from web.models.lead import Lead
+from web.models.zoho import ZohoSyncCursor
+from web.services.lead_metrics import record_new_leads
+from web.services.zoho import ZohoClient
+from web.utils.phone import normalize_phone
+
+# Lead columns owned by Zoho; status stays local to this app's pipeline
+SYNCED_FIELDS = ["name", "email", "phone", "phone_e164", "company", "zoho_modified_at"]
+
+
+def verify_zoho_webhook(token_header: str) -> bool:
+    """Check the shared X-Zoho-Webhook-Token; fails closed when no secret is configured."""
+    secret = settings.ZOHO_WEBHOOK_SECRET
+    if not secret or not token_header:
+        return False
+    return hmac.compare_digest(token_header.encode(), secret.encode())
+
+
+def zoho_leads_user_id():
+    """Owner of the leads synced from the configured Zoho integration."""
+    if settings.ZOHO_LEADS_USER_ID:
+        return int(settings.ZOHO_LEADS_USER_ID)
+    return Lead._meta.get_field("user").get_default()
+
+
+def map_zoho_lead(record: dict):
+    phone = record.get("Phone") or record.get("Mobile")
+    return {
+        "name": record.get("Full_Name") or record.get("Last_Name"),
+        "email": record.get("Email"),
+        "phone": phone,
+        "phone_e164": normalize_phone(phone),
+        "company": record.get("Company"),
+        "zoho_modified_at": parse_datetime(record.get("Modified_Time") or "") or None,
+    }
+
+
+def upsert_zoho_leads(records, user_id):
+    """
+    Create or update leads from Zoho records in one batch: one SELECT on
+    (user, zoho_lead_id), one bulk INSERT and one bulk UPDATE. Records not
+    newer than what is stored are skipped, so redeliveries write nothing.
+    Returns {"created": n, "updated": n, "unchanged": n}.
+    """
+    # Last delivery of each id wins within a batch
+    latest = {}
+    for record in records:
+        if record.get("id"):
+            latest[str(record["id"])] = map_zoho_lead(record)
+
+    result = {"created": 0, "updated": 0, "unchanged": len(records) - len(latest)}
+    if not latest:
+        return result
+
+    try:
+        return apply_zoho_leads(latest, user_id, result)
+    except IntegrityError:
+        # A concurrent delivery or pull inserted one of the new ids first
+        # (unique on user, zoho_lead_id); run again, they are updates now
+        return apply_zoho_leads(latest, user_id, result)
+
+
+def apply_zoho_leads(latest, user_id, result):
+    result = dict(result)
+    existing = {
+        lead.zoho_lead_id: lead
+        for lead in Lead.objects.filter(user_id=user_id, zoho_lead_id__in=latest.keys())
+        .only("id", "zoho_lead_id", *SYNCED_FIELDS)
+    }
+
+    to_create, to_update = [], []
+    for zoho_id, fields in latest.items():
+        lead = existing.get(zoho_id)
+        if lead is None:
+            to_create.append(Lead(user_id=user_id, source="zoho", zoho_lead_id=zoho_id, **fields))
+            continue
+
+        stored, incoming = lead.zoho_modified_at, fields["zoho_modified_at"]
+        if stored and incoming and incoming <= stored:
+            result["unchanged"] += 1
+            continue
+        if all(getattr(lead, name) == value for name, value in fields.items()):
+            result["unchanged"] += 1
+            continue
+
+        for name, value in fields.items():
+            setattr(lead, name, value)
+        lead.updated_at = timezone.now()
+        to_update.append(lead)
+
+    if to_create or to_update:
+        # Savepoint, so a lost insert race can be retried inside a caller's transaction
+        with transaction.atomic():
+            Lead.objects.bulk_create(to_create)
+            Lead.objects.bulk_update(to_update, [*SYNCED_FIELDS, "updated_at"])
+            record_new_leads(to_create)
+
+    result["created"] = len(to_create)
+    result["updated"] = len(to_update)
+    return result
+
+
+def pull_zoho_leads(user_id, client=None, full=False):
+    """
+    Incremental pull of Zoho leads modified since the stored cursor. The
+    cursor advances after every page, so an interrupted run resumes there.
+    """
+    client = client or ZohoClient()
+    cursor, _ = ZohoSyncCursor.objects.get_or_create(user_id=user_id, module="Leads")
+    totals = {"created": 0, "updated": 0, "unchanged": 0}
+
+    modified_since = None if full else cursor.modified_since
+    for records in client.iter_record_pages("Leads", modified_since=modified_since):
+        page_result = upsert_zoho_leads(records, user_id)
+        for key, value in page_result.items():
+            totals[key] += value
+
+        page_latest = max(
+            filter(None, (parse_datetime(r.get("Modified_Time") or "") for r in records)),
+            default=None,
+        )
+        if page_latest and (cursor.modified_since is None or page_latest > cursor.modified_since):
+            cursor.modified_since = page_latest
+        cursor.last_synced_at = timezone.now()
+        cursor.save(update_fields=["modified_since", "last_synced_at"])
+
+    return totals
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+
+from .models.lead import Lead, LeadFollowUp, LeadCallLog
+from .services import activity, lead_metrics
+
+
+def connect_signals():
+    """Keep derived lead data in step with writes."""
+    post_save.connect(activity.on_followup_saved, sender=LeadFollowUp, dispatch_uid="lead_activity_followup")
+    post_save.connect(activity.on_call_log_saved, sender=LeadCallLog, dispatch_uid="lead_activity_call_log")
+    post_delete.connect(activity.on_followup_deleted, sender=LeadFollowUp, dispatch_uid="lead_activity_followup_delete")
+    post_delete.connect(activity.on_call_log_deleted, sender=LeadCallLog, dispatch_uid="lead_activity_call_log_delete")
+
+    post_save.connect(lead_metrics.on_lead_saved, sender=Lead, dispatch_uid="lead_metrics_lead_save")
+    post_delete.connect(lead_metrics.on_lead_deleted, sender=Lead, dispatch_uid="lead_metrics_lead_delete")
+    post_save.connect(lead_metrics.on_call_log_saved, sender=LeadCallLog, dispatch_uid="lead_metrics_call_log_save")
+    post_delete.connect(lead_metrics.on_call_log_deleted, sender=LeadCallLog, dispatch_uid="lead_metrics_call_log_delete")
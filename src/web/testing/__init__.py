@@ -0,0 +1 @@
+"""Offline doubles of the external services, for tests and benchmarks."""
@@ -0,0 +1,137 @@
+"""
+Local HTTP stand-in for Gemini, ElevenLabs and the analyzed websites,
+serving a replay cassette with configurable latency and failure injection.
+Unlike replaying(), calls go through the real SDK and `requests` stack,
+so serialization and connection handling are part of what is measured.
+"""
+import json
+import re
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import urlsplit
+
+import requests
+from django.test import override_settings
+
+from web.services import gemini_client
+from web.testing.replay import Cassette, Faults, ReplayMiss, _real_request, gemini_key, http_key
+
+GENERATE_CONTENT_PATH = re.compile(r"^/v1beta/models/(?P<model>[^:/]+):generateContent")
+
+# Original URL of a request routed to the stub
+REPLAY_URL_HEADER = "X-Replay-Url"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, status, body, content_type="application/json"):
+        raw = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def handle_request(self):
+        body = self.read_body()
+        original_url = self.headers.get(REPLAY_URL_HEADER, "")
+        match = GENERATE_CONTENT_PATH.match(urlsplit(original_url).path or self.path)
+        stub = self.server.stub
+
+        try:
+            if match:
+                request = json.loads(body or b"{}")
+                prompt = request["contents"][0]["parts"][0]["text"]
+                entry = stub.cassette.get(gemini_key(match.group("model"), prompt))
+            else:
+                entry = stub.cassette.get(http_key(self.command, original_url))
+        except (ReplayMiss, KeyError, IndexError, ValueError):
+            stub.count("missed")
+            return self.send_body(404, {"error": {"code": 404, "message": "No recording"}})
+
+        if stub.faults.apply():
+            stub.count("failed")
+            return self.send_body(503, {"error": {"code": 503, "message": "Injected failure"}})
+
+        stub.count("served")
+        if match:
+            return self.send_body(200, gemini_rest_response(entry))
+        return self.send_body(entry["status"], entry["body"], entry["content_type"])
+
+    do_GET = do_POST = handle_request
+
+
+def gemini_rest_response(entry):
+    parts = [
+        {"inlineData": {"mimeType": p["inline_data"]["mime_type"], "data": p["inline_data"]["data"]}}
+        if "inline_data" in p else {"text": p["text"]}
+        for p in entry["parts"]
+    ]
+    return {
+        "candidates": [
+            {"content": {"role": "model", "parts": parts}, "finishReason": "STOP", "index": 0}
+        ]
+    }
+
+
+class StubServer:
+    """Threaded stub server on a free local port; use as a context manager."""
+
+    def __init__(self, cassette, faults=None, host="127.0.0.1", port=0):
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette.load(cassette)
+        self.faults = faults or Faults()
+        self.stats = {"served": 0, "failed": 0, "missed": 0}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), StubHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@contextmanager
+def routed_to(stub):
+    """
+    Send every `requests` call, including the Gemini SDK on its REST
+    transport, to `stub` with the original URL in a header.
+    """
+    def route_request(session, method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers[REPLAY_URL_HEADER] = url
+        stub_url = f"{stub.url}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else "")
+        return _real_request(session, method, stub_url, *args, headers=headers, **kwargs)
+
+    with override_settings(GEMINI_TRANSPORT="rest"), mock.patch.object(
+        requests.Session, "request", route_request
+    ):
+        gemini_client.reset_clients()
+        try:
+            yield stub
+        finally:
+            gemini_client.reset_clients()
@@ -0,0 +1,213 @@
+"""
+Record and replay of the external calls made by the AI pipelines: Gemini
+(text and image), ElevenLabs and website fetches. `recording()` runs the
+real calls and stores them in a JSON cassette; `replaying()` serves them
+from the cassette without network access, optionally with injected latency
+and failures, so the pipelines can be tested and benchmarked offline.
+"""
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import requests
+from google.api_core.exceptions import ServiceUnavailable
+
+from web.services import gemini_client
+
+_real_request = requests.Session.request
+
+
+class ReplayMiss(Exception):
+    """The cassette has no recording for this call."""
+
+
+def interaction_key(kind, *parts):
+    raw = "\0".join([kind, *(str(part) for part in parts)])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def gemini_key(model_name, prompt):
+    return interaction_key("gemini", model_name, prompt)
+
+
+def http_key(method, url):
+    # Bodies are not part of the key: every recorded endpoint is keyed by its URL
+    return interaction_key("http", method.upper(), url)
+
+
+class Cassette:
+    """Recorded interactions by key, stored as one JSON file."""
+
+    def __init__(self, path=None, meta=None):
+        self.path = Path(path) if path else None
+        self.meta = meta or {}
+        self.interactions = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        data = json.loads(Path(path).read_text())
+        cassette = cls(path, data.get("meta"))
+        cassette.interactions = data.get("interactions", {})
+        return cassette
+
+    def save(self):
+        self.path.write_text(json.dumps(
+            {"meta": self.meta, "interactions": self.interactions}, indent=1, sort_keys=True
+        ))
+
+    def get(self, key):
+        entry = self.interactions.get(key)
+        if entry is None:
+            raise ReplayMiss(key)
+        return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self.interactions[key] = entry
+
+
+class Faults:
+    """
+    Latency of `latency` ± `jitter` seconds and a `failure_rate` share of
+    failed calls, applied to replayed interactions.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def apply(self):
+        """Sleep for the simulated latency; returns True when the call should fail."""
+        with self._lock:
+            delay = max(self.latency + self._random.uniform(-self.jitter, self.jitter), 0)
+            failed = self._random.random() < self.failure_rate
+        if delay:
+            time.sleep(delay)
+        return failed
+
+
+def dump_gemini_response(response):
+    parts = []
+    for part in response.candidates[0].content.parts:
+        if getattr(part, "inline_data", None) and part.inline_data.data:
+            parts.append({"inline_data": {
+                "mime_type": part.inline_data.mime_type,
+                "data": base64.b64encode(part.inline_data.data).decode(),
+            }})
+        else:
+            parts.append({"text": part.text})
+    return {"parts": parts}
+
+
+def load_gemini_response(entry):
+    """An object with the attributes of a GenerateContentResponse the app reads."""
+    parts = []
+    for part in entry["parts"]:
+        if "inline_data" in part:
+            data = base64.b64decode(part["inline_data"]["data"])
+            parts.append(SimpleNamespace(
+                text="",
+                inline_data=SimpleNamespace(mime_type=part["inline_data"]["mime_type"], data=data),
+            ))
+        else:
+            parts.append(SimpleNamespace(text=part["text"], inline_data=None))
+
+    return SimpleNamespace(
+        text="".join(part.text for part in parts),
+        candidates=[SimpleNamespace(content=SimpleNamespace(parts=parts))],
+    )
+
+
+def dump_http_response(response):
+    return {
+        "status": response.status_code,
+        "content_type": response.headers.get("Content-Type", ""),
+        "body": response.text,
+    }
+
+
+def load_http_response(entry, url):
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.headers["Content-Type"] = entry["content_type"]
+    response._content = entry["body"].encode()
+    response.encoding = "utf-8"
+    response.url = url
+    return response
+
+
+class RecordingModel:
+    def __init__(self, name, model, cassette):
+        self.name = name
+        self.model = model
+        self.cassette = cassette
+
+    def generate_content(self, prompt, **kwargs):
+        response = self.model.generate_content(prompt, **kwargs)
+        self.cassette.put(gemini_key(self.name, prompt), dump_gemini_response(response))
+        return response
+
+
+class ReplayModel:
+    def __init__(self, name, cassette, faults):
+        self.name = name
+        self.cassette = cassette
+        self.faults = faults
+
+    def generate_content(self, prompt, **kwargs):
+        entry = self.cassette.get(gemini_key(self.name, prompt))
+        if self.faults.apply():
+            raise ServiceUnavailable("injected failure")
+        return load_gemini_response(entry)
+
+
+@contextmanager
+def recording(path, meta=None):
+    """Make real Gemini and HTTP calls and write them to the cassette at `path`."""
+    cassette = Cassette(path, meta)
+    real_get_model = gemini_client.get_model
+
+    def record_request(session, method, url, *args, **kwargs):
+        response = _real_request(session, method, url, *args, **kwargs)
+        cassette.put(http_key(method, url), dump_http_response(response))
+        return response
+
+    with mock.patch.object(requests.Session, "request", record_request), mock.patch.object(
+        gemini_client, "get_model",
+        lambda name=gemini_client.TEXT_MODEL: RecordingModel(name, real_get_model(name), cassette),
+    ):
+        yield cassette
+
+    cassette.save()
+
+
+@contextmanager
+def replaying(path, faults=None):
+    """Serve Gemini and HTTP calls from the cassette at `path`; no network access."""
+    cassette = Cassette.load(path)
+    faults = faults or Faults()
+
+    def replay_request(session, method, url, *args, **kwargs):
+        entry = cassette.get(http_key(method, url))
+        if faults.apply():
+            return load_http_response(
+                {"status": 503, "content_type": "text/plain", "body": "injected failure"}, url
+            )
+        return load_http_response(entry, url)
+
+    with mock.patch.object(requests.Session, "request", replay_request), mock.patch.object(
+        gemini_client, "get_model",
+        lambda name=gemini_client.TEXT_MODEL: ReplayModel(name, cassette, faults),
+    ):
+        yield cassette
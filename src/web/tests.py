@@ -1 +1,1399 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from django.core import mail
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from google.api_core.exceptions import InvalidArgument, ServiceUnavailable
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from core import telemetry
+from web.models import Brand, Lead, PayloadBlob
+from web.models.activity import LeadActivity
+from web.models.campaign import CallCampaign, CampaignCall
+from web.models.lead import LeadFollowUp, LeadCallLog
+from web.models.webhook_event import CallWebhookEvent
+from web.services import call_events, gemini_client, zoho_sync
+from web.services.brand_analysis import batch_concurrency
+from web.services.brand_context import get_brand_context
+from web.services.brand_strategy import SAVE_VERSION_ATTEMPTS, save_new_version
+from web.services.call_campaigns import (
+    claim_due_calls,
+    complete_finished_campaigns,
+    dial_calls,
+    queue_campaign_calls,
+    requeue_stale_calls,
+    retry_delay,
+)
+from web.services.call_events import (
+    claim_pending_events,
+    match_lead_by_phone,
+    process_call_event,
+    requeue_stale_events,
+    verify_elevenlabs_signature,
+)
+from web.services.daily_posts import DailyPostsError, precompute_daily_posts
+from web.services.gemini_client import GeminiUnavailable, generate_text, remember_response
+from web.services.gemini_schemas import DAILY_POSTS
+from web.services.lead_metrics import reconcile_daily_stats
+from web.services.rate_limit import CircuitBreaker, CircuitOpen, TokenBucket
+from web.services.reminders import claim_due_reminders, dispatch_reminder
+from web.services.prompt_builder import compact_website_sections, estimate_tokens
+from web.services.query_stats import QueryBudgetExceeded, query_budget
+from web.services.structured_output import StructuredOutputError, generate_json, repair_json
+from web.services.zoho import ZohoClient, ZohoError
+from web.services.zoho_sync import pull_zoho_leads, upsert_zoho_leads
+from web.testing.ai_stub import StubServer, routed_to
+from web.testing.replay import Faults, ReplayMiss, recording, replaying
+from web.utils.phone import normalize_phone
+from web.utils.website_extractor import extract_website_sections
+
+
+def sign_elevenlabs(body, secret, timestamp=None):
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v0={digest}"
+
+
+@override_settings(ELEVENLABS_WEBHOOK_SECRET="whsec")
+class CallEventTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="owner@example.com")
+        self.lead = Lead.objects.create(user=self.user, name="Lead", phone="5551234567")
+
+    def post_webhook(self, payload, signature=True):
+        body = json.dumps(payload).encode()
+        headers = {"HTTP_ELEVENLABS_SIGNATURE": sign_elevenlabs(body, "whsec")} if signature else {}
+        return APIClient().post(
+            "/api/v1/elwebhook/", data=body, content_type="application/json", **headers
+        )
+
+    def test_signature_verification(self):
+        body = b'{"call_id": "c1"}'
+
+        self.assertTrue(verify_elevenlabs_signature(body, sign_elevenlabs(body, "whsec")))
+        self.assertFalse(verify_elevenlabs_signature(body + b" ", sign_elevenlabs(body, "whsec")))
+        self.assertFalse(verify_elevenlabs_signature(body, sign_elevenlabs(body, "other")))
+        self.assertFalse(verify_elevenlabs_signature(
+            body, sign_elevenlabs(body, "whsec", timestamp=int(time.time()) - 3600)
+        ))
+        self.assertFalse(verify_elevenlabs_signature(body, None))
+        self.assertFalse(verify_elevenlabs_signature(body, "garbage"))
+
+        response = self.post_webhook({"call_id": "c1"}, signature=False)
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(CallWebhookEvent.objects.exists())
+
+    def test_unconfigured_secret_rejects_everything(self):
+        body = b'{"call_id": "c1"}'
+        with override_settings(ELEVENLABS_WEBHOOK_SECRET=""):
+            self.assertFalse(verify_elevenlabs_signature(body, sign_elevenlabs(body, "")))
+            self.assertEqual(self.post_webhook({"call_id": "c1"}).status_code, 401)
+        self.assertFalse(CallWebhookEvent.objects.exists())
+
+    def test_redelivered_events_are_stored_once(self):
+        payload = {"call_id": "c1", "status": "completed", "metadata": {"lead_id": self.lead.id}}
+
+        self.assertEqual(self.post_webhook(payload).data, {"status": "queued"})
+        self.assertEqual(self.post_webhook(payload).data, {"status": "duplicate"})
+        self.assertEqual(self.post_webhook({**payload, "status": "failed"}).data, {"status": "queued"})
+        self.assertEqual(CallWebhookEvent.objects.count(), 2)
+
+    def test_worker_applies_claimed_events_once(self):
+        self.post_webhook({
+            "call_id": "c1", "status": "completed", "duration": 42,
+            "metadata": {"lead_id": self.lead.id},
+        })
+        # Inbound call from a known number attaches to the existing lead
+        self.post_webhook({
+            "conversation_id": "c2", "status": "completed",
+            "caller": {"phone_number": "+1 (555) 123-4567"},
+            "metadata": {"user_id": self.user.id},
+        })
+
+        claimed = list(claim_pending_events())
+        self.assertEqual(len(claimed), 2)
+        self.assertEqual(list(claim_pending_events()), [])
+        for event in claimed:
+            self.assertTrue(process_call_event(event))
+
+        self.assertEqual(Lead.objects.count(), 1)
+        self.assertEqual(
+            sorted(self.lead.call_logs.values_list("call_id", "duration")),
+            [("c1", 42), ("c2", None)],
+        )
+        self.assertEqual(self.lead.followups.filter(followup_type="ai_call").count(), 2)
+        self.assertEqual(
+            set(CallWebhookEvent.objects.values_list("status", flat=True)), {"processed"}
+        )
+
+    def test_failures_are_recorded_and_stale_claims_requeued(self):
+        self.post_webhook({"call_id": "c1", "metadata": {"lead_id": self.lead.id}})
+        self.post_webhook({"call_id": "c2", "metadata": {"lead_id": self.lead.id}})
+        failing, stale = claim_pending_events()
+
+        with mock.patch.object(call_events, "apply_call_event", side_effect=ValueError("bad payload")):
+            self.assertFalse(process_call_event(failing))
+        failing.refresh_from_db()
+        self.assertEqual((failing.status, failing.error, failing.attempts), ("failed", "bad payload", 1))
+
+        # The worker holding `stale` died
+        self.assertEqual(requeue_stale_events(), 0)
+        CallWebhookEvent.objects.filter(id=stale.id).update(
+            claimed_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(requeue_stale_events(), 1)
+        self.assertEqual([e.id for e in claim_pending_events()], [stale.id])
+
+
+class CallLogBackfillMigrationTests(TransactionTestCase):
+    migrate_from = [("web", "0009_unify_call_logs")]
+    migrate_to = [("web", "0010_backfill_call_logs")]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        self.latest = executor.loader.graph.leaf_nodes()
+        executor.migrate(self.migrate_from)
+        apps = executor.loader.project_state(self.migrate_from).apps
+
+        Lead = apps.get_model("web", "Lead")
+        CallLog = apps.get_model("web", "CallLog")
+        LeadCallLog = apps.get_model("web", "LeadCallLog")
+
+        # accounts stays migrated, so its rows come from the current model
+        user = User.objects.create(email="owner@example.com")
+        self.lead = Lead.objects.create(user_id=user.id, name="Lead", phone="5551234567")
+        self.created = timezone.now() - timedelta(days=3)
+        for call_id, status in [("c1", "completed"), ("c2", "failed")]:
+            row = CallLog.objects.create(
+                lead=self.lead, call_id=call_id, agent_id="agent", call_status=status,
+                call_duration=30, intent="pricing", raw_payload={"call_id": call_id},
+            )
+            CallLog.objects.filter(id=row.id).update(created_at=self.created)
+        # Already known from the webhook path: only its gaps are filled
+        LeadCallLog.objects.create(lead=self.lead, call_id="c2", status="failed", duration=12)
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        self.apps = executor.loader.project_state(self.migrate_to).apps
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(self.latest)
+
+    def test_call_logs_are_backfilled(self):
+        LeadCallLog = self.apps.get_model("web", "LeadCallLog")
+        CallWebhookEvent = self.apps.get_model("web", "CallWebhookEvent")
+
+        logs = {log.call_id: log for log in LeadCallLog.objects.filter(lead_id=self.lead.id)}
+        self.assertEqual(set(logs), {"c1", "c2"})
+
+        self.assertEqual(
+            (logs["c1"].status, logs["c1"].duration, logs["c1"].agent_id, logs["c1"].intent),
+            ("completed", 30, "agent", "pricing"),
+        )
+        self.assertEqual(logs["c1"].created_at, self.created)
+        self.assertEqual((logs["c2"].duration, logs["c2"].intent), (12, "pricing"))
+
+        events = CallWebhookEvent.objects.in_bulk(field_name="idempotency_key")
+        self.assertEqual(set(events), {"c1:completed", "c2:failed"})
+        self.assertEqual(events["c1:completed"].payload, {"call_id": "c1"})
+        self.assertEqual(events["c1:completed"].status, "processed")
+        self.assertEqual(logs["c1"].event_id, events["c1:completed"].id)
+
+
+class ZohoLeadDedupeMigrationTests(TransactionTestCase):
+    migrate_from = [("web", "0029_campaigncall_claimed_at")]
+    migrate_to = [("web", "0030_lead_zoho_id_unique")]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        self.latest = executor.loader.graph.leaf_nodes()
+        executor.migrate(self.migrate_from)
+        apps = executor.loader.project_state(self.migrate_from).apps
+
+        Lead = apps.get_model("web", "Lead")
+        LeadFollowUp = apps.get_model("web", "LeadFollowUp")
+        CallCampaign = apps.get_model("web", "CallCampaign")
+        CampaignCall = apps.get_model("web", "CampaignCall")
+
+        user = User.objects.create(email="owner@example.com")
+        self.kept, duplicate = [
+            Lead.objects.create(user_id=user.id, name="Lead", zoho_lead_id="z1") for _ in range(2)
+        ]
+        Lead.objects.create(user_id=user.id, name="Manual")
+        Lead.objects.create(user_id=user.id, name="Manual 2")
+        LeadFollowUp.objects.create(lead_id=duplicate.id, followup_type="note")
+        campaign = CallCampaign.objects.create(user_id=user.id, name="Spring")
+        CampaignCall.objects.create(campaign_id=campaign.id, lead_id=self.kept.id)
+        CampaignCall.objects.create(campaign_id=campaign.id, lead_id=duplicate.id)
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        self.apps = executor.loader.project_state(self.migrate_to).apps
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(self.latest)
+
+    def test_duplicates_are_folded_into_the_oldest_lead(self):
+        Lead = self.apps.get_model("web", "Lead")
+        LeadFollowUp = self.apps.get_model("web", "LeadFollowUp")
+        CampaignCall = self.apps.get_model("web", "CampaignCall")
+
+        self.assertEqual(list(Lead.objects.filter(zoho_lead_id="z1").values_list("id", flat=True)), [self.kept.id])
+        self.assertEqual(Lead.objects.filter(zoho_lead_id__isnull=True).count(), 2)
+        self.assertEqual(LeadFollowUp.objects.get().lead_id, self.kept.id)
+        self.assertEqual(CampaignCall.objects.get().lead_id, self.kept.id)
+
+        with self.assertRaises(IntegrityError):
+            Lead.objects.create(user_id=self.kept.user_id, name="Again", zoho_lead_id="z1")
+
+
+class PayloadBlobTests(TestCase):
+    def test_documents_are_compressed_and_stored_once(self):
+        document = {"transcript": [{"role": "agent", "message": "Hello there"}] * 50, "id": 7}
+
+        blob = PayloadBlob.store(document)
+        self.assertEqual(blob.load(), document)
+        self.assertEqual(blob.size, len(json.dumps(document, separators=(",", ":"), sort_keys=True)))
+        self.assertLess(len(bytes(blob.data)), blob.size)
+
+        # Same document with another key order: same digest, same row
+        same = PayloadBlob.store({"id": 7, "transcript": document["transcript"]})
+        self.assertEqual(same.pk, blob.pk)
+        self.assertEqual(PayloadBlob.objects.count(), 1)
+
+        other = PayloadBlob.store({**document, "id": 8})
+        self.assertNotEqual(other.sha256, blob.sha256)
+        self.assertEqual(PayloadBlob.objects.count(), 2)
+
+    def test_digest_covers_the_uncompressed_json(self):
+        raw = b'{"a":1,"b":[1,2]}'
+        digest, data, size = PayloadBlob.encode({"b": [1, 2], "a": 1})
+
+        self.assertEqual(digest, hashlib.sha256(raw).hexdigest())
+        self.assertEqual(size, len(raw))
+        self.assertEqual(PayloadBlob(encoding="raw", data=raw, size=size).load(), {"a": 1, "b": [1, 2]})
+
+
+@override_settings(CALL_CAMPAIGN_MAX_ATTEMPTS=2, CALL_CAMPAIGN_RETRY_BACKOFF=60)
+class CallCampaignTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="owner@example.com")
+        self.leads = [
+            Lead.objects.create(user=self.user, name=f"Lead {i}", phone=f"555123456{i}")
+            for i in range(3)
+        ]
+        self.campaign = CallCampaign.objects.create(user=self.user, name="Spring")
+        queue_campaign_calls(self.campaign)
+
+    def test_token_bucket_spaces_requests(self):
+        with mock.patch("web.services.rate_limit.time.monotonic", return_value=100.0) as clock:
+            bucket = TokenBucket(rate=2, capacity=2)
+            self.assertEqual([bucket.try_acquire() for _ in range(3)], [True, True, False])
+
+            clock.return_value = 100.5
+            self.assertEqual([bucket.try_acquire() for _ in range(2)], [True, False])
+
+    def test_failed_calls_back_off_then_fail_and_progress_is_counted(self):
+        answered = self.leads[0].id
+
+        dialed_numbers = []
+
+        def start_ai_call(phone, lead_id):
+            dialed_numbers.append(phone)
+            if lead_id == answered:
+                return {"call_id": f"provider-{lead_id}"}
+            if lead_id == self.leads[1].id:
+                raise requests.ConnectionError("provider down")
+            return {"detail": "busy"}
+
+        bucket = TokenBucket(1000)
+        with mock.patch("web.services.call_campaigns.start_ai_call", side_effect=start_ai_call):
+            self.assertEqual(dial_calls(list(claim_due_calls()), bucket), (1, 2))
+            self.assertEqual(dialed_numbers, [lead.phone_e164 for lead in self.leads])
+            self.assertEqual(dialed_numbers[0], "+15551234560")
+
+            self.campaign.refresh_from_db()
+            self.assertEqual(
+                (self.campaign.total_calls, self.campaign.dialed_calls, self.campaign.failed_calls),
+                (3, 1, 0),
+            )
+            retried = CampaignCall.objects.exclude(lead_id=answered)
+            for call in retried:
+                self.assertEqual((call.status, call.attempts), ("pending", 1))
+                self.assertAlmostEqual(
+                    call.next_attempt_at, timezone.now() + timedelta(seconds=60),
+                    delta=timedelta(seconds=5),
+                )
+            self.assertEqual(list(claim_due_calls()), [])
+
+            retried.update(next_attempt_at=timezone.now())
+            self.assertEqual(dial_calls(list(claim_due_calls()), bucket), (0, 2))
+
+        self.assertEqual(retry_delay(2), timedelta(seconds=120))
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.dialed_calls, self.campaign.failed_calls), (1, 2))
+        self.assertEqual(set(retried.values_list("status", flat=True)), {"failed"})
+        self.assertEqual(
+            list(LeadCallLog.objects.values_list("call_id", "status")),
+            [(f"provider-{answered}", "initiated")],
+        )
+
+        self.assertEqual(complete_finished_campaigns(), 1)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, "completed")
+
+    def test_each_dial_is_recorded_before_the_next(self):
+        first = self.leads[0].id
+
+        def start_ai_call(phone, lead_id):
+            if lead_id != first:
+                raise SystemExit("dispatcher killed")
+            return {"call_id": "provider-1"}
+
+        with mock.patch("web.services.call_campaigns.start_ai_call", side_effect=start_ai_call):
+            with self.assertRaises(SystemExit):
+                dial_calls(list(claim_due_calls()), TokenBucket(1000))
+
+        # Only the call in flight is left claimed for the stale-claim requeue
+        self.assertEqual(
+            dict(CampaignCall.objects.values_list("lead_id", "status")),
+            {first: "dialed", self.leads[1].id: "dialing", self.leads[2].id: "dialing"},
+        )
+        self.assertEqual(LeadCallLog.objects.get().call_id, "provider-1")
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.dialed_calls, 1)
+
+    def test_leads_without_a_dialable_number_are_not_queued(self):
+        Lead.objects.create(user=self.user, name="No number", phone="unknown")
+        self.assertEqual(queue_campaign_calls(self.campaign), 3)
+
+    @override_settings(CALL_CAMPAIGN_CLAIM_TIMEOUT=60)
+    def test_stale_claims_are_requeued(self):
+        claimed = list(claim_due_calls())
+        self.assertEqual(len(claimed), 3)
+        self.assertEqual(requeue_stale_calls(), 0)
+
+        # The dispatcher died before recording the batch
+        CampaignCall.objects.update(claimed_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(complete_finished_campaigns(), 0)
+        self.assertEqual(requeue_stale_calls(), 3)
+        self.assertEqual(len(claim_due_calls()), 3)
+
+
+@override_settings(DEFAULT_PHONE_COUNTRY_CODE="1")
+class PhoneNormalizationTests(TestCase):
+    def test_normalize_phone(self):
+        cases = {
+            "5551234567": "+15551234567",
+            "(555) 123-4567": "+15551234567",
+            "15551234567": "+15551234567",
+            "+1 555 123 4567": "+15551234567",
+            "+44 20 7946 0958": "+442079460958",
+            "0044 20 7946 0958": "+442079460958",
+            "05551234567": "+15551234567",
+            "": None,
+            None: None,
+            "unknown": None,
+            "123": None,
+            "+1234567890123456": None,
+        }
+        for raw, expected in cases.items():
+            with self.subTest(raw=raw):
+                self.assertEqual(normalize_phone(raw), expected)
+
+        self.assertEqual(normalize_phone("98765 43210", country_code="91"), "+919876543210")
+
+    def test_inbound_calls_match_on_the_normalized_number(self):
+        owner = User.objects.create(email="owner@example.com")
+        other = User.objects.create(email="other@example.com")
+        lead = Lead.objects.create(user=owner, name="Lead", phone="(555) 123-4567")
+        Lead.objects.create(user=other, name="Other", phone="5551234567")
+
+        self.assertEqual(lead.phone_e164, "+15551234567")
+        self.assertEqual(match_lead_by_phone("+1 555-123-4567", owner.id), lead)
+        self.assertIsNone(match_lead_by_phone("+1 555-123-0000", owner.id))
+        self.assertIsNone(match_lead_by_phone("not a number", owner.id))
+
+        # phone_e164 follows phone, also on partial saves
+        lead.phone = "+44 20 7946 0958"
+        lead.save(update_fields=["phone"])
+        lead.refresh_from_db()
+        self.assertEqual(lead.phone_e164, "+442079460958")
+        self.assertEqual(match_lead_by_phone("0044 20 7946 0958", owner.id), lead)
+
+
+class LeadDetailViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="owner@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def make_lead(self, history):
+        lead = Lead.objects.create(user=self.user, name="Lead", phone="5551234567")
+        for i in range(history):
+            event = CallWebhookEvent.objects.create(
+                idempotency_key=f"{lead.id}:{i}",
+                payload_blob=PayloadBlob.store({"transcript": [{"message": str(i)}]}),
+            )
+            LeadFollowUp.objects.create(
+                lead=lead,
+                followup_type="ai_call",
+                conversation=event.payload_blob,
+                call_event=event,
+            )
+            LeadCallLog.objects.create(lead=lead, call_id=f"{lead.id}-{i}", event=event)
+        return lead
+
+    def get_detail(self, lead, query=""):
+        return self.client.get(f"/api/v1/leaddetails/{lead.id}/{query}")
+
+    def test_query_count_does_not_grow_with_history(self):
+        small = self.make_lead(2)
+        large = self.make_lead(40)
+
+        for query in ("", "?include=conversation,transcript"):
+            with self.assertNumQueries(3):
+                self.get_detail(small, query)
+            with self.assertNumQueries(3):
+                response = self.get_detail(large, query)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["followups"]), 20)
+        self.assertEqual(response.data["pagination"]["followups_count"], 40)
+        self.assertEqual(response.data["call_logs"][0]["transcript"], [{"message": "39"}])
+
+    def test_heavy_fields_only_with_include(self):
+        lead = self.make_lead(1)
+
+        response = self.get_detail(lead)
+        self.assertNotIn("conversation_json", response.data["followups"][0])
+        self.assertNotIn("transcript", response.data["call_logs"][0])
+
+        response = self.get_detail(lead, "?include=conversation")
+        self.assertEqual(
+            response.data["followups"][0]["conversation_json"],
+            {"transcript": [{"message": "0"}]},
+        )
+
+    def test_transcript_falls_back_to_the_stored_response(self):
+        lead = self.make_lead(0)
+        # Backfilled from the old CallLog table, without a webhook event
+        call_log = LeadCallLog.objects.create(
+            lead=lead,
+            call_id="legacy",
+            status="completed",
+            response=PayloadBlob.store({"transcript": [{"message": "legacy"}]}),
+        )
+
+        response = self.get_detail(lead, "?include=transcript")
+        self.assertEqual(response.data["call_logs"][0]["transcript"], [{"message": "legacy"}])
+
+        response = self.client.get(f"/api/v1/calltranscript/{call_log.id}/")
+        self.assertEqual(response.data["transcript"], [{"message": "legacy"}])
+
+    def test_pages_do_not_overlap(self):
+        lead = self.make_lead(5)
+
+        first = self.get_detail(lead, "?page_size=3")
+        second = self.get_detail(lead, "?page_size=3&followups_page=2&calls_page=2")
+
+        first_ids = {f["id"] for f in first.data["followups"]}
+        second_ids = {f["id"] for f in second.data["followups"]}
+        self.assertEqual(len(first_ids), 3)
+        self.assertEqual(len(second_ids), 2)
+        self.assertFalse(first_ids & second_ids)
+        self.assertEqual(len(second.data["call_logs"]), 2)
+
+    def test_other_users_lead_is_not_found(self):
+        other = User.objects.create(email="other@example.com")
+        lead = Lead.objects.create(user=other, name="Lead", phone="5551234567")
+
+        self.assertEqual(self.get_detail(lead).status_code, 404)
+
+
+class LeadActivityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="owner@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.lead = Lead.objects.create(user=self.user, name="Lead", phone="5551234567")
+
+    def test_timeline_follows_inserts_and_call_status(self):
+        LeadFollowUp.objects.create(lead=self.lead, followup_type="note", notes="first")
+        call_log = LeadCallLog.objects.create(lead=self.lead, call_id="c1")
+        call_log.status = "completed"
+        call_log.save()
+
+        response = self.client.get(f"/api/v1/leadactivity/{self.lead.id}/")
+
+        self.assertEqual(
+            [(a["kind"], a["label"]) for a in response.data["results"]],
+            [("call", "completed"), ("followup", "note")],
+        )
+
+    def test_recent_feed_pages_with_cursor(self):
+        other = Lead.objects.create(user=self.user, name="Other", phone="5550000000")
+        for i in range(5):
+            LeadFollowUp.objects.create(lead=self.lead if i % 2 else other, followup_type="note")
+
+        first = self.client.get("/api/v1/recentactivity/?limit=3")
+        second = self.client.get(first.data["next"])
+
+        self.assertEqual(len(first.data["results"]), 3)
+        self.assertEqual(len(second.data["results"]), 2)
+        self.assertIsNone(second.data["next"])
+
+    def test_deleting_the_source_row_removes_its_activity(self):
+        followup = LeadFollowUp.objects.create(lead=self.lead, followup_type="note")
+        call_log = LeadCallLog.objects.create(lead=self.lead, call_id="c1")
+        self.assertEqual(self.lead.activities.count(), 2)
+
+        followup.delete()
+        call_log.delete()
+
+        self.assertFalse(self.lead.activities.exists())
+
+    def test_campaign_followups_get_activities_without_bulk_insert_ids(self):
+        campaign = CallCampaign.objects.create(user=self.user, name="Spring")
+        queue_campaign_calls(campaign)
+
+        # MySQL: bulk_create does not set the pks of the new rows
+        with mock.patch.object(type(connection.features), "can_return_rows_from_bulk_insert", False), \
+                mock.patch("web.services.call_campaigns.start_ai_call", return_value={"call_id": "p1"}):
+            dial_calls(list(claim_due_calls()), TokenBucket(1000))
+
+        followup = self.lead.followups.get()
+        call_log = self.lead.call_logs.get()
+        self.assertEqual(
+            set(self.lead.activities.values_list("kind", "object_id")),
+            {("followup", followup.id), ("call", call_log.id)},
+        )
+        self.assertFalse(LeadActivity.objects.filter(object_id__isnull=True).exists())
+
+
+class LeadMetricsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="owner@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_rollup_follows_writes_and_matches_reconcile(self):
+        leads = [
+            Lead.objects.create(user=self.user, name=str(i), phone="5551234567", source="zoho")
+            for i in range(4)
+        ]
+        for lead, status in zip(leads, ["contacted", "qualified", "closed"]):
+            lead.status = status
+            lead.save()
+        call_log = LeadCallLog.objects.create(lead=leads[0], call_id="c1")
+        call_log.status = "completed"
+        call_log.save()
+        leads[3].delete()
+
+        incremental = self.client.get("/api/v1/leadmetrics/").data
+        self.assertEqual(incremental["by_status"], {"new": 0, "contacted": 1, "qualified": 1, "closed": 1})
+        self.assertEqual(incremental["by_source"], {"zoho": 3})
+        self.assertEqual(incremental["call_outcomes"], {"initiated": 0, "completed": 1})
+        self.assertEqual(incremental["conversion"]["qualified_to_closed"], 0.5)
+
+        reconcile_daily_stats()
+        reconciled = self.client.get("/api/v1/leadmetrics/").data
+        for field in ("total_leads", "total_calls", "by_day"):
+            self.assertEqual(reconciled[field], incremental[field])
+
+
+class MockZohoHandler(BaseHTTPRequestHandler):
+    """Serves a token endpoint and a paged, If-Modified-Since aware Leads module."""
+    records = []
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, body=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        if body is not None:
+            self.wfile.write(json.dumps(body).encode())
+
+    def do_POST(self):
+        self.send_json(200, {"access_token": "token", "expires_in": 3600})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        since = self.headers.get("If-Modified-Since")
+        self.requests.append((url.path, since))
+
+        records = sorted(self.records, key=lambda r: r["Modified_Time"])
+        if since:
+            records = [
+                r for r in records
+                if parse_datetime(r["Modified_Time"]) >= parse_datetime(since)
+            ]
+        if not records:
+            return self.send_json(304)
+
+        page, per_page = int(query["page"][0]), int(query["per_page"][0])
+        chunk = records[(page - 1) * per_page:page * per_page]
+        self.send_json(200, {
+            "data": chunk,
+            "info": {"more_records": page * per_page < len(records)},
+        })
+
+
+class ZohoSyncTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(("127.0.0.1", 0), MockZohoHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{cls.server.server_port}"
+        cls.settings_override = override_settings(
+            ZOHO_API_BASE_URL=url, ZOHO_ACCOUNTS_URL=url, ZOHO_SYNC_PAGE_SIZE=2
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create(email="owner@example.com")
+        MockZohoHandler.requests = []
+        MockZohoHandler.records = [
+            {"id": str(i), "Last_Name": f"Lead {i}", "Phone": "5551234567",
+             "Modified_Time": f"2026-01-0{i}T10:00:00+00:00"}
+            for i in range(1, 6)
+        ]
+
+    def test_pull_is_incremental(self):
+        totals = pull_zoho_leads(self.user.id)
+        self.assertEqual(totals, {"created": 5, "updated": 0, "unchanged": 0})
+        self.assertEqual(len(MockZohoHandler.requests), 3)
+
+        MockZohoHandler.records[1].update(Last_Name="Renamed", Modified_Time="2026-02-01T10:00:00+00:00")
+        totals = pull_zoho_leads(self.user.id)
+
+        # The boundary record is sent again by Zoho and skipped
+        self.assertEqual(totals, {"created": 0, "updated": 1, "unchanged": 1})
+        self.assertEqual(MockZohoHandler.requests[-1][1], "2026-01-05T10:00:00+00:00")
+        self.assertEqual(Lead.objects.filter(user=self.user).count(), 5)
+        self.assertTrue(Lead.objects.filter(zoho_lead_id="2", name="Renamed").exists())
+
+    def post_webhook(self, payload, token="zoho-secret"):
+        headers = {"HTTP_X_ZOHO_WEBHOOK_TOKEN": token} if token else {}
+        return self.client.post(
+            "/api/v1/webhook/zoho/", payload, content_type="application/json", **headers
+        )
+
+    def test_redelivered_webhook_is_a_no_op(self):
+        payload = MockZohoHandler.records[0]
+
+        with override_settings(ZOHO_WEBHOOK_SECRET="zoho-secret", ZOHO_LEADS_USER_ID=str(self.user.id)):
+            first = self.post_webhook(payload)
+            with self.assertNumQueries(1):
+                again = self.post_webhook(payload)
+
+        self.assertEqual(first.json()["created"], 1)
+        self.assertEqual(again.json()["unchanged"], 1)
+        self.assertEqual(Lead.objects.filter(user=self.user, zoho_lead_id="1").count(), 1)
+
+    def test_lost_insert_race_becomes_an_update(self):
+        record = {**MockZohoHandler.records[0], "Modified_Time": "2026-02-01T10:00:00+00:00"}
+        real_atomic = transaction.atomic
+        raced = []
+
+        def racing_atomic(*args, **kwargs):
+            if not raced:
+                # Another delivery commits the same record after our SELECT
+                raced.append(Lead.objects.create(user=self.user, zoho_lead_id="1", name="Old"))
+            return real_atomic(*args, **kwargs)
+
+        with mock.patch.object(zoho_sync, "transaction", SimpleNamespace(atomic=racing_atomic)):
+            result = upsert_zoho_leads([record], self.user.id)
+
+        self.assertEqual(result, {"created": 0, "updated": 1, "unchanged": 0})
+        self.assertEqual(
+            list(Lead.objects.filter(user=self.user).values_list("zoho_lead_id", "name")),
+            [("1", "Lead 1")],
+        )
+
+    def test_token_refresh_error_page_raises_zoho_error(self):
+        client = ZohoClient()
+        error_page = SimpleNamespace(status_code=502, text="<html>Bad Gateway</html>")
+        error_page.json = mock.Mock(side_effect=ValueError("not json"))
+
+        with mock.patch.object(client.session, "post", return_value=error_page):
+            with self.assertRaisesMessage(ZohoError, "HTTP 502"):
+                client.get_access_token()
+
+    def test_webhook_needs_the_token_and_ignores_payload_owner(self):
+        other = User.objects.create(email="attacker@example.com")
+        payload = {**MockZohoHandler.records[0], "user_id": other.id}
+
+        self.assertEqual(self.post_webhook(payload).status_code, 401)
+        with override_settings(ZOHO_WEBHOOK_SECRET="zoho-secret", ZOHO_LEADS_USER_ID=str(self.user.id)):
+            self.assertEqual(self.post_webhook(payload, token=None).status_code, 401)
+            self.assertEqual(self.post_webhook(payload, token="guess").status_code, 401)
+            self.assertFalse(Lead.objects.exists())
+
+            self.assertEqual(self.post_webhook(payload).status_code, 200)
+
+        self.assertEqual(list(Lead.objects.values_list("user_id", flat=True)), [self.user.id])
+
+
+class FollowupReminderTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="owner@example.com")
+        self.lead = Lead.objects.create(user=self.user, name="Lead", phone="5551234567")
+
+    def test_due_reminders_are_claimed_once_and_sent(self):
+        past = timezone.now() - timedelta(minutes=5)
+        due = LeadFollowUp.objects.create(lead=self.lead, followup_type="call", next_followup_date=past)
+        later = LeadFollowUp.objects.create(
+            lead=self.lead, followup_type="call", next_followup_date=past + timedelta(days=1)
+        )
+
+        claimed = list(claim_due_reminders())
+        self.assertEqual([f.id for f in claimed], [due.id])
+        self.assertEqual(list(claim_due_reminders()), [])
+
+        self.assertTrue(dispatch_reminder(claimed[0]))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["owner@example.com"])
+
+        due.refresh_from_db()
+        later.refresh_from_db()
+        self.assertEqual((due.reminder_status, later.reminder_status), ("sent", "scheduled"))
+
+    def test_moving_the_date_reschedules(self):
+        followup = LeadFollowUp.objects.create(
+            lead=self.lead, followup_type="note", next_followup_date=timezone.now()
+        )
+        LeadFollowUp.objects.filter(id=followup.id).update(reminder_status="sent")
+        followup.refresh_from_db()
+
+        followup.next_followup_date = timezone.now() + timedelta(days=2)
+        followup.save(update_fields=["next_followup_date"])
+
+        followup.refresh_from_db()
+        self.assertEqual(followup.reminder_status, "scheduled")
+
+    @override_settings(FOLLOWUP_REMINDER_MAX_ATTEMPTS=2, FOLLOWUP_REMINDER_RETRY_BACKOFF=300)
+    def test_failures_back_off_then_fail(self):
+        due = timezone.now()
+        followup = LeadFollowUp.objects.create(lead=self.lead, followup_type="call", next_followup_date=due)
+
+        with mock.patch("web.services.reminders.send_mail", side_effect=OSError("smtp down")):
+            [claimed] = claim_due_reminders()
+            self.assertFalse(dispatch_reminder(claimed))
+
+            followup.refresh_from_db()
+            self.assertEqual((followup.reminder_status, followup.reminder_attempts), ("scheduled", 1))
+            self.assertAlmostEqual(
+                followup.reminder_retry_at, timezone.now() + timedelta(seconds=300),
+                delta=timedelta(seconds=5),
+            )
+            # The user's follow-up date stays put, and the retry is not due yet
+            self.assertEqual(followup.next_followup_date, due)
+            self.assertEqual(list(claim_due_reminders()), [])
+
+            LeadFollowUp.objects.filter(id=followup.id).update(reminder_retry_at=timezone.now())
+            [claimed] = claim_due_reminders()
+            self.assertFalse(dispatch_reminder(claimed))
+
+        followup.refresh_from_db()
+        self.assertEqual((followup.reminder_status, followup.reminder_attempts), ("failed", 2))
+
+    def test_result_of_a_superseded_claim_is_dropped(self):
+        followup = LeadFollowUp.objects.create(
+            lead=self.lead, followup_type="call", next_followup_date=timezone.now()
+        )
+        [first] = claim_due_reminders()
+
+        # First worker stalls; its claim is requeued and taken by a second worker
+        LeadFollowUp.objects.filter(id=followup.id).update(reminder_status="scheduled")
+        [second] = claim_due_reminders()
+
+        self.assertTrue(dispatch_reminder(first))
+        followup.refresh_from_db()
+        self.assertEqual((followup.reminder_status, followup.reminder_attempts), ("processing", 2))
+
+        self.assertTrue(dispatch_reminder(second))
+        followup.refresh_from_db()
+        self.assertEqual(followup.reminder_status, "sent")
+
+        # A reschedule resets the attempt count, so the next claim has the
+        # same count as the one still out; only the live claim records
+        followup.next_followup_date = timezone.now()
+        followup.save()
+        [third] = claim_due_reminders()
+        followup.refresh_from_db()
+        followup.next_followup_date = timezone.now() - timedelta(seconds=1)
+        followup.save()
+        [fourth] = claim_due_reminders()
+        self.assertEqual(third.reminder_attempts, fourth.reminder_attempts)
+
+        with mock.patch("web.services.reminders.send_mail", side_effect=OSError("smtp down")):
+            self.assertFalse(dispatch_reminder(third))
+        followup.refresh_from_db()
+        self.assertEqual((followup.reminder_status, followup.reminder_error), ("processing", ""))
+
+        self.assertTrue(dispatch_reminder(fourth))
+        followup.refresh_from_db()
+        self.assertEqual(followup.reminder_status, "sent")
+
+
+@override_settings(
+    GEMINI_BREAKER_THRESHOLD=2, GEMINI_RATE_LIMIT=100, GEMINI_ACQUIRE_TIMEOUT=0
+)
+class GeminiGuardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        gemini_client.reset_clients()
+        self.model = mock.Mock()
+        patcher = mock.patch.object(gemini_client, "get_model", return_value=self.model)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(gemini_client.reset_clients)
+
+    def test_failures_fall_back_to_cache_then_open_the_circuit(self):
+        self.model.generate_content.return_value = mock.Mock(text="fresh")
+        self.assertEqual(generate_text("prompt"), "fresh")
+        remember_response("prompt", "fresh")
+
+        self.model.generate_content.side_effect = ServiceUnavailable("overloaded")
+        self.assertEqual(generate_text("prompt"), "fresh")
+        with self.assertRaises(GeminiUnavailable):
+            generate_text("other prompt")
+
+        # Two failures opened the circuit; Gemini is no longer called
+        calls = self.model.generate_content.call_count
+        with self.assertRaises(GeminiUnavailable):
+            generate_text("other prompt")
+        self.assertEqual(self.model.generate_content.call_count, calls)
+
+    @override_settings(GEMINI_RESPONSE_CACHE_TIMEOUT=0)
+    def test_response_cache_can_be_turned_off(self):
+        # The benchmark runs like this so injected failures are not masked
+        remember_response("prompt", "fresh")
+
+        self.model.generate_content.side_effect = ServiceUnavailable("overloaded")
+        with self.assertRaises(GeminiUnavailable):
+            generate_text("prompt")
+
+    def test_refused_requests_do_not_open_the_circuit(self):
+        self.model.generate_content.side_effect = InvalidArgument("bad prompt")
+        for _ in range(3):
+            with self.assertRaises(GeminiUnavailable):
+                generate_text("bad prompt")
+        self.assertEqual(self.model.generate_content.call_count, 3)
+
+    def test_models_have_their_own_guards(self):
+        self.model.generate_content.side_effect = ServiceUnavailable("overloaded")
+        for _ in range(2):
+            with self.assertRaises(GeminiUnavailable):
+                generate_text("prompt", model_name=gemini_client.IMAGE_MODEL)
+
+        self.model.generate_content.side_effect = None
+        self.model.generate_content.return_value = mock.Mock(text="fresh")
+        self.assertEqual(generate_text("prompt"), "fresh")
+        with self.assertRaises(CircuitOpen):
+            gemini_client.get_guards(gemini_client.IMAGE_MODEL)[2].check()
+
+    def test_half_open_circuit_lets_one_probe_through(self):
+        breaker = CircuitBreaker("test:circuit", threshold=1, cooldown=30)
+        breaker.record_failure()
+        with self.assertRaises(CircuitOpen):
+            breaker.check()
+
+        cache.delete(breaker.open_key)  # cooldown over
+        breaker.check()
+        with self.assertRaises(CircuitOpen):
+            breaker.check()
+
+        # A failed probe reopens the circuit, a good one closes it
+        breaker.record_failure()
+        self.assertTrue(cache.get(breaker.open_key))
+        cache.delete(breaker.open_key)
+        breaker.check()
+        breaker.record_success()
+        breaker.check()
+        breaker.check()
+
+    @override_settings(GEMINI_MAX_CONCURRENCY=1)
+    def test_saturated_call_gives_back_the_probe(self):
+        semaphore, _, breaker = gemini_client.get_guards()
+        cache.set(breaker.half_open_key, True)
+        handle = semaphore.acquire(timeout=0)
+        try:
+            with self.assertRaises(GeminiUnavailable):
+                generate_text("prompt")
+        finally:
+            semaphore.release(handle)
+
+        # The next caller gets to probe instead of failing until probe_timeout
+        self.model.generate_content.return_value = mock.Mock(text="fresh")
+        self.assertEqual(generate_text("prompt"), "fresh")
+        self.assertIsNone(cache.get(breaker.half_open_key))
+
+    def test_only_validated_json_becomes_the_fallback(self):
+        self.model.generate_content.return_value = mock.Mock(text="not json")
+        with self.assertRaises(StructuredOutputError):
+            generate_json("prompt", DAILY_POSTS)
+
+        self.model.generate_content.side_effect = ServiceUnavailable("overloaded")
+        with self.assertRaises(GeminiUnavailable):
+            generate_json("prompt", DAILY_POSTS)
+
+        valid = json.dumps({"daily_trending_posts": []})
+        self.model.generate_content.side_effect = None
+        self.model.generate_content.return_value = mock.Mock(text=valid)
+        self.assertEqual(generate_json("prompt", DAILY_POSTS), json.loads(valid))
+
+        self.model.generate_content.side_effect = ServiceUnavailable("overloaded")
+        self.assertEqual(generate_json("prompt", DAILY_POSTS), json.loads(valid))
+
+    @override_settings(GEMINI_MAX_CONCURRENCY=1)
+    def test_concurrency_limit_is_shared(self):
+        semaphore, _, _ = gemini_client.get_guards()
+        handle = semaphore.acquire(timeout=0)
+        try:
+            with self.assertRaises(GeminiUnavailable):
+                generate_text("prompt")
+        finally:
+            semaphore.release(handle)
+        self.model.generate_content.assert_not_called()
+
+
+class StructuredOutputTests(TestCase):
+    POST = {"post_title": "t", "target_platform": "X", "caption": "c", "image_prompt": "p"}
+
+    def test_repair_fences_trailing_commas_and_truncation(self):
+        self.assertEqual(json.loads(repair_json('Sure!\n```json\n{"a": [1, 2,],}\n```')), {"a": [1, 2]})
+        self.assertEqual(
+            json.loads(repair_json('{"a": {"b": "done"}, "c": ["x", "unfinish')),
+            {"a": {"b": "done"}, "c": ["x"]},
+        )
+
+    def test_validation_errors_point_at_the_field(self):
+        errors = DAILY_POSTS.validate({"daily_trending_posts": [self.POST, {**self.POST, "hashtags": "#a"}]})
+        self.assertEqual(errors, ["$.daily_trending_posts[1].hashtags: expected array, got str"])
+
+    def test_only_the_repair_prompt_is_retried(self):
+        valid = json.dumps({"daily_trending_posts": [self.POST]})
+        responses = ['{"daily_trending_posts": [{}]}', valid]
+        with mock.patch("web.services.structured_output.generate_text", side_effect=responses) as generate:
+            self.assertEqual(generate_json("full prompt", DAILY_POSTS), json.loads(valid))
+
+        repair_prompt = generate.call_args_list[1].args[0]
+        self.assertNotIn("full prompt", repair_prompt)
+        self.assertIn("$.daily_trending_posts[0].caption: is required", repair_prompt)
+        self.assertIn("response_schema", generate.call_args_list[0].kwargs["generation_config"])
+
+        with mock.patch("web.services.structured_output.generate_text", return_value="nope"):
+            with self.assertRaises(StructuredOutputError):
+                generate_json("full prompt", DAILY_POSTS)
+
+
+class MultiBrandTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email="agency@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def make_brand(self, website):
+        return Brand.objects.create(user=self.user, website=website, analysis_data={})
+
+    def test_every_brand_is_addressable_by_id(self):
+        first = self.make_brand("https://one.example.com")
+        second = self.make_brand("https://two.example.com")
+        Brand.objects.create(
+            user=User.objects.create(email="other@example.com"),
+            website="https://two.example.com",
+            analysis_data={},
+        )
+
+        default = self.client.post("/api/v1/getbranddetails/")
+        chosen = self.client.post("/api/v1/getbranddetails/", {"brand_id": second.id})
+        self.assertEqual(default.data["brand_id"], first.id)
+        self.assertEqual(chosen.data["website"], "https://two.example.com")
+
+        self.client.post("/api/v1/styleupdate/", {"brand_id": second.id, "font_style": "serif"})
+        chosen = self.client.post("/api/v1/getbranddetails/", {"brand_id": second.id})
+        self.assertEqual(chosen.data["styles"]["font_style"], "serif")
+
+        listed = self.client.get("/api/v1/brands/").data["brands"]
+        self.assertEqual([b["brand_id"] for b in listed], [first.id, second.id])
+
+    def test_cached_context_follows_writes_that_skip_signals(self):
+        brand = self.make_brand("https://one.example.com")
+        self.assertIsNone(get_brand_context(self.user)["detail"]["industry"])
+        with self.assertNumQueries(1):
+            self.assertIsNone(get_brand_context(self.user)["detail"]["industry"])
+
+        # Queryset updates send no post_save; updated_at still moves the key
+        Brand.objects.filter(id=brand.id).update(
+            industry="Bakery", updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        self.assertEqual(get_brand_context(self.user)["detail"]["industry"], "Bakery")
+
+        brand.delete()
+        self.assertIsNone(get_brand_context(self.user))
+
+    def test_analysis_updates_the_default_brand_unless_asked_for_a_new_one(self):
+        first = self.make_brand("https://one.example.com")
+        analysis = {"entity_type": "Brand", "industry": "Bakery"}
+
+        with mock.patch("web.api.views.websiteanalysis.analyze_site", return_value=analysis):
+            updated = self.client.post("/api/v1/analyze-website/", {"website": "https://new.example.com"})
+            created = self.client.post(
+                "/api/v1/analyze-website/", {"website": "https://two.example.com", "new_brand": "true"}
+            )
+
+        self.assertEqual((updated.data["brand_id"], updated.data["created"]), (first.id, False))
+        first.refresh_from_db()
+        self.assertEqual(first.website, "https://new.example.com")
+        self.assertTrue(created.data["created"])
+        self.assertEqual(Brand.objects.filter(user=self.user).count(), 2)
+
+    @override_settings(GEMINI_MAX_CONCURRENCY=4, BRAND_BATCH_CONCURRENCY=4)
+    def test_batch_pool_leaves_gemini_slots_free(self):
+        self.assertEqual(batch_concurrency(), 2)
+        with override_settings(GEMINI_MAX_CONCURRENCY=1):
+            self.assertEqual(batch_concurrency(), 1)
+
+    def test_invalid_ai_json_is_a_bad_gateway(self):
+        brand = self.make_brand("https://one.example.com")
+        invalid = StructuredOutputError("not json", ["$: not valid JSON"])
+
+        with mock.patch("web.api.views.websiteanalysis.analyze_site", side_effect=invalid):
+            response = self.client.post("/api/v1/analyze-website/", {"website": brand.website})
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(response.data["raw_response"], "not json")
+        self.assertEqual(response.data["errors"], ["$: not valid JSON"])
+
+        with mock.patch("web.services.brand_strategy.analyze_brand_social_strategy", side_effect=invalid):
+            response = self.client.post("/api/v1/getsocialposts/")
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(response.data["raw_response"], "not json")
+
+    def test_batch_streams_one_line_per_website(self):
+        def analyze(website):
+            if "bad" in website:
+                raise StructuredOutputError("nope", ["$: not valid JSON"])
+            return {"entity_type": "Brand", "industry": website}
+
+        self.make_brand("https://a.example.com")
+        websites = ["https://a.example.com", "https://b.example.com", "https://bad.example.com"]
+        with mock.patch("web.services.brand_analysis.analyze_site", side_effect=analyze):
+            response = self.client.post(
+                "/api/v1/brandbatchanalysis/", {"websites": websites}, format="json"
+            )
+            lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        results = {line["website"]: line for line in lines[:-1]}
+        self.assertEqual(results["https://a.example.com"]["created"], False)
+        self.assertEqual(results["https://b.example.com"]["created"], True)
+        self.assertEqual(results["https://bad.example.com"]["error"], "Invalid Gemini JSON")
+        self.assertEqual(lines[-1], {"done": True, "succeeded": 2, "failed": 1})
+        self.assertEqual(Brand.objects.filter(user=self.user).count(), 2)
+
+
+class WebsiteSectionTests(TestCase):
+    def extract(self, html):
+        with mock.patch("web.utils.website_extractor.requests.get", return_value=SimpleNamespace(text=html)):
+            return extract_website_sections("https://acme.example.com")
+
+    def test_div_built_pages_fall_back_to_their_text(self):
+        sections = self.extract(
+            "<html><head><title>Acme</title></head><body>"
+            "<header><nav><a>Home</a></nav><div class='hero'>Fresh <b>bread</b> baked daily</div></header>"
+            "<h1>Acme Bakery</h1>"
+            "<div><span>Sourdough, rye and spelt from our own mill</span></div>"
+            "<footer>Copyright</footer></body></html>"
+        )
+        self.assertEqual(sections, [
+            {"kind": "title", "text": "Acme"},
+            {"kind": "text", "text": "Fresh bread baked daily"},
+            {"kind": "h1", "text": "Acme Bakery"},
+            {"kind": "text", "text": "Sourdough, rye and spelt from our own mill"},
+        ])
+
+    def test_loose_text_is_left_out_of_structured_pages(self):
+        sections = self.extract(
+            "<body><div>Loose banner text here</div>"
+            "<h1>Acme</h1><p>We bake bread.</p><li>Sourdough</li></body>"
+        )
+        self.assertEqual([s["kind"] for s in sections], ["h1", "p", "li"])
+
+    def test_compact_drops_repeats_and_fragments(self):
+        sections = [
+            {"kind": "h1", "text": "Acme Bakery"},
+            {"kind": "p", "text": "We bake  bread every morning."},
+            {"kind": "li", "text": "Shop now"},
+            {"kind": "p", "text": "we bake bread every morning."},
+            {"kind": "text", "text": "Order online"},
+        ]
+        self.assertEqual(
+            compact_website_sections(sections, budget_tokens=100),
+            "Acme Bakery\nWe bake bread every morning.",
+        )
+
+    def test_compact_keeps_headings_first_then_restores_page_order(self):
+        body = "Our ovens run from four in the morning until noon."
+        sections = [
+            {"kind": "p", "text": body},
+            {"kind": "text", "text": "Loose text found outside of any section tag."},
+            {"kind": "h2", "text": "Opening hours"},
+            {"kind": "title", "text": "Acme"},
+        ]
+        budget = sum(estimate_tokens(text) + 1 for text in ["Acme", "Opening hours", body])
+
+        self.assertEqual(
+            compact_website_sections(sections, budget_tokens=budget),
+            f"{body}\nOpening hours\nAcme",
+        )
+        self.assertEqual(compact_website_sections(sections, budget_tokens=7), "Opening hours\nAcme")
+
+
+class DailyPostsTests(TestCase):
+    def test_failed_brands_are_logged_and_counted(self):
+        user = User.objects.create(email="owner@example.com")
+        good = Brand.objects.create(user=user, website="https://good.example.com", analysis_data={})
+        bad = Brand.objects.create(user=user, website="https://bad.example.com", analysis_data={})
+
+        def generate(payload):
+            if "bad" in payload["website"]:
+                raise DailyPostsError("nope", ["$: not valid JSON"])
+            return {"daily_trending_posts": []}
+
+        with mock.patch("web.services.daily_posts.generate_post_set", side_effect=generate), \
+                self.assertLogs("web.services.daily_posts", "ERROR") as logs:
+            self.assertEqual(precompute_daily_posts(concurrency=2), (1, 1))
+
+        self.assertIn(f"brand {bad.id}", logs.output[0])
+        self.assertIn("DailyPostsError", logs.output[0])
+        self.assertTrue(good.daily_post_sets.exists())
+
+
+class BrandStrategyTests(TestCase):
+    def setUp(self):
+        user = User.objects.create(email="owner@example.com")
+        self.brand = Brand.objects.create(user=user, website="https://example.com", analysis_data={})
+        save_new_version(self.brand.id, "a" * 64, {"pillars": []})
+
+    def test_version_clash_takes_the_next_number(self):
+        with mock.patch("web.services.brand_strategy.latest_version", side_effect=[0, 1]):
+            strategy = save_new_version(self.brand.id, "b" * 64, {"pillars": []})
+        self.assertEqual(strategy.version, 2)
+
+    def test_gives_up_after_a_few_clashes(self):
+        with mock.patch("web.services.brand_strategy.latest_version", return_value=0) as latest:
+            with self.assertRaises(IntegrityError):
+                save_new_version(self.brand.id, "b" * 64, {"pillars": []})
+        self.assertEqual(latest.call_count, SAVE_VERSION_ATTEMPTS)
+
+
+class ReplayTests(TestCase):
+    PAGE = "<html><head><title>Acme Bakery</title></head><body><h1>Fresh bread</h1></body></html>"
+
+    def setUp(self):
+        cache.clear()
+        gemini_client.reset_clients()
+        self.addCleanup(gemini_client.reset_clients)
+        self.path = tempfile.mkdtemp() + "/cassette.json"
+
+        def live_request(session, method, url, *args, **kwargs):
+            response = requests.Response()
+            response.status_code = 200
+            response.headers["Content-Type"] = "text/html"
+            response._content = self.PAGE.encode()
+            return response
+
+        part = SimpleNamespace(text='{"ok": true}', inline_data=None)
+        live_model = mock.Mock()
+        live_model.generate_content.return_value = SimpleNamespace(
+            text=part.text, candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))]
+        )
+        with mock.patch("web.testing.replay._real_request", live_request), \
+                mock.patch.object(gemini_client, "get_model", return_value=live_model), \
+                recording(self.path):
+            extract_website_sections("https://acme.example.com")
+            generate_text("prompt")
+
+    def test_replay_serves_recordings_with_injected_faults(self):
+        with replaying(self.path):
+            self.assertEqual(extract_website_sections("https://acme.example.com")[0]["text"], "Acme Bakery")
+            self.assertEqual(generate_text("prompt"), '{"ok": true}')
+            with self.assertRaises(ReplayMiss):
+                requests.get("https://unknown.example.com")
+
+        cache.clear()
+        with replaying(self.path, Faults(failure_rate=1)):
+            self.assertEqual(requests.get("https://acme.example.com").status_code, 503)
+            with self.assertRaises(GeminiUnavailable):
+                generate_text("prompt")
+
+    def test_stub_server_answers_the_real_sdk(self):
+        with StubServer(self.path, Faults(latency=0.01)) as stub, routed_to(stub):
+            self.assertEqual(extract_website_sections("https://acme.example.com")[1]["text"], "Fresh bread")
+            self.assertEqual(generate_text("prompt"), '{"ok": true}')
+        self.assertEqual(stub.stats, {"served": 2, "failed": 0, "missed": 0})
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="owner@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for i in range(3):
+            Lead.objects.create(user=self.user, name=str(i), phone="5551234567")
+
+    @override_settings(QUERY_STATS_HEADERS=True)
+    def test_query_stats_headers(self):
+        response = self.client.get("/api/v1/leads/")
+
+        self.assertEqual(response["X-DB-Query-Count"], "1")
+        self.assertIn("X-DB-Query-Time-Ms", response)
+
+    def test_views_over_budget_fail(self):
+        path = tempfile.mkdtemp() + "/budgets.json"
+        with open(path, "w") as f:
+            json.dump({"budgets": {"web:listleads": 0}}, f)
+
+        with override_settings(QUERY_BUDGETS_FILE=path, QUERY_BUDGET_ENFORCE=True):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get("/api/v1/leads/")
+
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(2):
+                list(Lead.objects.all())
+                list(LeadFollowUp.objects.all())
+                list(LeadCallLog.objects.all())
+
+
+@override_settings(METRICS_TOKEN="scrape-token")
+class MetricsTests(TestCase):
+    def setUp(self):
+        telemetry.registry.reset()
+        self.user = User.objects.create(email="owner@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def scrape(self, token="scrape-token"):
+        return APIClient().get("/metrics", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_request_metrics_are_exposed_to_token_holders(self):
+        self.client.get("/api/v1/leads/")
+        self.client.get("/api/v1/leads/")
+
+        self.assertEqual(self.scrape(token="wrong").status_code, 401)
+        with override_settings(METRICS_TOKEN=""):
+            self.assertEqual(self.scrape().status_code, 404)
+
+        body = self.scrape().content.decode()
+        self.assertIn('http_requests_total{method="GET",route="web:listleads",status="200"} 2.0', body)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="web:listleads"} 2', body)
+        self.assertIn('http_request_db_queries_bucket{route="web:listleads",le="1.0"} 2', body)
+        self.assertIn("http_requests_in_flight 1.0", body)
+
+    def test_upstream_calls(self):
+        with telemetry.upstream_call("google_oauth", "verify_id_token", expected=(ValueError,)):
+            pass
+        with self.assertRaises(ValueError):
+            with telemetry.upstream_call("google_oauth", "verify_id_token", expected=(ValueError,)):
+                raise ValueError("invalid token")
+        with self.assertRaises(RuntimeError):
+            with telemetry.upstream_call("gemini", "gemini-2.5-flash"):
+                raise RuntimeError("503")
+
+        labels = {"upstream": "google_oauth", "operation": "verify_id_token"}
+        self.assertEqual(sum(telemetry.UPSTREAM_DURATION.value(**labels)[:-1]), 2)
+        self.assertIsNone(telemetry.UPSTREAM_ERRORS.value(**labels))
+        self.assertEqual(
+            telemetry.UPSTREAM_ERRORS.value(upstream="gemini", operation="gemini-2.5-flash"), 1
+        )
+
+    def test_worker_files_are_merged(self):
+        directory = tempfile.mkdtemp()
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+
+        def worker_file(pid, requests, in_flight):
+            with open(os.path.join(directory, f"{pid}-test.json"), "w") as f:
+                json.dump({
+                    "http_requests_total": [[["GET", "web:listleads", "200"], requests]],
+                    "http_requests_in_flight": [[[], in_flight]],
+                }, f)
+
+        worker_file(os.getppid(), 3, 2)
+        worker_file(exited.pid, 4, 5)
+
+        with override_settings(METRICS_DIR=directory):
+            self.client.get("/api/v1/leads/")
+            first = self.scrape().content.decode()
+            second = self.scrape().content.decode()
+
+        # Live workers, this process and the archived counts of the exited one
+        self.assertIn('http_requests_total{method="GET",route="web:listleads",status="200"} 8.0', first)
+        self.assertIn("http_requests_in_flight 3.0", first)
+        self.assertIn('http_requests_total{method="GET",route="web:listleads",status="200"} 8.0', second)
+        self.assertFalse(os.path.exists(os.path.join(directory, f"{exited.pid}-test.json")))
+        self.assertTrue(os.path.exists(os.path.join(directory, telemetry.ARCHIVE_FILE)))
+
+    def test_concurrent_flushes_do_not_collide(self):
+        # Forget the file in this test's directory afterwards
+        self.addCleanup(setattr, telemetry.registry, "_path", None)
+        errors = []
+
+        def flush():
+            try:
+                for _ in range(20):
+                    telemetry.registry.flush()
+            except OSError as e:
+                errors.append(e)
+
+        with override_settings(METRICS_DIR=tempfile.mkdtemp()):
+            telemetry.HTTP_REQUESTS_IN_FLIGHT.set(1)
+            threads = [threading.Thread(target=flush) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+
+    @override_settings(METRICS_FLUSH_INTERVAL=0)
+    def test_flusher_survives_write_errors(self):
+        registry = telemetry.Registry()
+        registry._check_process()
+        # SystemExit stops the loop once it has carried on past the error
+        with mock.patch.object(registry, "flush", side_effect=[OSError("disk full"), SystemExit]), \
+                self.assertLogs("core.telemetry", "ERROR"):
+            with self.assertRaises(SystemExit):
+                registry._flush_loop()
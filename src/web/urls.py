@@ -1,5 +1,5 @@
 from django.urls import path, include
-from .api.views import auth, employee, user, webview, dashboard, business, product, lead, elwebhook, websiteanalysis
+from .api.views import auth, employee, user, webview, dashboard, business, product, lead, campaign, activity, metrics, websiteanalysis
 
 app_name = "web"
 urlpatterns = [
@@ -33,7 +33,10 @@ urlpatterns = [
     path('api/v1/product/<int:pk>/', product.ProductRetrieveUpdateView.as_view(), name="updateproduct"),
 
     #ElevelLab
-    path('api/v1/webhook/elevenlabs/', elwebhook.ElevenLabsWebhookView.as_view(), name="elevellabs"),
+    path('api/v1/webhook/elevenlabs/', lead.ElevenLabsWebhookView.as_view(), name="elevellabs"),
+
+    #Zoho
+    path('api/v1/webhook/zoho/', lead.ZohoLeadWebhookView.as_view(), name="zohowebhook"),
 
     #Lead API
     path('api/v1/leads/', lead.LeadListView.as_view(), name="listleads"),
@@ -41,14 +44,27 @@ urlpatterns = [
     path('api/v1/updatelead/<int:lead_id>/', lead.UpdateLeadView.as_view(), name="updatelead"), 
     path('api/v1/leaddetails/<int:lead_id>/', lead.LeadDetailView.as_view(), name="leaddetails"), 
     path('api/v1/addleadfollowup/<int:lead_id>/', lead.AddLeadFollowupView.as_view(), name="addfollowup"), 
+    path('api/v1/leadfollowupconversation/<int:followup_id>/', lead.LeadFollowUpConversationView.as_view(), name="followupconversation"),
+    path('api/v1/calltranscript/<int:call_log_id>/', lead.CallLogTranscriptView.as_view(), name="calltranscript"),
+    path('api/v1/leadactivity/<int:lead_id>/', activity.LeadActivityView.as_view(), name="leadactivity"),
+    path('api/v1/recentactivity/', activity.RecentActivityView.as_view(), name="recentactivity"),
+    path('api/v1/leadmetrics/', metrics.LeadMetricsView.as_view(), name="leadmetrics"),
+    path('metrics', metrics.prometheus_metrics_view, name="metrics"),
     path('api/v1/initiateaicall/<int:lead_id>/', lead.InitiateAICallView.as_view(), name="initiateaicall"), 
     path('api/v1/elwebhook/', lead.ElevenLabsWebhookView.as_view(), name="elwebhook"), 
 
+    #Call campaigns
+    path('api/v1/callcampaigns/', campaign.CallCampaignListCreateView.as_view(), name="callcampaigns"),
+    path('api/v1/callcampaigns/<int:campaign_id>/', campaign.CallCampaignDetailView.as_view(), name="callcampaigndetail"),
+
     #Website API
     path("api/v1/analyze-website/", websiteanalysis.WebsiteMarketingAnalyzerView.as_view(), name="analyze-website"),
     path("api/v1/styleupdate/", websiteanalysis.BrandStyleUpdateView.as_view(), name="styleupdate"),
+    path("api/v1/brands/", websiteanalysis.BrandListView.as_view(), name="brands"),
+    path("api/v1/brandbatchanalysis/", websiteanalysis.BrandBatchAnalysisView.as_view(), name="brandbatchanalysis"),
     path("api/v1/getbranddetails/", websiteanalysis.BrandDetailView.as_view(), name="getbranddetails"),
     path("api/v1/getsocialposts/", websiteanalysis.BrandSocialStrategyView.as_view(), name="getsocialposts"),
+    path("api/v1/socialstrategyhistory/", websiteanalysis.BrandStrategyHistoryView.as_view(), name="socialstrategyhistory"),
     path("api/v1/dailyposts/", websiteanalysis.DailyTrendingPostsView.as_view(), name="dailyposts"),
 
 ]
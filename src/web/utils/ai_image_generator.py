@@ -1,14 +1,13 @@
 import os
 import uuid
 import base64
-import google.generativeai as genai
+import logging
+
 from django.conf import settings
 
-# ✅ Configure Gemini
-genai.configure(api_key=settings.GEMINI_API_KEY)
+from web.services.gemini_client import IMAGE_MODEL, generate_content
 
-# ✅ IMPORTANT: correct image model
-IMAGE_MODEL = "gemini-2.0-flash-preview-image-generation"
+logger = logging.getLogger(__name__)
 
 
 def generate_post_image(prompt: str):
@@ -18,13 +17,12 @@ def generate_post_image(prompt: str):
     """
 
     try:
-        model = genai.GenerativeModel(IMAGE_MODEL)
-
-        response = model.generate_content(
+        response = generate_content(
             prompt,
             generation_config={
                 "response_modalities": ["TEXT", "IMAGE"]
-            }
+            },
+            model_name=IMAGE_MODEL
         )
 
         # 🔥 Extract image from Gemini response
@@ -36,7 +34,7 @@ def generate_post_image(prompt: str):
                 break
 
         if not image_bytes:
-            print("No image returned from Gemini")
+            logger.warning("No image returned from Gemini")
             return None
 
         # ✅ Save image
@@ -52,6 +50,6 @@ def generate_post_image(prompt: str):
         # ✅ Return public URL
         return settings.MEDIA_URL + "ai_posts/" + file_name
 
-    except Exception as e:
-        print("Gemini image generation failed:", str(e))
+    except Exception:
+        logger.exception("Gemini image generation failed")
         return None
\ No newline at end of file
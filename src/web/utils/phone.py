@@ -0,0 +1,35 @@
+import re
+
+from django.conf import settings
+
+NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone(phone, country_code=None):
+    """
+    Best-effort E.164 form ("+<country><number>") of a free-form phone
+    string. Numbers without an international prefix get the default country
+    code; anything that cannot be a valid E.164 number returns None.
+    """
+    if not phone:
+        return None
+
+    phone = str(phone).strip()
+    digits = NON_DIGITS.sub("", phone)
+    if not digits:
+        return None
+
+    country_code = country_code or settings.DEFAULT_PHONE_COUNTRY_CODE
+
+    if phone.startswith("00"):
+        digits = digits[2:]
+    elif phone.startswith("+"):
+        pass
+    # National numbers, unless they already carry the code ("15551234567" for "1")
+    elif not (digits.startswith(country_code) and len(digits) > 10):
+        digits = country_code + digits.lstrip("0")
+
+    if not 8 <= len(digits) <= 15 or digits.startswith("0"):
+        return None
+
+    return f"+{digits}"
@@ -1,15 +1,63 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, Tag
 
-def extract_website_text(url: str) -> str:
+# Page chrome that repeats on every site and says little about the brand.
+# <header> stays: it often holds the hero heading and tagline.
+BOILERPLATE_TAGS = ["script", "style", "noscript", "svg", "nav", "footer", "aside", "form", "iframe"]
+SECTION_TAGS = ["title", "h1", "h2", "h3", "p", "li"]
+INLINE_TAGS = {"a", "abbr", "b", "br", "code", "em", "i", "mark", "small", "span", "strong", "sub", "sup", "u"}
+
+# Pages with fewer body sections than this build their copy from divs and
+# spans; their remaining text is added as kind "text"
+MIN_BODY_SECTIONS = 3
+
+
+def extract_website_sections(url: str) -> list:
+    """
+    Text blocks of the page in document order, as {"kind": <tag>, "text": ...}.
+    The meta description is included as kind "meta", and text outside the
+    section tags as kind "text" when the page has few sections.
+    """
     try:
         response = requests.get(url, timeout=10)
         soup = BeautifulSoup(response.text, "html.parser")
+    except Exception:
+        return []
 
-        for tag in soup(["script", "style", "noscript"]):
-            tag.decompose()
+    sections = []
 
-        text = " ".join(soup.stripped_strings)
-        return text[:8000]
-    except Exception:
-        return ""
\ No newline at end of file
+    title = soup.find("title")
+    if title and title.get_text(strip=True):
+        sections.append({"kind": "title", "text": title.get_text(" ", strip=True)})
+
+    meta = soup.find("meta", attrs={"name": "description"})
+    if meta and meta.get("content", "").strip():
+        sections.append({"kind": "meta", "text": meta["content"].strip()})
+
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+
+    body = soup.body or soup
+    blocks = []
+    loose_parent = None
+    for node in body.descendants:
+        if isinstance(node, Tag) and node.name in SECTION_TAGS:
+            text = node.get_text(" ", strip=True)
+            if text:
+                blocks.append({"kind": node.name, "text": text})
+                loose_parent = None
+        elif type(node) is NavigableString and node.strip() and node.find_parent(SECTION_TAGS) is None:
+            # Join strings split by inline markup into one block per container
+            parent = node.parent
+            while parent.name in INLINE_TAGS and parent.parent is not None:
+                parent = parent.parent
+            if parent is loose_parent:
+                blocks[-1]["text"] += " " + node.strip()
+            else:
+                blocks.append({"kind": "text", "text": node.strip()})
+                loose_parent = parent
+
+    if sum(block["kind"] != "text" for block in blocks) >= MIN_BODY_SECTIONS:
+        blocks = [block for block in blocks if block["kind"] != "text"]
+
+    return sections + blocks